@@ -0,0 +1,227 @@
+"""Endpoint benchmarks against a seeded database.
+
+Every benchmark serves its route in-process with pytest-benchmark and
+records, next to the latency distribution, the SQL statements one request
+executes and the peak memory it allocates (``queries``, ``peak_memory_kib``
+in ``extra_info``). Save a run and later compare against it:
+
+    pytest benchmarks/endpoints --bench-rows 1M --benchmark-save baseline
+    pytest benchmarks/endpoints --bench-rows 1M --bench-baseline .benchmarks/<machine>/0001_baseline.json
+
+A benchmark fails when it runs more statements than in the baseline, or its
+median latency or peak memory grew by more than the tolerance.
+"""
+import json
+import os
+import tracemalloc
+import uuid
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.endpoints.dataset import ADMIN_NAME, is_seeded, seed
+from benchmarks.generate_data import parse_count
+from src.api.dependencies import get_db, read_only_mode
+from src.core.query_counter import QueryCounter
+from src.core.security import create_access_token
+from src.database import RoutingSession, make_engine, read_only
+from src.enums import DealStatus, TaskStatus, UserRole
+from src.main import app
+from src.models import Client, Deal, Task, User, role_priority_map
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("endpoint benchmarks")
+    group.addoption("--bench-rows", type=parse_count, default="10k",
+                    help="Deals in the seeded database: 10k, 1M, 10M (default 10k)")
+    group.addoption("--bench-seed", type=int, default=0, help="Seed of the generated rows")
+    group.addoption("--bench-database-url", default=os.environ.get("BENCH_DATABASE_URL"),
+                    help="Database to migrate, seed and serve from (required)")
+    group.addoption("--bench-reseed", action="store_true",
+                    help="Seed even when the database already holds a dataset of this size")
+    group.addoption("--bench-write-rounds", type=int, default=30,
+                    help="Rounds of the benchmarks that change data")
+    group.addoption("--bench-baseline", help="pytest-benchmark JSON file to compare with")
+    group.addoption("--bench-time-tolerance", type=float, default=0.25,
+                    help="Allowed growth of the median latency (default 0.25)")
+    group.addoption("--bench-memory-tolerance", type=float, default=0.2,
+                    help="Allowed growth of the peak memory (default 0.2)")
+
+
+class Dataset:
+
+    def __init__(self, engine, rows: int):
+        self.rows = rows
+        with engine.connect() as conn:
+            self.user_ids = conn.scalars(select(User.id).order_by(User.id).limit(50)).all()
+            self.client_ids = conn.scalars(select(Client.id).order_by(Client.id).limit(50)).all()
+            self.deal_ids = conn.scalars(select(Deal.id).order_by(Deal.id).limit(50)).all()
+            self.task_ids = conn.scalars(select(Task.id).order_by(Task.id).limit(50)).all()
+        self.username = "bench-user-1"
+        self.client_name = "bench-client-1"
+
+
+class Rows:
+    """Inserts the rows a benchmark changes, named so they are removed after it."""
+
+    def __init__(self, engine, password: str):
+        self.engine = engine
+        self.password = password
+        self.names = []
+
+    def name(self, kind: str) -> str:
+        name = f"bench-write-{kind}-{uuid.uuid4().hex[:12]}"
+        self.names.append(name)
+        return name
+
+    def _insert(self, model, **values) -> int:
+        with self.engine.begin() as conn:
+            return conn.execute(insert(model).returning(model.id), values).scalar_one()
+
+    def user(self, role: UserRole = UserRole.user) -> str:
+        username = self.name("user")
+        self._insert(User, username=username, password=self.password, role=role,
+                     role_level=role_priority_map[role])
+        return username
+
+    def client(self, user_id: int | None = None) -> tuple[int, str]:
+        name = self.name("client")
+        return self._insert(Client, name=name, email="bench@example.com", phone="+10000000000",
+                            user_id=user_id), name
+
+    def deal(self, client_id: int, status: DealStatus = DealStatus.new) -> int:
+        return self._insert(Deal, client_id=client_id, title=self.name("deal"), status=status, value=1)
+
+    def task(self, status: TaskStatus = TaskStatus.todo, due_date=None) -> int:
+        return self._insert(Task, title=self.name("task"), description="", status=status, due_date=due_date)
+
+    def cleanup(self) -> None:
+        if not self.names:
+            return
+        with self.engine.begin() as conn:
+            client_ids = select(Client.id).where(Client.name.in_(self.names))
+            conn.execute(delete(Deal).where(Deal.title.in_(self.names) | Deal.client_id.in_(client_ids)))
+            conn.execute(delete(Task).where(Task.title.in_(self.names)))
+            conn.execute(delete(Client).where(Client.name.in_(self.names)))
+            conn.execute(delete(User).where(User.username.in_(self.names)))
+        self.names.clear()
+
+
+@pytest.fixture(scope="session")
+def bench_engine(pytestconfig):
+    url = pytestconfig.getoption("bench_database_url")
+    if not url:
+        # Seeding empties the tables: never fall back to a database of the app or the tests
+        raise pytest.UsageError("Set BENCH_DATABASE_URL or --bench-database-url to a database of its own")
+    engine = make_engine(url)
+    rows = pytestconfig.getoption("bench_rows")
+    if pytestconfig.getoption("bench_reseed") or not is_seeded(engine, rows):
+        seed(engine, rows, pytestconfig.getoption("bench_seed"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def dataset(bench_engine, pytestconfig):
+    return Dataset(bench_engine, pytestconfig.getoption("bench_rows"))
+
+
+@pytest.fixture(scope="session")
+def bench_client(bench_engine):
+    BenchSessionLocal = sessionmaker(class_=RoutingSession, bind=bench_engine,
+                                     autoflush=False, expire_on_commit=False)
+
+    def override_get_db(request: Request = None):
+        db = BenchSessionLocal()
+        mode = read_only_mode(request) if request is not None else None
+        if mode:
+            read_only(db, mode)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    token = create_access_token({"sub": ADMIN_NAME, "role": UserRole.admin})
+    with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(scope="session")
+def password_hash(bench_engine):
+    with bench_engine.connect() as conn:
+        return conn.scalar(select(User.password).where(User.username == ADMIN_NAME))
+
+
+@pytest.fixture
+def rows(bench_engine, password_hash):
+    rows = Rows(bench_engine, password_hash)
+    yield rows
+    rows.cleanup()
+
+
+@pytest.fixture(scope="session")
+def baseline(pytestconfig):
+    path = pytestconfig.getoption("bench_baseline")
+    if not path:
+        return {}
+    with open(path) as f:
+        return {entry["fullname"]: entry for entry in json.load(f)["benchmarks"]}
+
+
+def _regressions(entry: dict, benchmark, tolerances: dict) -> list[str]:
+    found = []
+    queries, base_queries = benchmark.extra_info["queries"], entry["extra_info"].get("queries")
+    if base_queries is not None and queries > base_queries:
+        found.append(f"queries {base_queries} -> {queries}")
+    memory, base_memory = benchmark.extra_info["peak_memory_kib"], entry["extra_info"].get("peak_memory_kib")
+    if base_memory and memory > base_memory * (1 + tolerances["memory"]):
+        found.append(f"peak memory {base_memory} -> {memory} KiB")
+    if benchmark.stats is not None:
+        median, base_median = benchmark.stats.stats.median, entry["stats"]["median"]
+        if median > base_median * (1 + tolerances["time"]):
+            found.append(f"median {base_median * 1000:.2f} -> {median * 1000:.2f} ms")
+    return found
+
+
+@pytest.fixture
+def measure(benchmark, bench_client, bench_engine, baseline, pytestconfig, request):
+    """Benchmarks one request. ``prepare`` runs untimed before every round
+    and returns request arguments, for requests that change data."""
+    tolerances = {"time": pytestconfig.getoption("bench_time_tolerance"),
+                  "memory": pytestconfig.getoption("bench_memory_tolerance")}
+
+    def run(method: str, url: str, prepare=None, status: int = 200, **kwargs):
+        def send(**prepared):
+            response = bench_client.request(method, **{"url": url, **kwargs, **prepared})
+            assert response.status_code == status, response.text
+            return response
+
+        if prepare is None:
+            benchmark(send)
+        else:
+            benchmark.pedantic(send, setup=lambda: ((), prepare()),
+                               rounds=pytestconfig.getoption("bench_write_rounds"))
+
+        with QueryCounter(bench_engine) as counter:
+            send(**(prepare() if prepare else {}))
+        prepared = prepare() if prepare else {}
+        tracemalloc.start()
+        try:
+            send(**prepared)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info.update(queries=counter.count, peak_memory_kib=round(peak / 1024))
+
+        entry = baseline.get(request.node.nodeid)
+        if entry:
+            found = _regressions(entry, benchmark, tolerances)
+            if found:
+                pytest.fail("Regressed against the baseline: " + ", ".join(found))
+    return run
+
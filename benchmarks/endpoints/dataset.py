@@ -0,0 +1,124 @@
+"""Reproducible dataset for the endpoint benchmarks.
+
+The size is the number of deals; the other tables scale with it: a client
+per 10 deals, a task per 2 and a user per 1000 (at least 10). The same
+``rows`` and ``seed`` always give the same rows, with dates relative to the
+day of seeding. No task is done or past due, so the bulk cleanup benchmarks
+only delete what they prepare themselves.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.engine import Engine
+
+from benchmarks.generate_data import COLUMNS, load, reset_sequences, truncate
+from src.core.security import hash_password
+from src.enums import DealStatus, TaskStatus, UserRole
+from src.migrate import upgrade
+from src.models import Client, Deal, Task, User, role_priority_map
+from src.repositories.memory.database import ClientRow, DealRow, MemoryDatabase, TaskRow, UserRow
+
+ADMIN_NAME = 'bench-admin'
+PASSWORD = 'bench-p!1sword'
+CHUNK = 50_000
+
+
+def sizes(rows: int) -> dict:
+    return {
+        User: max(rows // 1000, 10),
+        Client: max(rows // 10, 1),
+        Deal: rows,
+        Task: max(rows // 2, 1),
+    }
+
+
+def is_seeded(engine: Engine, rows: int) -> bool:
+    if not inspect(engine).has_table(User.__tablename__):
+        return False
+    with engine.connect() as conn:
+        if conn.scalar(select(User.id).where(User.username == ADMIN_NAME)) is None:
+            return False
+        # The admin comes on top of the generated users
+        counts = {model: conn.scalar(select(func.count()).select_from(model)) for model in sizes(rows)}
+    expected = sizes(rows)
+    expected[User] += 1
+    return counts == expected
+
+
+def _users(rng: random.Random, n: int, password: str):
+    roles = [UserRole.user, UserRole.manager, UserRole.admin]
+    yield {'id': 1, 'username': ADMIN_NAME, 'password': password, 'role': UserRole.admin,
+           'role_level': role_priority_map[UserRole.admin]}
+    for i in range(1, n + 1):
+        role = rng.choices(roles, weights=[80, 15, 5])[0]
+        yield {'id': i + 1, 'username': f'bench-user-{i}', 'password': password, 'role': role,
+               'role_level': role_priority_map[role]}
+
+
+def _clients(rng: random.Random, n: int, users: int):
+    for i in range(1, n + 1):
+        # Three in ten are unassigned; ids start at 1 and the admin is user 1
+        user_id = rng.randint(1, users + 1) if rng.random() >= 0.3 else None
+        yield {'id': i, 'user_id': user_id, 'name': f'bench-client-{i}', 'email': f'client{i}@example.com',
+               'phone': f'+1{i:010}', 'notes': None}
+
+
+def _deals(rng: random.Random, n: int, clients: int, today: datetime):
+    statuses = list(DealStatus)
+    for i in range(1, n + 1):
+        status = rng.choices(statuses, weights=[30, 40, 30])[0]
+        created_at = today - timedelta(days=rng.randint(0, 730), seconds=rng.randint(0, 86399))
+        closed_at = created_at + timedelta(days=rng.randint(1, 90)) if status == DealStatus.closed else None
+        yield {'id': i, 'client_id': rng.randint(1, clients), 'title': f'bench-deal-{i}', 'status': status,
+               'value': rng.randint(1, 1_000_000), 'created_at': created_at, 'updated_at': created_at,
+               'closed_at': closed_at}
+
+
+def _tasks(rng: random.Random, n: int, users: int, today: datetime):
+    statuses = [TaskStatus.todo, TaskStatus.doing]
+    for i in range(1, n + 1):
+        created_at = today - timedelta(days=rng.randint(0, 365))
+        due_date = today + timedelta(days=rng.randint(1, 365)) if rng.random() < 0.8 else None
+        yield {'id': i, 'user_id': rng.randint(1, users + 1) if rng.random() >= 0.2 else None,
+               'title': f'bench-task-{i}', 'description': f'Task {i}', 'status': rng.choice(statuses),
+               'created_at': created_at, 'updated_at': created_at, 'due_date': due_date}
+
+
+def _insert(engine: Engine, model, rows) -> None:
+    columns = COLUMNS[model]
+    chunk = []
+    for row in rows:
+        chunk.append(tuple(row[column] for column in columns))
+        if len(chunk) == CHUNK:
+            load(engine, model, chunk)
+            chunk = []
+    if chunk:
+        load(engine, model, chunk)
+
+
+def seed(engine: Engine, rows: int, seed: int = 0) -> None:
+    """Migrates the database of ``engine`` to head, empties its tables and
+    fills them."""
+    rng = random.Random(seed)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    n = sizes(rows)
+    upgrade(engine.url.render_as_string(hide_password=False), configure_logging=False)
+    truncate(engine)
+    _insert(engine, User, _users(rng, n[User], hash_password(PASSWORD)))
+    _insert(engine, Client, _clients(rng, n[Client], n[User]))
+    _insert(engine, Deal, _deals(rng, n[Deal], n[Client], today))
+    _insert(engine, Task, _tasks(rng, n[Task], n[User], today))
+    reset_sequences(engine)
+
+
+def seed_memory(db: MemoryDatabase, rows: int, seed: int = 0) -> None:
+    """Fills the tables of an in-memory database with the rows ``seed`` gives
+    a SQL one."""
+    rng = random.Random(seed)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    n = sizes(rows)
+    db.users.load(UserRow(**row) for row in _users(rng, n[User], hash_password(PASSWORD)))
+    db.clients.load(ClientRow(**row) for row in _clients(rng, n[Client], n[User]))
+    db.deals.load(DealRow(**row) for row in _deals(rng, n[Deal], n[Client], today))
+    db.tasks.load(TaskRow(**row) for row in _tasks(rng, n[Task], n[User], today))
@@ -0,0 +1,35 @@
+import pytest
+from src.core.config import settings
+
+@pytest.mark.admin_api
+@pytest.mark.get
+def test_get_slow_queries(measure):
+    measure("GET", "/admin/slow-queries")
+
+@pytest.mark.admin_api
+@pytest.mark.delete
+def test_reset_slow_queries(measure):
+    measure("DELETE", "/admin/slow-queries")
+
+@pytest.mark.admin_api
+@pytest.mark.post
+def test_profile_process(measure):
+    measure("POST", "/admin/profile", params={"seconds": 0.1})
+
+@pytest.mark.admin_api
+@pytest.mark.post
+def test_profile_requests(measure, bench_client):
+    measure("POST", "/admin/profile/requests", params={"count": 1})
+    # Leaves no armed profile behind for the next benchmarks
+    bench_client.get("/users/me")
+
+@pytest.mark.admin_api
+@pytest.mark.get
+def test_get_request_profile(measure):
+    measure("GET", "/admin/profile/requests")
+
+@pytest.mark.metrics_api
+@pytest.mark.get
+def test_metrics(measure, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "bench-metrics-token")
+    measure("GET", "/metrics", headers={"Authorization": "Bearer bench-metrics-token"})
@@ -0,0 +1,21 @@
+import pytest
+from benchmarks.endpoints.dataset import ADMIN_NAME, PASSWORD
+from src.core.rate_limit import auth_limiter
+
+def reset_rate_limits() -> dict:
+    auth_limiter.reset()
+    return {}
+
+@pytest.mark.auth_api
+@pytest.mark.post
+def test_login(measure):
+    measure("POST", "/auth/login", prepare=reset_rate_limits,
+            data={"username": ADMIN_NAME, "password": PASSWORD})
+
+@pytest.mark.auth_api
+@pytest.mark.patch
+def test_change_password(measure, rows):
+    def prepare():
+        auth_limiter.reset()
+        return {"params": {"username": rows.user(), "password": PASSWORD, "new_password": PASSWORD}}
+    measure("PATCH", "/auth/change-password", prepare=prepare)
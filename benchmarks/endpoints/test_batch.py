@@ -0,0 +1,22 @@
+import pytest
+
+@pytest.mark.batch_api
+@pytest.mark.post
+def test_batch(measure, rows, dataset):
+    def prepare():
+        return {"json": {"operations": [
+            {"operation_id": "set-status", "params": {"deal_id": rows.deal(dataset.client_ids[0]), "status": "closed"}},
+            {"operation_id": "take-task", "params": {"task_id": rows.task()}},
+            {"operation_id": "discharge", "params": {"client_id": rows.client(user_id=dataset.user_ids[0])[0]}},
+        ]}}
+    measure("POST", "/batch", prepare=prepare)
+
+@pytest.mark.batch_api
+@pytest.mark.post
+def test_batch_atomic(measure, rows, dataset):
+    def prepare():
+        return {"json": {"atomic": True, "operations": [
+            {"operation_id": "set-status", "params": {"deal_id": rows.deal(dataset.client_ids[0]), "status": "closed"}},
+            {"operation_id": "take-task", "params": {"task_id": rows.task()}},
+        ]}}
+    measure("POST", "/batch", prepare=prepare)
@@ -0,0 +1,84 @@
+import pytest
+
+LIST_FILTERS = {
+    "none": {},
+    "search": {"search": "client-1"},
+    "related-to-me": {"related_to_me": True},
+    "related-to-user": {"related_to_user": "bench-user-1"},
+    "sort-name-desc": {"sort_by": "name", "order": "desc"},
+    "sort-email": {"sort_by": "email"},
+    "all": {"search": "client-1", "related_to_user": "bench-user-1", "sort_by": "name", "order": "desc"},
+}
+
+UNASSIGNED_FILTERS = {
+    "none": {},
+    "search": {"search": "client-1"},
+    "sort-phone-desc": {"sort_by": "phone", "order": "desc"},
+    "all": {"search": "client-1", "sort_by": "phone", "order": "desc"},
+}
+
+@pytest.mark.clients_api
+@pytest.mark.get
+@pytest.mark.parametrize("filters", LIST_FILTERS.values(), ids=LIST_FILTERS.keys())
+def test_get_all_clients(measure, filters):
+    measure("GET", "/clients/get", params={"skip": 0, "limit": 50, **filters})
+
+@pytest.mark.clients_api
+@pytest.mark.get
+def test_get_all_clients_deep_page(measure, dataset):
+    measure("GET", "/clients/get", params={"skip": dataset.rows // 20, "limit": 50})
+
+@pytest.mark.clients_api
+@pytest.mark.get
+def test_get_clients_batch(measure, dataset):
+    measure("GET", "/clients/batch", params={"ids": dataset.client_ids})
+
+@pytest.mark.clients_api
+@pytest.mark.get
+@pytest.mark.parametrize("filters", UNASSIGNED_FILTERS.values(), ids=UNASSIGNED_FILTERS.keys())
+def test_get_unassigned_clients(measure, filters):
+    measure("GET", "/clients/get/unassigned_clients", params={"skip": 0, "limit": 50, **filters})
+
+@pytest.mark.clients_api
+@pytest.mark.get
+def test_get_client_overview(measure, dataset):
+    measure("GET", f"/clients/{dataset.client_ids[0]}/overview")
+
+@pytest.mark.clients_api
+@pytest.mark.patch
+def test_take_unassigned_client(measure, rows):
+    measure("PATCH", "/clients/patch/take", prepare=lambda: {"params": {"client_id": rows.client()[0]}})
+
+@pytest.mark.clients_api
+@pytest.mark.patch
+def test_delegate_client(measure, rows, dataset):
+    measure("PATCH", "/clients/patch/delegate", prepare=lambda: {
+        "params": {"client_id": rows.client()[0], "username": dataset.username}})
+
+@pytest.mark.clients_api
+@pytest.mark.patch
+def test_discharge_client(measure, rows, dataset):
+    measure("PATCH", "/clients/patch/discharge", prepare=lambda: {
+        "params": {"client_id": rows.client(user_id=dataset.user_ids[0])[0]}})
+
+@pytest.mark.clients_api
+@pytest.mark.post
+def test_add_client(measure, rows, dataset):
+    measure("POST", "/clients/add", prepare=lambda: {
+        "json": {"name": rows.name("client"), "email": "bench@example.com", "phone": "+10000000000",
+                 "user_name": dataset.username}})
+
+@pytest.mark.clients_api
+@pytest.mark.put
+def test_update_client(measure, rows, dataset):
+    def prepare():
+        client_id, name = rows.client()
+        return {"params": {"client_id": client_id},
+                "json": {"name": name, "email": "updated@example.com", "phone": "+10000000001",
+                         "user_name": dataset.username}}
+    measure("PUT", "/clients/update", prepare=prepare)
+
+@pytest.mark.clients_api
+@pytest.mark.delete
+def test_delete_client(measure, rows):
+    measure("DELETE", "/clients/delete", prepare=lambda: {"url": f"/clients/delete/{rows.client()[1]}"})
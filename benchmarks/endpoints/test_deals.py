@@ -0,0 +1,93 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+LIST_FILTERS = {
+    "none": {},
+    "search": {"search": "deal-1"},
+    "more-than": {"more_than": 500000},
+    "less-than": {"less_than": 500000},
+    "related-to-me": {"related_to_me": True},
+    "related-to-user": {"related_to_user": "bench-user-1"},
+    "related-to-client": {"related_to_client": "bench-client-1"},
+    "sort-value-desc": {"sort_by": "value", "order": "desc"},
+    "sort-created-at": {"sort_by": "created_at"},
+    "all": {"search": "deal-1", "more_than": 100000, "less_than": 900000,
+            "related_to_user": "bench-user-1", "sort_by": "value", "order": "desc"},
+}
+
+_now = datetime.now(timezone.utc)
+DATE_FILTERS = {
+    "new": {"new": True},
+    "earlier-than": {"earlier_than": (_now - timedelta(days=365)).isoformat()},
+    "later-than": {"later_than": (_now - timedelta(days=30)).isoformat()},
+    "exact-date": {"exact_date": (_now - timedelta(days=10)).date().isoformat()},
+    "closed-at": {"date_field": "closed_at", "later_than": (_now - timedelta(days=90)).isoformat()},
+    "updated-at": {"date_field": "updated_at", "earlier_than": (_now - timedelta(days=30)).isoformat()},
+    "all": {"later_than": (_now - timedelta(days=365)).isoformat(), "search": "deal-1",
+            "more_than": 100000, "related_to_user": "bench-user-1", "sort_by": "created_at", "order": "desc"},
+}
+
+@pytest.mark.deals_api
+@pytest.mark.get
+@pytest.mark.parametrize("filters", LIST_FILTERS.values(), ids=LIST_FILTERS.keys())
+def test_get_all_deals(measure, filters):
+    measure("GET", "/deals/get-all", params={"skip": 0, "limit": 50, **filters})
+
+@pytest.mark.deals_api
+@pytest.mark.get
+def test_get_all_deals_deep_page(measure, dataset):
+    measure("GET", "/deals/get-all", params={"skip": dataset.rows // 2, "limit": 50})
+
+@pytest.mark.deals_api
+@pytest.mark.get
+def test_get_deals_batch(measure, dataset):
+    measure("GET", "/deals/batch", params={"ids": dataset.deal_ids})
+
+@pytest.mark.deals_api
+@pytest.mark.get
+@pytest.mark.parametrize("filters", DATE_FILTERS.values(), ids=DATE_FILTERS.keys())
+def test_get_deals_by_date(measure, filters):
+    measure("GET", "/deals/get-by-date", params={"skip": 0, "limit": 50, **filters})
+
+@pytest.mark.deals_api
+@pytest.mark.patch
+def test_set_close_date(measure, rows, dataset):
+    measure("PATCH", "/deals/patch/set-close-date", prepare=lambda: {
+        "params": {"deal_id": rows.deal(dataset.client_ids[0]), "date": _now.isoformat()}})
+
+@pytest.mark.deals_api
+@pytest.mark.patch
+def test_set_status(measure, rows, dataset):
+    measure("PATCH", "/deals/patch/set-status", prepare=lambda: {
+        "params": {"deal_id": rows.deal(dataset.client_ids[0]), "status": "in_progress"}})
+
+@pytest.mark.deals_api
+@pytest.mark.post
+def test_add_deal(measure, rows, dataset):
+    measure("POST", "/deals/add", prepare=lambda: {
+        "json": {"title": rows.name("deal"), "status": "new", "value": 1, "client_name": dataset.client_name}})
+
+@pytest.mark.deals_api
+@pytest.mark.put
+def test_update_deal(measure, rows, dataset):
+    def prepare():
+        deal_id = rows.deal(dataset.client_ids[0])
+        return {"params": {"deal_id": deal_id},
+                "json": {"title": rows.name("deal"), "status": "closed", "value": 2,
+                         "client_name": dataset.client_name}}
+    measure("PUT", "/deals/update", prepare=prepare)
+
+@pytest.mark.deals_api
+@pytest.mark.delete
+def test_delete_deal(measure, rows, dataset):
+    measure("DELETE", "/deals/delete", prepare=lambda: {"params": {"deal_id": rows.deal(dataset.client_ids[0])}})
+
+@pytest.mark.deals_api
+@pytest.mark.delete
+def test_delete_deals_by_client(measure, rows):
+    def prepare():
+        client_id, _ = rows.client()
+        for _ in range(10):
+            rows.deal(client_id)
+        return {"params": {"client_id": client_id}}
+    measure("DELETE", "/deals/delete-by-client", prepare=prepare)
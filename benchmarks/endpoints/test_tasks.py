@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+LIST_FILTERS = {
+    "none": {},
+    "search": {"search": "task-1"},
+    "related-to-user": {"related_to_user": "bench-user-1"},
+    "my-tasks": {"my_tasks": True},
+    "sort-status-desc": {"sort_by": "status", "order": "desc"},
+    "all": {"search": "task-1", "related_to_user": "bench-user-1", "sort_by": "status", "order": "desc"},
+}
+
+@pytest.mark.tasks_api
+@pytest.mark.get
+@pytest.mark.parametrize("filters", LIST_FILTERS.values(), ids=LIST_FILTERS.keys())
+def test_get_tasks(measure, filters):
+    measure("GET", "/tasks/get", params={"skip": 0, "limit": 50, **filters})
+
+@pytest.mark.tasks_api
+@pytest.mark.get
+def test_get_tasks_deep_page(measure, dataset):
+    measure("GET", "/tasks/get", params={"skip": dataset.rows // 4, "limit": 50})
+
+@pytest.mark.tasks_api
+@pytest.mark.get
+def test_get_tasks_batch(measure, dataset):
+    measure("GET", "/tasks/batch", params={"ids": dataset.task_ids})
+
+@pytest.mark.tasks_api
+@pytest.mark.patch
+def test_take_task(measure, rows):
+    measure("PATCH", "/tasks/take", prepare=lambda: {"params": {"task_id": rows.task()}})
+
+@pytest.mark.tasks_api
+@pytest.mark.put
+def test_update_task(measure, rows, dataset):
+    def prepare():
+        task_id = rows.task()
+        return {"params": {"task_id": task_id},
+                "json": {"title": rows.name("task"), "description": "Updated", "status": "doing",
+                         "user_name": dataset.username}}
+    measure("PUT", "/tasks/update", prepare=prepare)
+
+@pytest.mark.tasks_api
+@pytest.mark.post
+def test_add_task(measure, rows, dataset):
+    measure("POST", "/tasks/add", prepare=lambda: {
+        "json": {"title": rows.name("task"), "description": "Benchmark", "status": "todo",
+                 "user_name": dataset.username}})
+
+@pytest.mark.tasks_api
+@pytest.mark.delete
+def test_delete_task(measure, rows):
+    measure("DELETE", "/tasks/delete", prepare=lambda: {"params": {"task_id": rows.task()}})
+
+@pytest.mark.tasks_api
+@pytest.mark.delete
+def test_delete_done_tasks(measure, rows):
+    def prepare():
+        for _ in range(10):
+            rows.task(status="done")
+        return {}
+    measure("DELETE", "/tasks/delete-done-task", prepare=prepare)
+
+@pytest.mark.tasks_api
+@pytest.mark.delete
+def test_delete_expired_tasks(measure, rows):
+    def prepare():
+        for _ in range(10):
+            rows.task(due_date=datetime.now(timezone.utc) - timedelta(days=1))
+        return {}
+    measure("DELETE", "/tasks/delete-expired-task", prepare=prepare)
@@ -0,0 +1,61 @@
+import pytest
+from benchmarks.endpoints.dataset import PASSWORD
+
+LIST_FILTERS = {
+    "none": {},
+    "role": {"role": "manager"},
+    "search": {"search": "user-1"},
+    "sort-username-desc": {"sort_by": "username", "order": "desc"},
+    "all": {"role": "manager", "search": "user-1", "sort_by": "username", "order": "desc"},
+}
+
+@pytest.mark.users_api
+@pytest.mark.get
+def test_my_info(measure):
+    measure("GET", "/users/me")
+
+@pytest.mark.users_api
+@pytest.mark.get
+@pytest.mark.parametrize("filters", LIST_FILTERS.values(), ids=LIST_FILTERS.keys())
+def test_get_all_users(measure, dataset, filters):
+    measure("GET", "/users/get-all-users", params={"skip": 0, "limit": 50, **filters})
+
+@pytest.mark.users_api
+@pytest.mark.get
+def test_get_all_users_deep_page(measure, dataset):
+    measure("GET", "/users/get-all-users", params={"skip": dataset.rows // 2000, "limit": 50})
+
+@pytest.mark.users_api
+@pytest.mark.get
+def test_get_users_batch(measure, dataset):
+    measure("GET", "/users/batch", params={"ids": dataset.user_ids})
+
+@pytest.mark.users_api
+@pytest.mark.get
+def test_get_user_by_id(measure, dataset):
+    measure("GET", f"/users/get-user-by-id/{dataset.user_ids[-1]}")
+
+@pytest.mark.users_api
+@pytest.mark.get
+def test_get_user_by_username(measure, dataset):
+    measure("GET", f"/users/get-user-by-username/{dataset.username}")
+
+@pytest.mark.users_api
+@pytest.mark.post
+def test_add_user(measure, rows):
+    measure("POST", "/users/add", prepare=lambda: {
+        "json": {"username": rows.name("user"), "password": PASSWORD, "role": "user"}})
+
+@pytest.mark.users_api
+@pytest.mark.put
+def test_update_user(measure, rows):
+    def prepare():
+        username = rows.user()
+        return {"url": f"/users/update/{username}",
+                "json": {"username": username, "password": PASSWORD, "role": "manager"}}
+    measure("PUT", "/users/update", prepare=prepare)
+
+@pytest.mark.users_api
+@pytest.mark.delete
+def test_delete_user(measure, rows):
+    measure("DELETE", "/users/delete", prepare=lambda: {"url": f"/users/delete/{rows.user()}"})
@@ -0,0 +1,337 @@
+"""Generates users, clients, deals and tasks at production scale.
+
+    python -m benchmarks.generate_data --users 2k --clients 1M --deals 10M --tasks 5M
+
+The schema is brought to the head revision with the migrations first. Rows
+are appended after the ids already in the tables (``--truncate`` empties
+them first). Deals per client follow a power law (``--deal-skew``, 0 for
+uniform); statuses follow ``--deal-statuses`` and ``--task-statuses``, and
+creation dates fall between ``--start`` and ``--end``. Every user gets the
+password ``--password``.
+
+On PostgreSQL, chunks of ``CHUNK`` rows are streamed with COPY by
+``--workers`` processes, and ``--drop-indexes`` rebuilds the secondary
+indexes once at the end instead of updating them per row. Other databases
+get batched INSERTs from a single process. The same options and ``--seed``
+give the same rows whatever the number of workers.
+"""
+import argparse
+import io
+import math
+import multiprocessing
+import os
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from itertools import accumulate
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.engine import Engine
+
+from src.core.security import hash_password
+from src.enums import DealStatus, TaskStatus, UserRole
+from src.migrate import upgrade
+from src.models import Client, Deal, Task, User, role_priority_map
+
+CHUNK = 50_000
+VOCABULARY_SIZE = 1000
+
+COLUMNS = {
+    User: ('id', 'username', 'password', 'role', 'role_level'),
+    Client: ('id', 'user_id', 'name', 'email', 'phone', 'notes'),
+    Deal: ('id', 'client_id', 'title', 'status', 'value', 'created_at', 'updated_at', 'closed_at'),
+    Task: ('id', 'user_id', 'title', 'description', 'status', 'created_at', 'updated_at', 'due_date'),
+}
+MODELS = {model.__tablename__: model for model in COLUMNS}
+# Clients reference users, deals reference clients
+PHASES = [[User], [Client], [Deal, Task]]
+
+_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_count(value: str) -> int:
+    """``10k``, ``1M``, ``10M`` or a plain number."""
+    value = value.strip().lower().replace('_', '')
+    if value[-1:] in _SUFFIXES:
+        return int(float(value[:-1]) * _SUFFIXES[value[-1]])
+    return int(value)
+
+
+def _distribution(enum):
+    def parse(value: str) -> dict[str, float]:
+        weights = {}
+        for item in value.split(','):
+            name, _, weight = item.partition('=')
+            if name.strip() not in enum.__members__:
+                raise argparse.ArgumentTypeError(f'unknown {enum.__name__} {name.strip()!r}')
+            weights[name.strip()] = float(weight)
+        return weights
+    return parse
+
+
+def _day(value: str) -> datetime:
+    return datetime.combine(date.fromisoformat(value), datetime.min.time(), tzinfo=timezone.utc)
+
+
+_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _field(value) -> str:
+    """A value in the text format of COPY."""
+    if value is None:
+        return '\\N'
+    if value.__class__ is str:
+        return value.translate(_ESCAPES)
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def load(engine: Engine, model, rows: list[tuple]) -> None:
+    """Writes ``rows``, tuples in ``COLUMNS[model]`` order, in one transaction:
+    with COPY on PostgreSQL, as one executemany INSERT elsewhere."""
+    columns = COLUMNS[model]
+    if engine.dialect.name != 'postgresql':
+        with engine.begin() as conn:
+            conn.execute(insert(model), [dict(zip(columns, row)) for row in rows])
+        return
+
+    data = ''.join('\t'.join(map(_field, row)) + '\n' for row in rows)
+    sql = f'COPY {model.__tablename__} ({", ".join(columns)}) FROM STDIN'
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        if hasattr(cursor, 'copy_expert'):
+            # psycopg2
+            cursor.copy_expert(sql, io.StringIO(data))
+        else:
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(data)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def truncate(engine: Engine) -> None:
+    """Empties the four tables."""
+    with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql':
+            conn.execute(text('TRUNCATE users, clients, deals, tasks RESTART IDENTITY CASCADE'))
+        else:
+            for model in (Deal, Task, Client, User):
+                conn.execute(model.__table__.delete())
+
+
+def reset_sequences(engine: Engine) -> None:
+    """Moves the id sequences past the ids written explicitly."""
+    if engine.dialect.name != 'postgresql':
+        return
+    with engine.begin() as conn:
+        for table in MODELS:
+            conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                              f"COALESCE(MAX(id), 0) + 1, false) FROM {table}"))
+
+
+class Plan:
+    """What to generate: how many rows of each table, after which ids, and
+    how their values are distributed."""
+
+    def __init__(self, args: argparse.Namespace, offsets: dict[str, int]):
+        self.seed = args.seed
+        self.counts = {'users': args.users, 'clients': args.clients, 'deals': args.deals, 'tasks': args.tasks}
+        self.offsets = offsets
+        self.roles = args.roles
+        self.deal_statuses = args.deal_statuses
+        self.task_statuses = args.task_statuses
+        self.deal_skew = args.deal_skew
+        self.unassigned = args.unassigned
+        self.start = args.start
+        self.span = (args.end - args.start).total_seconds()
+        self.password = hash_password(args.password)
+
+    def ids(self, table: str) -> tuple[int, int]:
+        """First id and number of the rows generated for ``table``."""
+        return self.offsets[table] + 1, self.counts[table]
+
+
+class Generator:
+    """Rows of one chunk. Built once per worker process: the vocabulary
+    and the client weights are shared by its chunks."""
+
+    def __init__(self, plan: Plan):
+        from faker import Faker
+
+        self.plan = plan
+        fake = Faker()
+        fake.seed_instance(plan.seed)
+        self.first_names = [fake.first_name() for _ in range(VOCABULARY_SIZE)]
+        self.last_names = [fake.last_name() for _ in range(VOCABULARY_SIZE)]
+        self.companies = [fake.company() for _ in range(VOCABULARY_SIZE)]
+        self.domains = [fake.domain_name() for _ in range(VOCABULARY_SIZE)]
+        self.words = [fake.word() for _ in range(VOCABULARY_SIZE)]
+        self._client_weights = None
+
+    def _user_id(self, rng: random.Random) -> int | None:
+        first, count = self.plan.ids('users')
+        if not count or rng.random() < self.plan.unassigned:
+            return None
+        return first + rng.randrange(count)
+
+    def _created_at(self, rng: random.Random) -> datetime:
+        return self.plan.start + timedelta(seconds=rng.random() * self.plan.span)
+
+    def _client_ids(self, rng: random.Random, k: int) -> list[int]:
+        first, count = self.plan.ids('clients')
+        if not self.plan.deal_skew:
+            return [first + rng.randrange(count) for _ in range(k)]
+        if self._client_weights is None:
+            self._client_weights = list(accumulate(1 / rank ** self.plan.deal_skew
+                                                   for rank in range(1, count + 1)))
+            # Spreads the busiest clients over the ids instead of the first ones
+            self._stride = next(s for s in range(count // 2 + 1, 2 * count + 2) if math.gcd(s, count) == 1)
+        ranks = rng.choices(range(count), cum_weights=self._client_weights, k=k)
+        return [first + (rank + 1) * self._stride % count for rank in ranks]
+
+    def users(self, rng: random.Random, start: int, stop: int):
+        first, _ = self.plan.ids('users')
+        roles = rng.choices(list(self.plan.roles), weights=list(self.plan.roles.values()), k=stop - start)
+        for i, role in zip(range(start, stop), roles):
+            id = first + i
+            username = f'{rng.choice(self.first_names)}.{rng.choice(self.last_names)}.{id}'.lower()
+            yield (id, username, self.plan.password, role, role_priority_map[UserRole(role)])
+
+    def clients(self, rng: random.Random, start: int, stop: int):
+        first, _ = self.plan.ids('clients')
+        for i in range(start, stop):
+            id = first + i
+            notes = ' '.join(rng.choices(self.words, k=8)) if rng.random() < 0.1 else None
+            yield (id, self._user_id(rng), f'{rng.choice(self.companies)} {id}',
+                   f'contact{id}@{rng.choice(self.domains)}', f'+1{rng.randrange(2_000_000_000, 10_000_000_000)}',
+                   notes)
+
+    def deals(self, rng: random.Random, start: int, stop: int):
+        first, _ = self.plan.ids('deals')
+        statuses = rng.choices(list(self.plan.deal_statuses), weights=list(self.plan.deal_statuses.values()),
+                               k=stop - start)
+        client_ids = self._client_ids(rng, stop - start)
+        end = self.plan.start + timedelta(seconds=self.plan.span)
+        for i, status, client_id in zip(range(start, stop), statuses, client_ids):
+            id = first + i
+            created_at = self._created_at(rng)
+            closed_at = None
+            if status == DealStatus.closed:
+                closed_at = min(created_at + timedelta(days=rng.expovariate(1 / 30)), end)
+            updated_at = closed_at or created_at + (end - created_at) * rng.random()
+            yield (id, client_id, f'{rng.choice(self.words).capitalize()} {rng.choice(self.words)} {id}', status,
+                   int(rng.lognormvariate(9, 1.5)) + 1, created_at, updated_at, closed_at)
+
+    def tasks(self, rng: random.Random, start: int, stop: int):
+        first, _ = self.plan.ids('tasks')
+        statuses = rng.choices(list(self.plan.task_statuses), weights=list(self.plan.task_statuses.values()),
+                               k=stop - start)
+        for i, status in zip(range(start, stop), statuses):
+            id = first + i
+            created_at = self._created_at(rng)
+            due_date = created_at + timedelta(days=rng.randint(1, 60)) if rng.random() < 0.9 else None
+            yield (id, self._user_id(rng), f'{rng.choice(self.words).capitalize()} {rng.choice(self.words)} {id}',
+                   ' '.join(rng.choices(self.words, k=12)), status, created_at, created_at, due_date)
+
+    def chunk(self, table: str, start: int, stop: int) -> list[tuple]:
+        # Seeded by position, not by worker, so the rows do not depend on --workers
+        rng = random.Random(f'{self.plan.seed}:{table}:{start}')
+        return list(getattr(self, table)(rng, start, stop))
+
+
+_worker = {}
+
+
+def _init_worker(database_url: str, plan: Plan) -> None:
+    _worker['engine'] = create_engine(database_url)
+    _worker['generator'] = Generator(plan)
+
+
+def _load_chunk(job: tuple[str, int, int]) -> int:
+    table, start, stop = job
+    load(_worker['engine'], MODELS[table], _worker['generator'].chunk(table, start, stop))
+    return stop - start
+
+
+def _create_index(name: str) -> None:
+    _indexes()[name].create(bind=_worker['engine'], checkfirst=True)
+
+
+def _indexes() -> dict:
+    return {index.name: index for model in COLUMNS for index in model.__table__.indexes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--users', type=parse_count, default='100')
+    parser.add_argument('--clients', type=parse_count, default='10k')
+    parser.add_argument('--deals', type=parse_count, default='100k')
+    parser.add_argument('--tasks', type=parse_count, default='50k')
+    parser.add_argument('--roles', type=_distribution(UserRole), default='user=80,manager=15,admin=5')
+    parser.add_argument('--deal-statuses', type=_distribution(DealStatus), default='new=30,in_progress=40,closed=30')
+    parser.add_argument('--task-statuses', type=_distribution(TaskStatus), default='todo=40,doing=30,done=30')
+    parser.add_argument('--deal-skew', type=float, default=0.8,
+                        help='exponent of the power law of deals per client, 0 for uniform')
+    parser.add_argument('--unassigned', type=float, default=0.3, help='share of clients and tasks without user')
+    today = datetime.now(timezone.utc).date()
+    parser.add_argument('--start', type=_day, default=str(today - timedelta(days=730)))
+    parser.add_argument('--end', type=_day, default=str(today))
+    parser.add_argument('--password', default='generated-p!1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--truncate', action='store_true', help='empty the four tables first')
+    parser.add_argument('--drop-indexes', action='store_true',
+                        help='drop the secondary indexes during the load and rebuild them after')
+    args = parser.parse_args()
+    if args.deals and not args.clients:
+        parser.error('deals need --clients')
+    if args.end <= args.start:
+        parser.error('--end must be after --start')
+
+    upgrade(args.database_url)
+    engine = create_engine(args.database_url)
+    postgres = engine.dialect.name == 'postgresql'
+    if args.truncate:
+        truncate(engine)
+    with engine.connect() as conn:
+        offsets = {table: conn.scalar(select(func.coalesce(func.max(model.id), 0)))
+                   for table, model in MODELS.items()}
+    plan = Plan(args, offsets)
+
+    indexes = list(_indexes()) if args.drop_indexes and postgres else []
+    for name in indexes:
+        _indexes()[name].drop(bind=engine, checkfirst=True)
+
+    workers = max(args.workers, 1) if postgres else 1
+    started = time.perf_counter()
+    print(f'{"tables":14} {"rows":>11} {"seconds":>8} {"rows/s":>10}')
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(args.database_url, plan)) as pool:
+        for phase in PHASES:
+            phase_started = time.perf_counter()
+            tables = [model.__tablename__ for model in phase]
+            jobs = [(table, start, min(start + CHUNK, plan.counts[table]))
+                    for table in tables for start in range(0, plan.counts[table], CHUNK)]
+            rows = sum(pool.imap_unordered(_load_chunk, jobs))
+            elapsed = time.perf_counter() - phase_started
+            print(f'{"+".join(tables):14} {rows:11} {elapsed:8.1f} {rows / elapsed:10.0f}')
+        if indexes:
+            index_started = time.perf_counter()
+            pool.map(_create_index, indexes)
+            print(f'{"indexes":14} {len(indexes):11} {time.perf_counter() - index_started:8.1f}')
+
+    reset_sequences(engine)
+    if postgres:
+        with engine.begin() as conn:
+            conn.execute(text('ANALYZE users, clients, deals, tasks'))
+    print(f'{"total":14} {sum(plan.counts.values()):11} {time.perf_counter() - started:8.1f}')
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""Load test of a running instance with role personas and weighted scenarios.
+
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --rate 50 --ramp 30 --duration 120
+
+Logs in through ``/auth/login`` as the admin (``--admin``, by default
+ADMIN_NAME and ADMIN_PASSWORD) and as ``--accounts`` managers and users,
+which the admin creates on the first run. Scenarios then arrive in an open
+loop: their start times follow a Poisson process whose rate rises linearly
+from 0 to ``--rate`` per second during ``--ramp`` seconds and holds for
+``--duration``, whether or not earlier scenarios have finished. Every
+arrival picks a persona by the ``--roles`` weights and one of the scenarios
+its role may run by the ``--scenario`` weights:
+
+- dashboard: the polls of a start page, sent together;
+- search: a search in the lists the role can see;
+- take-client: lists unassigned clients and takes one;
+- update-deal: lists deals and sets the status of one;
+- bulk-cleanup: deletes done and expired tasks.
+
+The scenarios change data, so point them at a disposable database, e.g. one
+filled by ``python -m benchmarks.generate_data``. The report covers the time
+after the ramp: throughput, latency percentiles and the share of 4xx answers
+and of errors (5xx and failed connections) per operation_id. A 4xx is often
+expected, e.g. a client another persona took first. An arrival finding
+``--max-in-flight`` scenarios running in its process is dropped.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+
+import httpx
+
+ROLES = ('admin', 'manager', 'user')
+PASSWORD = 'loadtest-p!1'
+SEARCH_TERMS = ['an', 'ar', 'el', 'er', 'in', 'on', 'son', '1', '42']
+PAGE = 20
+
+
+class Scenario:
+
+    def __init__(self, run, roles: tuple[str, ...]):
+        self.run = run
+        self.roles = roles
+
+
+class Persona:
+    """One logged in account, with the client sending its requests."""
+
+    def __init__(self, client: httpx.AsyncClient, role: str, token: str, rng: random.Random,
+                 records: list, started: float):
+        self.client = client
+        self.role = role
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.rng = rng
+        self.records = records
+        self.started = started
+
+    async def request(self, operation_id: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        """Sends a request and records it; None when it got no answer."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.TransportError:
+            response = None
+        self.records.append((operation_id, started - self.started, time.perf_counter() - started,
+                             response.status_code if response is not None else 0))
+        return response
+
+
+def _items(response: httpx.Response | None, key: str) -> list[dict]:
+    if response is None or response.status_code != 200:
+        return []
+    return response.json().get(key) or []
+
+
+async def dashboard(persona: Persona) -> None:
+    polls = [persona.request('my-info', 'GET', '/users/me'),
+             persona.request('get-tasks', 'GET', '/tasks/get',
+                             params={'my_tasks': True, 'limit': PAGE})]
+    if persona.role != 'user':
+        params = {'related_to_me': True, 'limit': PAGE}
+        polls += [persona.request('get-all-clients', 'GET', '/clients/get', params=params),
+                  persona.request('get-all-deals', 'GET', '/deals/get-all', params=params)]
+    await asyncio.gather(*polls)
+
+
+async def search(persona: Persona) -> None:
+    params = {'search': persona.rng.choice(SEARCH_TERMS), 'limit': PAGE}
+    if persona.role == 'user':
+        await persona.request('get-tasks', 'GET', '/tasks/get', params=params)
+        return
+    await persona.request('get-all-clients', 'GET', '/clients/get', params=params)
+    await persona.request('get-all-deals', 'GET', '/deals/get-all', params=params)
+
+
+async def take_client(persona: Persona) -> None:
+    response = await persona.request('get-unassigned-clients', 'GET', '/clients/get/unassigned_clients',
+                                     params={'limit': PAGE})
+    clients = _items(response, 'clients')
+    if clients:
+        await persona.request('take-unassigned-client', 'PATCH', '/clients/patch/take',
+                              params={'client_id': persona.rng.choice(clients)['id']})
+
+
+async def update_deal(persona: Persona) -> None:
+    params = {'search': persona.rng.choice(SEARCH_TERMS), 'limit': PAGE}
+    if persona.role == 'manager':
+        params['related_to_me'] = True
+    deals = _items(await persona.request('get-all-deals', 'GET', '/deals/get-all', params=params), 'deals')
+    if deals:
+        await persona.request('set-status', 'PATCH', '/deals/patch/set-status',
+                              params={'deal_id': persona.rng.choice(deals)['id'],
+                                      'status': persona.rng.choice(['new', 'in_progress', 'closed'])})
+
+
+async def bulk_cleanup(persona: Persona) -> None:
+    await persona.request('delete-done-tasks', 'DELETE', '/tasks/delete-done-task')
+    await persona.request('delete-expired-tasks', 'DELETE', '/tasks/delete-expired-task')
+
+
+SCENARIOS = {
+    'dashboard': Scenario(dashboard, ROLES),
+    'search': Scenario(search, ROLES),
+    'take-client': Scenario(take_client, ROLES),
+    'update-deal': Scenario(update_deal, ('admin', 'manager')),
+    'bulk-cleanup': Scenario(bulk_cleanup, ('admin', 'manager')),
+}
+
+
+def weights(choices):
+    """Parses ``name=weight,...`` with names out of ``choices``."""
+    def parse(value: str) -> dict[str, float]:
+        parsed = {}
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            if name not in choices:
+                raise argparse.ArgumentTypeError(f'{name!r} is not one of {", ".join(choices)}')
+            parsed[name] = float(weight)
+        return parsed
+    return parse
+
+
+def arrivals(rng: random.Random, rate: float, ramp: float, end: float):
+    """Poisson arrival times with a rate rising linearly to ``rate`` over
+    ``ramp`` seconds, drawn by thinning a process of constant ``rate``."""
+    at = 0.0
+    while True:
+        at += rng.expovariate(rate)
+        if at >= end:
+            return
+        if at >= ramp or rng.random() < at / ramp:
+            yield at
+
+
+async def _load(url: str, personas: list[tuple[str, str]], plan: dict[str, list[tuple[str, float]]],
+                args, rate: float, seed: int) -> tuple[list, list[float], int]:
+    rng = random.Random(seed)
+    records, lags = [], []
+    dropped = 0
+    running = set()
+    by_role = {role: [token for persona_role, token in personas if persona_role == role] for role in plan}
+    roles = list(plan)
+    role_weights = [args.roles.get(role, 0) for role in roles]
+    limits = httpx.Limits(max_connections=args.max_in_flight)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        for at in arrivals(rng, rate, args.ramp, args.ramp + args.duration):
+            delay = started + at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lags.append(time.perf_counter() - started - at)
+            if len(running) >= args.max_in_flight:
+                dropped += at >= args.ramp
+                continue
+            role = rng.choices(roles, role_weights)[0]
+            names, scenario_weights = zip(*plan[role])
+            scenario = SCENARIOS[rng.choices(names, scenario_weights)[0]]
+            persona = Persona(client, role, rng.choice(by_role[role]), random.Random(rng.random()),
+                              records, started)
+            task = asyncio.create_task(scenario.run(persona))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    return records, lags, dropped
+
+
+def load(job: tuple) -> tuple[list, list[float], int]:
+    return asyncio.run(_load(*job))
+
+
+def login(client: httpx.Client, username: str, password: str) -> httpx.Response:
+    """Logs in, waiting out the login rate limit."""
+    while True:
+        response = client.post('/auth/login', data={'username': username, 'password': password})
+        if response.status_code != 429:
+            return response
+        time.sleep(float(response.headers.get('Retry-After', 1)))
+
+
+def personas(args) -> tuple[list[tuple[str, str]], list[float]]:
+    """Logs in the admin and the managers and users, creating the missing
+    ones. Every worker process shares these tokens, since logins are rate
+    limited per username and per IP."""
+    accounts = [(role, f'loadtest-{role}-{i}') for role in ('manager', 'user') for i in range(args.accounts)]
+    tokens, latencies = [], []
+    username, _, password = args.admin.partition(':')
+    with httpx.Client(base_url=args.url, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        response = login(client, username, password)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+        admin = {'Authorization': f'Bearer {response.json()["access_token"]}'}
+        tokens.append(('admin', response.json()['access_token']))
+
+        for role, username in accounts:
+            started = time.perf_counter()
+            response = login(client, username, PASSWORD)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code == 401:
+                client.post('/users/add', headers=admin,
+                            json={'username': username, 'role': role, 'password': PASSWORD}).raise_for_status()
+                response = login(client, username, PASSWORD)
+            response.raise_for_status()
+            tokens.append((role, response.json()['access_token']))
+    return tokens, latencies
+
+
+def percentile(ordered: list[float], share: float) -> float:
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+def report(records: list, duration: float) -> None:
+    by_operation = {}
+    for operation_id, latency, status in records:
+        by_operation.setdefault(operation_id, []).append((latency, status))
+    print(f'{"operation_id":<24}{"requests":>9}{"req/s":>9}{"p50 ms":>9}{"p90 ms":>9}'
+          f'{"p99 ms":>9}{"max ms":>9}{"4xx":>8}{"errors":>8}')
+    rows = sorted(by_operation.items()) + [('total', [result for results in by_operation.values()
+                                                      for result in results])]
+    for operation_id, results in rows:
+        ordered = sorted(latency * 1000 for latency, _ in results)
+        rejected = sum(400 <= status < 500 for _, status in results) / len(results)
+        errors = sum(status == 0 or status >= 500 for _, status in results) / len(results)
+        print(f'{operation_id:<24}{len(results):>9}{len(results) / duration:>9.1f}'
+              f'{percentile(ordered, 0.5):>9.1f}{percentile(ordered, 0.9):>9.1f}'
+              f'{percentile(ordered, 0.99):>9.1f}{ordered[-1]:>9.1f}{rejected:>8.1%}{errors:>8.1%}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--admin', default=f'{os.environ.get("ADMIN_NAME", "")}:{os.environ.get("ADMIN_PASSWORD", "")}',
+                        help='USERNAME:PASSWORD of an admin (default ADMIN_NAME and ADMIN_PASSWORD)')
+    parser.add_argument('--accounts', type=int, default=5, help='managers and users each to log in as')
+    parser.add_argument('--roles', type=weights(ROLES), default='admin=1,manager=3,user=6',
+                        help='weights of the personas starting a scenario')
+    parser.add_argument('--scenario', type=weights(list(SCENARIOS)),
+                        default='dashboard=50,search=25,take-client=10,update-deal=13,bulk-cleanup=2',
+                        help='weights of the scenarios')
+    parser.add_argument('--rate', type=float, default=20, help='scenarios started per second after the ramp')
+    parser.add_argument('--ramp', type=float, default=10, help='seconds to reach --rate')
+    parser.add_argument('--duration', type=float, default=60, help='seconds at --rate')
+    parser.add_argument('--processes', type=int, default=1, help='load generating processes sharing --rate')
+    parser.add_argument('--max-in-flight', type=int, default=256, help='running scenarios per process')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tokens, logins = personas(args)
+    logged_in = {persona_role for persona_role, _ in tokens}
+    plan = {role: [(name, weight) for name, weight in args.scenario.items()
+                   if weight > 0 and role in SCENARIOS[name].roles]
+            for role in ROLES if args.roles.get(role, 0) > 0 and role in logged_in}
+    plan = {role: scenarios for role, scenarios in plan.items() if scenarios}
+    if not plan:
+        parser.error('no persona may run any of the scenarios')
+    logins.sort()
+    print(f'{len(tokens)} personas logged in, login p50 {percentile(logins, 0.5) * 1000:.1f} ms')
+
+    jobs = [(args.url, tokens, plan, args, args.rate / args.processes, args.seed * 1000 + i)
+            for i in range(args.processes)]
+    with multiprocessing.Pool(args.processes) as pool:
+        results = pool.map(load, jobs)
+
+    # Only requests started after the ramp count
+    records = [(operation_id, latency, status) for result, _, _ in results
+               for operation_id, at, latency, status in result if at >= args.ramp]
+    if not records:
+        print('no requests after the ramp')
+        return
+    report(records, args.duration)
+    lags = sorted(lag * 1000 for _, result, _ in results for lag in result)
+    dropped = sum(dropped for _, _, dropped in results)
+    print(f'schedule lag p50 {percentile(lags, 0.5):.1f} ms  p99 {percentile(lags, 0.99):.1f} ms  '
+          f'{dropped} arrivals dropped')
+
+
+if __name__ == '__main__':
+    main()
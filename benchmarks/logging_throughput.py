@@ -0,0 +1,89 @@
+"""Requests/sec of a route that logs like a service method, per logging setup.
+
+Compares the handlers attached directly to the ``server`` logger (previous
+setup) with the QueueHandler pipeline for the dev and prod profiles.
+
+    python -m benchmarks.logging_throughput --requests 5000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.logger import LOG_PROFILES, setup_logging, stop_logging
+
+logger = logging.getLogger('server')
+
+app = FastAPI()
+
+
+def log_like_service(search: str) -> None:
+    logger.info('User %s requested info about all deals with attributes: search=%s', 'bench', search)
+    logger.debug('Trying to get all deals')
+    logger.debug('Add search filter (%s)', search)
+    logger.debug('Applying filters')
+    logger.debug('Applying sorting')
+    logger.debug('Counting total items')
+    logger.debug('Paginating')
+    logger.debug('Forming DealsListResponse')
+    logger.info('Success')
+
+
+@app.get("/bench")
+def bench(search: str = "value"):
+    log_like_service(search)
+    return {"status": "ok"}
+
+
+SETUPS = {
+    'direct-dev': (LOG_PROFILES['dev'], False),
+    'queue-dev': (LOG_PROFILES['dev'], True),
+    'direct-prod': (LOG_PROFILES['prod'], False),
+    'queue-prod': (LOG_PROFILES['prod'], True),
+}
+
+
+def run(name: str, requests: int) -> tuple[float, float]:
+    """Returns requests/sec through the app and microseconds the calling
+    thread spends in the logging calls of one request."""
+    path, use_queue = SETUPS[name]
+    setup_logging(default_path=str(path), use_queue=use_queue)
+    with TestClient(app) as client:
+        for _ in range(100):
+            client.get("/bench")
+        started = time.perf_counter()
+        for _ in range(requests):
+            client.get("/bench")
+        rps = requests / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        log_like_service("value")
+    caller_us = (time.perf_counter() - started) / requests * 1e6
+    stop_logging()
+    return rps, caller_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.pop('LOG_CFG', None)
+    os.chdir(tempfile.mkdtemp())
+    sys.stdout = open(os.devnull, 'w')
+
+    results = {name: run(name, args.requests) for name in SETUPS}
+
+    sys.stdout = sys.__stdout__
+    for name, (rps, caller_us) in results.items():
+        print(f'{name:<12} {rps:10.1f} req/s {caller_us:8.1f} us/request in logging calls')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Per-call cost of the repository lookups, legacy ``Query`` against ``lambda_stmt``.
+
+Runs every lookup ``--calls`` times on an in-memory SQLite database, so the
+figures are mostly Python: building the statement, finding its compiled
+form in the cache and loading the row.
+
+    python -m benchmarks.lookup_overhead --calls 20000
+"""
+import argparse
+import timeit
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.api.dependencies import get_current_user
+from src.core.security import create_access_token, verify_access_token
+from src.database import Base
+from src.enums import DealStatus, TaskStatus
+from src.models import Client, Deal, Task, User
+from src.repositories.clients_repository import ClientsRepository
+from src.repositories.deals_repository import DealsRepository
+from src.repositories.tasks_repository import TasksRepository
+from src.repositories.users_repository import UsersRepository
+
+
+def seed(db: Session) -> None:
+    user = User(username='benchmark', password='-', role='admin')
+    client = Client(name='benchmark', email='benchmark@example.com', phone='+10000000000')
+    db.add_all([user, client])
+    db.flush()
+    db.add(Deal(client_id=client.id, title='benchmark', status=DealStatus.new, value=1))
+    db.add(Task(user_id=user.id, title='benchmark', status=TaskStatus.todo))
+    db.commit()
+
+
+def legacy_current_user(token: str, db: Session) -> User:
+    payload = verify_access_token(token)
+    return db.query(User).filter(User.username == payload["sub"]).first()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    token = create_access_token({"sub": "benchmark"})
+    with Session(engine) as db:
+        seed(db)
+        lookups = {
+            'get_by_username': (
+                lambda: db.query(User).filter(User.username == 'benchmark').first(),
+                lambda: UsersRepository.get_by_username(db, 'benchmark')),
+            'get_by_name': (
+                lambda: db.query(Client).filter(Client.name == 'benchmark').first(),
+                lambda: ClientsRepository.get_by_name(db, 'benchmark')),
+            'deals.get_by_title': (
+                lambda: db.query(Deal).filter(Deal.title == 'benchmark').first(),
+                lambda: DealsRepository.get_by_title(db, 'benchmark')),
+            'tasks.get_by_title': (
+                lambda: db.query(Task).filter(Task.title == 'benchmark').first(),
+                lambda: TasksRepository.get_by_title(db, 'benchmark')),
+            'get_current_user': (
+                lambda: legacy_current_user(token, db),
+                lambda: get_current_user(token=token, db=db)),
+        }
+
+        print(f'{"lookup":20} {"query us":>9} {"lambda us":>10} {"saved":>7}')
+        for name, (legacy, current) in lookups.items():
+            assert legacy() is current() is not None
+            legacy_us = min(timeit.repeat(legacy, number=args.calls, repeat=3)) / args.calls * 1e6
+            current_us = min(timeit.repeat(current, number=args.calls, repeat=3)) / args.calls * 1e6
+            print(f'{name:20} {legacy_us:9.1f} {current_us:10.1f} {1 - current_us / legacy_us:7.0%}')
+
+
+if __name__ == '__main__':
+    main()
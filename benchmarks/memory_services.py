@@ -0,0 +1,145 @@
+"""Service calls per second on the in-memory repositories and on SQL.
+
+Fills a ``MemoryDatabase`` and ``--database-url`` (a SQLite file by default)
+with the same endpoint benchmark dataset of ``--rows`` deals, then times
+every service call of ``calls()`` on both. The memory figures are what the
+service layer costs by itself: its checks, the filters, the response models
+and logging. What SQL adds on top is the database, the driver and the ORM.
+SQL calls get a new session each, as a request does.
+
+    python -m benchmarks.memory_services --rows 100k
+    python -m benchmarks.memory_services --profile get-all-deals
+
+``--profile`` prints where the time of one call on the memory repositories
+goes instead.
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import tempfile
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+from itertools import cycle
+
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.endpoints.dataset import ADMIN_NAME, is_seeded, seed, seed_memory, sizes
+from benchmarks.generate_data import parse_count
+from src.database import make_engine
+from src.models import Client, Deal
+from src.repositories.memory.clients_repository import MemoryClientsRepository
+from src.repositories.memory.database import MemoryDatabase
+from src.repositories.memory.deals_repository import MemoryDealsRepository
+from src.repositories.memory.tasks_repository import MemoryTasksRepository
+from src.repositories.memory.users_repository import MemoryUsersRepository
+from src.repositories.users_repository import UsersRepository
+from src.services.clients_service import ClientsService
+from src.services.deals_service import DealsService
+from src.services.tasks_service import TasksService
+from src.services.users_service import UsersService
+
+MEMORY = dict(users_repository=MemoryUsersRepository, clients_repository=MemoryClientsRepository,
+              deals_repository=MemoryDealsRepository, tasks_repository=MemoryTasksRepository)
+
+
+def memory_services() -> dict:
+    return {service.__name__: service.using(**{name: repository for name, repository in MEMORY.items()
+                                               if hasattr(service, name)})
+            for service in (UsersService, ClientsService, DealsService, TasksService)}
+
+
+def sql_services() -> dict:
+    return {service.__name__: service for service in (UsersService, ClientsService, DealsService, TasksService)}
+
+
+def calls(services: dict, rows: dict, admin) -> dict:
+    """Service calls by operation id, each a function of ``db``."""
+    deals, clients = rows[Deal], rows[Client]
+    statuses = cycle(['new', 'in_progress', 'closed'])
+    month_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    deal_list = dict(current_user=admin, search=None, more_than=None, less_than=None, related_to_me=None,
+                     related_to_user=None, related_to_client=None)
+    Deals, Clients, Users, Tasks = (services[name] for name in
+                                    ('DealsService', 'ClientsService', 'UsersService', 'TasksService'))
+    return {
+        'get-deals-batch': lambda db: Deals.get_by_ids(db=db, ids=list(range(1, deals + 1, deals // 20 or 1))),
+        'get-all-deals': lambda db: Deals.get_all(
+            db=db, skip=1000 % deals, limit=20, sort_by='value', order='desc', **deal_list),
+        'get-all-deals-search': lambda db: Deals.get_all(
+            db=db, skip=0, limit=20, sort_by='id', order='asc', **{**deal_list, 'search': f'bench-deal-{deals}'}),
+        'get-deals-by-date': lambda db: Deals.get_by_date(
+            db=db, skip=0, limit=20, date_field='created_at', exact_date=None, earlier_than=None,
+            later_than=month_ago, new=False, sort_by='created_at', order='desc', **deal_list),
+        'get-client-overview': lambda db: Clients.get_overview(db=db, client_id=clients // 2 or 1),
+        'get-all-users': lambda db: Users.get_all(
+            db=db, skip=0, limit=20, role='manager', search=None, sort_by='username', order='asc'),
+        'get-tasks': lambda db: Tasks.get_all(
+            db=db, current_user=admin, skip=0, limit=20, search=None, related_to_user=None, my_tasks=False,
+            sort_by='id', order='asc'),
+        'set-status': lambda db: Deals.set_status(
+            status=next(statuses), db=db, current_user=admin, deal_id=deals // 3 or 1, title=None),
+    }
+
+
+def per_call_us(fn, repeat: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=parse_count, default='100k', help='deals in the dataset')
+    parser.add_argument('--database-url', default=f'sqlite:///{os.path.join(tempfile.gettempdir(), "crm-memory-bench.db")}',
+                        help='SQL database, seeded when it does not hold the dataset')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', metavar='OPERATION', help='profile one operation on the memory repositories')
+    args = parser.parse_args()
+
+    rows = sizes(args.rows)
+    memory_db = MemoryDatabase()
+    started = time.perf_counter()
+    seed_memory(memory_db, args.rows, args.seed)
+    print(f'{args.rows} deals in memory in {time.perf_counter() - started:.1f} s')
+    memory_calls = calls(memory_services(), rows, MemoryUsersRepository.get_by_username(memory_db, ADMIN_NAME))
+
+    if args.profile:
+        call = memory_calls[args.profile]
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _ in range(1000):
+            call(memory_db)
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+        return
+
+    engine = make_engine(args.database_url)
+    if not is_seeded(engine, args.rows):
+        started = time.perf_counter()
+        seed(engine, args.rows, args.seed)
+        print(f'seeded {args.database_url} in {time.perf_counter() - started:.1f} s')
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with SessionLocal() as db:
+        admin = UsersRepository.get_by_username(db, ADMIN_NAME)
+    sql_calls = calls(sql_services(), rows, admin)
+
+    def on_sql(call):
+        def run():
+            with SessionLocal() as db:
+                call(db)
+        return run
+
+    print(f'{"operation":22} {"memory us":>10} {"memory/s":>10} {"sql us":>10} {"sql/s":>8} {"db share":>9}')
+    for operation_id, call in memory_calls.items():
+        memory_us = per_call_us(lambda: call(memory_db), args.repeat)
+        sql_us = per_call_us(on_sql(sql_calls[operation_id]), args.repeat)
+        print(f'{operation_id:22} {memory_us:10.1f} {1e6 / memory_us:10.0f} {sql_us:10.1f} {1e6 / sql_us:8.0f}'
+              f' {1 - memory_us / sql_us:9.0%}')
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Share of a request's time its database connection is checked out.
+
+Fills a scratch SQLite database with ``--rows`` clients and serves
+``--requests`` requests for a page of all of them in-process, once with
+``RELEASE_SESSION_EARLY`` off (the connection is returned after the response
+is written) and once with it on (as soon as the service has loaded its rows).
+
+    python -m benchmarks.pool_utilization --rows 1000 --requests 50
+
+A pool of ``pool_size`` connections keeps up with about
+``pool_size / share`` requests in flight; the rest wait for a connection.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+DATABASE = os.path.join(tempfile.mkdtemp(), 'pool_utilization.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE}'
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from src.core.config import settings  # noqa: E402
+from src.core.security import create_access_token  # noqa: E402
+from src.database import Base, Session_local, engine  # noqa: E402
+from src.main import app  # noqa: E402
+from src.models import Client, User  # noqa: E402
+
+
+class CheckoutTimer:
+
+    def __init__(self):
+        self.held = 0.0
+        self._started = {}
+
+    def __enter__(self) -> "CheckoutTimer":
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(engine, "checkout", self._checkout)
+        event.remove(engine, "checkin", self._checkin)
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self._started[id(dbapi_connection)] = time.perf_counter()
+
+    def _checkin(self, dbapi_connection, connection_record) -> None:
+        started = self._started.pop(id(dbapi_connection), None)
+        if started is not None:
+            self.held += time.perf_counter() - started
+
+
+def seed(rows: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with Session_local() as db:
+        db.add(User(username=settings.ADMIN_NAME, password='-', role='admin'))
+        db.add_all(Client(name=f'client-{i}', email=f'client-{i}@example.com', phone=f'+1{i:09}')
+                   for i in range(rows))
+        db.commit()
+
+
+def measure(client: TestClient, path: str, requests: int) -> tuple[float, float]:
+    totals, held = [], []
+    for _ in range(requests):
+        with CheckoutTimer() as timer:
+            started = time.perf_counter()
+            client.get(path).raise_for_status()
+            totals.append(time.perf_counter() - started)
+        held.append(timer.held)
+    return statistics.median(totals) * 1000, statistics.median(held) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    path = f'/clients/get?limit={args.rows}'
+    token = create_access_token({"sub": settings.ADMIN_NAME})
+    try:
+        with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+            print(f'GET {path}, pool_size {engine.pool.size()}')
+            print(f'{"release at":10} {"request ms":>11} {"held ms":>9} {"share":>7} {"in flight":>10}')
+            for early in (False, True):
+                settings.RELEASE_SESSION_EARLY = early
+                measure(client, path, 3)
+                total_ms, held_ms = measure(client, path, args.requests)
+                share = held_ms / total_ms
+                label = 'rows' if early else 'response'
+                print(f'{label:10} {total_ms:11.1f} {held_ms:9.1f} {share:7.0%} {engine.pool.size() / share:10.1f}')
+    finally:
+        engine.dispose()
+        os.remove(DATABASE)
+
+
+if __name__ == '__main__':
+    main()
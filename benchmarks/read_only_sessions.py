@@ -0,0 +1,87 @@
+"""Cost of a GET request with and without the read-only session.
+
+Serves ``--requests`` requests of each ``--path`` in-process, once with
+``READ_ONLY_AUTOCOMMIT`` off (every request opens a transaction) and once
+with it on, against ``DATABASE_URL``. The database must be migrated; the
+requests authenticate as ``ADMIN_NAME``.
+
+    python -m benchmarks.read_only_sessions --requests 500
+
+Round trips are the statements sent plus BEGIN and ROLLBACK for every
+transaction opened, as drivers that begin implicitly (psycopg2, psycopg)
+send them. Latency is the median time of a request.
+"""
+import argparse
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.core.config import settings
+from src.core.security import create_access_token
+from src.database import engine
+from src.main import app
+
+PATHS = ['/users/me', '/users/get-all-users?limit=10', '/clients/get?limit=10', '/deals/get-all?limit=10']
+
+
+class RoundTrips:
+
+    def __init__(self):
+        self.statements = 0
+        self.transactions = 0
+
+    def __enter__(self) -> "RoundTrips":
+        event.listen(engine, "before_cursor_execute", self._statement)
+        event.listen(engine, "begin", self._begin)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(engine, "before_cursor_execute", self._statement)
+        event.remove(engine, "begin", self._begin)
+
+    def _statement(self, *args) -> None:
+        self.statements += 1
+
+    def _begin(self, conn) -> None:
+        if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+            self.transactions += 1
+
+    @property
+    def total(self) -> int:
+        return self.statements + 2 * self.transactions
+
+
+def measure(client: TestClient, path: str, requests: int) -> tuple[float, float]:
+    latencies = []
+    with RoundTrips() as round_trips:
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(path)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return round_trips.total / requests, statistics.median(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--path', action='append', help='route to request, repeatable')
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": settings.ADMIN_NAME})
+    with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+        print(f'{"path":32} {"round trips":>22} {"median latency ms":>24}')
+        for path in args.path or PATHS:
+            results = {}
+            for read_only in (False, True):
+                settings.READ_ONLY_AUTOCOMMIT = read_only
+                measure(client, path, min(args.requests, 20))
+                results[read_only] = measure(client, path, args.requests)
+            (trips_rw, ms_rw), (trips_ro, ms_ro) = results[False], results[True]
+            print(f'{path:32} {trips_rw:10.1f} -> {trips_ro:9.1f} {ms_rw:11.2f} -> {ms_ro:10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Throughput of the production server on SQLite, by journal settings.
+
+Seeds a SQLite file with the endpoint benchmark dataset (``--rows`` deals,
+100k by default, with clients, tasks and users in proportion), then starts
+``python -m src.server`` on it once per mode and loads it for ``--duration``
+seconds with ``--concurrency`` requests in flight. The requests are a mix of
+lists, searches, lookups and deal status updates, by the weights of ``MIX``.
+
+    python -m benchmarks.sqlite_throughput --rows 100k --duration 20
+
+Modes: ``wal`` is the default deployment (WAL journal, synchronous=NORMAL,
+memory-mapped reads), ``rollback`` the SQLite defaults (rollback journal,
+synchronous=FULL, no mmap). Pass ``--postgres-url`` to load a PostgreSQL
+database seeded with the same rows too.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.endpoints.dataset import ADMIN_NAME, PASSWORD, is_seeded, seed, sizes
+from benchmarks.generate_data import parse_count
+from benchmarks.worker_scaling import free_port, wait_until_ready
+from src.database import make_engine
+from src.models import Client, Deal, User
+
+MODES = {
+    'wal': {'SQLITE_JOURNAL_MODE': 'WAL', 'SQLITE_SYNCHRONOUS': 'NORMAL', 'SQLITE_MMAP_SIZE': str(256 * 1024 * 1024)},
+    'rollback': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_MMAP_SIZE': '0'},
+}
+
+
+def _mix(rows: dict):
+    """(operation_id, weight, request builder) of the workload."""
+    deals, clients, users = rows[Deal], rows[Client], rows[User]
+    return [
+        ('my-info', 10, lambda rng: ('GET', '/users/me', {})),
+        ('get-all-deals', 20, lambda rng: ('GET', '/deals/get-all', {
+            'skip': rng.randrange(deals - 20), 'limit': 20})),
+        ('get-all-deals', 10, lambda rng: ('GET', '/deals/get-all', {
+            'search': f'bench-deal-{rng.randint(1, deals)}', 'limit': 20})),
+        ('get-all-clients', 10, lambda rng: ('GET', '/clients/get', {
+            'related_to_user': f'bench-user-{rng.randint(1, users)}', 'limit': 20})),
+        ('get-tasks', 10, lambda rng: ('GET', '/tasks/get', {'skip': rng.randrange(1000), 'limit': 20})),
+        ('get-client-overview', 15, lambda rng: ('GET', f'/clients/{rng.randint(1, clients)}/overview', {})),
+        ('set-status', 25, lambda rng: ('PATCH', '/deals/patch/set-status', {
+            'deal_id': rng.randint(1, deals), 'status': rng.choice(['new', 'in_progress', 'closed'])})),
+    ]
+
+
+async def _load(url: str, token: str, mix: list, concurrency: int, duration: float, seed: int) -> dict:
+    results = {}
+    names, weights, builders = zip(*mix)
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=30) as client:
+        async def user(rng: random.Random):
+            while time.perf_counter() < deadline:
+                i = rng.choices(range(len(mix)), weights)[0]
+                method, path, params = builders[i](rng)
+                started = time.perf_counter()
+                try:
+                    status = (await client.request(method, path, params=params)).status_code
+                except httpx.TransportError:
+                    status = 0
+                latencies, errors = results.setdefault(names[i], ([], Counter()))
+                if status and status < 400:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[status] += 1
+
+        await asyncio.gather(*(user(random.Random(f'{seed}:{i}')) for i in range(concurrency)))
+    return results
+
+
+def run(database_url: str, env: dict, rows: dict, args) -> dict:
+    port = free_port()
+    # All requests come from one user, whose slot is freed only after the
+    # response is sent: leave headroom so the next request is not a 429
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'src.server'],
+        env={**os.environ, **env, 'DATABASE_URL': database_url, 'WORKERS': str(args.workers),
+             'BIND': f'127.0.0.1:{port}', 'MAX_IN_FLIGHT_PER_USER': str(2 * args.concurrency)},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f'http://127.0.0.1:{port}'
+        wait_until_ready(f'{url}/openapi.json')
+        response = httpx.post(f'{url}/auth/login', data={'username': ADMIN_NAME, 'password': PASSWORD})
+        response.raise_for_status()
+        token = response.json()['access_token']
+        mix = _mix(rows)
+        asyncio.run(_load(url, token, mix, args.concurrency, 1.0, args.seed))
+        return asyncio.run(_load(url, token, mix, args.concurrency, args.duration, args.seed))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _errors(errors: Counter) -> str:
+    # Status 0 is a failed connection; 503 and 429 are the server shedding load
+    by_status = ', '.join(f'{status}: {count}' for status, count in sorted(errors.items()))
+    return f'{errors.total()} errors' + (f' ({by_status})' if errors else '')
+
+
+def report(name: str, results: dict, duration: float) -> None:
+    total = sum(len(latencies) for latencies, _ in results.values())
+    errors = sum((errors for _, errors in results.values()), Counter())
+    print(f'{name}: {total / duration:.1f} req/s, {_errors(errors)}')
+    for operation_id, (latencies, errors) in sorted(results.items()):
+        if not latencies:
+            print(f'  {operation_id:<22}{0:>10.1f} req/s  {_errors(errors)}')
+            continue
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+        print(f'  {operation_id:<22}{len(latencies) / duration:>10.1f} req/s  p50 {p50:7.1f} ms'
+              f'  p99 {p99:7.1f} ms  {_errors(errors)}')
+
+
+def seeded(url: str, rows: int, seed_: int) -> None:
+    engine = make_engine(url)
+    try:
+        if not is_seeded(engine, rows):
+            started = time.perf_counter()
+            seed(engine, rows, seed_)
+            print(f'seeded {url} in {time.perf_counter() - started:.1f} s')
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=parse_count, default='100k', help='deals in the dataset')
+    parser.add_argument('--path', default=os.path.join(tempfile.gettempdir(), 'crm-sqlite-bench.db'),
+                        help='SQLite file, seeded when it does not hold the dataset')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--postgres-url', help='also load this PostgreSQL database')
+    parser.add_argument('--workers', type=int, default=1, help='server worker processes')
+    parser.add_argument('--concurrency', type=int, default=8, help='requests in flight')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rows = sizes(args.rows)
+    sqlite_url = f'sqlite:///{os.path.abspath(args.path)}'
+    print(f'{args.rows} deals, {rows[Client]} clients, {rows[User]} users; cpu count: {os.cpu_count()}')
+    seeded(sqlite_url, args.rows, args.seed)
+    for mode in args.modes:
+        report(f'sqlite {mode}', run(sqlite_url, MODES[mode], rows, args), args.duration)
+    if args.postgres_url:
+        seeded(args.postgres_url, args.rows, args.seed)
+        report('postgresql', run(args.postgres_url, {}, rows, args), args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Cold start time of one worker: importing ``src.main`` and serving the first request.
+
+Every run is a fresh interpreter, as a worker (re)start would be. The script
+exits with status 1 when the median total is over ``--budget-ms``, so it can
+gate CI.
+
+    python -m benchmarks.startup_time --runs 5 --budget-ms 1500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(src.main.app) as client:
+    status = client.get({path!r}).status_code
+served = time.perf_counter()
+print(json.dumps({{"import": imported - started, "first_request": served - imported, "status": status}}))
+"""
+
+
+def run(path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(path=path)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/openapi.json', help='route of the first request')
+    parser.add_argument('--budget-ms', type=float, default=1500)
+    args = parser.parse_args()
+
+    results = [run(args.path) for _ in range(args.runs)]
+    import_ms = statistics.median(result['import'] for result in results) * 1000
+    request_ms = statistics.median(result['first_request'] for result in results) * 1000
+    total_ms = import_ms + request_ms
+
+    print(f'import        {import_ms:8.1f} ms')
+    print(f'first request {request_ms:8.1f} ms (GET {args.path} -> {results[-1]["status"]})')
+    print(f'total         {total_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)')
+    sys.exit(0 if total_ms <= args.budget_ms else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Throughput of the production server (``python -m src.server``) by worker count.
+
+Starts the server with 1, 2, 4 and 8 workers in turn and loads it from
+``--clients`` processes keeping ``--concurrency`` requests in flight each.
+
+    python -m benchmarks.worker_scaling --duration 10 --path /openapi.json
+
+Pass ``--header "Authorization: Bearer <token>"`` to load an authenticated
+route. The client processes use CPU too, so run them on another machine
+when measuring more workers than half of the cores.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def _load(url: str, headers: dict, concurrency: int, duration: float) -> tuple[list[float], int]:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        async def user():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                except httpx.TransportError:
+                    errors += 1
+                    continue
+                if response.status_code < 400:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def load(args: tuple) -> tuple[list[float], int]:
+    return asyncio.run(_load(*args))
+
+
+def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server did not start in {timeout} s')
+
+
+def run(workers: int, args) -> tuple[float, float, float, int]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'src.server'],
+        env={**os.environ, 'WORKERS': str(workers), 'BIND': f'127.0.0.1:{port}'},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f'http://127.0.0.1:{port}{args.path}'
+        wait_until_ready(url)
+        headers = dict(header.split(': ', 1) for header in args.header)
+        with multiprocessing.Pool(args.clients) as pool:
+            pool.map(load, [(url, headers, args.concurrency, 1.0)] * args.clients)
+            results = pool.map(load, [(url, headers, args.concurrency, args.duration)] * args.clients)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(errors for _, errors in results)
+    rps = len(latencies) / args.duration
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    return rps, p50, p99, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--path', default='/openapi.json')
+    parser.add_argument('--header', action='append', default=[])
+    parser.add_argument('--clients', type=int, default=2, help='load generating processes')
+    parser.add_argument('--concurrency', type=int, default=32, help='requests in flight per client')
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    print(f'cpu count: {os.cpu_count()}')
+    for workers in args.workers:
+        rps, p50, p99, errors = run(workers, args)
+        print(f'{workers:>2} workers {rps:10.1f} req/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  {errors} errors')
+
+
+if __name__ == '__main__':
+    main()
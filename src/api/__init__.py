@@ -6,8 +6,9 @@ from src.api.clients import router as clients_router
 from src.api.deals import router as deals_router
 from src.api.tasks import router as tasks_router
 from src.api.auth import router as auth_router
-
-from src.database import Base, engine
+from src.api.batch import router as batch_router
+from src.api.metrics import router as metrics_router
+from src.api.admin import router as admin_router
 
 main_router = APIRouter()
 
@@ -21,5 +22,9 @@ logger.debug('Include deals router')
 main_router.include_router(deals_router)
 logger.debug('Include tasks router')
 main_router.include_router(tasks_router)
-
-Base.metadata.create_all(bind=engine)
+logger.debug('Include batch router')
+main_router.include_router(batch_router)
+logger.debug('Include metrics router')
+main_router.include_router(metrics_router)
+logger.debug('Include admin router')
+main_router.include_router(admin_router)
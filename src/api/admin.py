@@ -0,0 +1,57 @@
+from src.core.logger import logger
+from fastapi import APIRouter, Query, Depends
+from fastapi.responses import PlainTextResponse
+from src.api.dependencies import require_roles
+
+from src.services.admin_service import AdminService
+from src.models import User
+from src.schemas.admin import SlowQueriesResponse, RequestProfileStatusResponse
+
+
+router = APIRouter(tags=['Admin'])
+
+@router.get("/admin/slow-queries", response_model=SlowQueriesResponse, operation_id="get-slow-queries")
+async def get_slow_queries(
+    current_user: User = Depends(require_roles('admin')),
+    limit: int = Query(20, ge=1, le=200),
+    sort_by: str = Query("max_ms"),
+    ):
+    logger.info('User %s requested slow queries: limit=%s, sort_by=%s', current_user.username, limit, sort_by)
+    return AdminService.get_slow_queries(
+        limit=limit,
+        sort_by=sort_by,
+    )
+
+@router.delete("/admin/slow-queries", response_model=SlowQueriesResponse, operation_id="reset-slow-queries")
+async def reset_slow_queries(current_user: User = Depends(require_roles('admin'))):
+    logger.info('User %s requested to reset slow queries', current_user.username)
+    return AdminService.reset_slow_queries()
+
+@router.post("/admin/profile", response_class=PlainTextResponse, operation_id="profile-process")
+async def profile_process(
+    current_user: User = Depends(require_roles('admin')),
+    seconds: float = Query(10, gt=0, le=60),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    ):
+    logger.info('User %s requested process profile: seconds=%s, interval_ms=%s', current_user.username, seconds, interval_ms)
+    return await AdminService.profile_process(
+        seconds=seconds,
+        interval_ms=interval_ms,
+    )
+
+@router.post("/admin/profile/requests", response_model=RequestProfileStatusResponse, operation_id="profile-requests")
+async def arm_request_profile(
+    current_user: User = Depends(require_roles('admin')),
+    count: int = Query(100, ge=1, le=10000),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    ):
+    logger.info('User %s requested profile of next requests: count=%s, interval_ms=%s', current_user.username, count, interval_ms)
+    return AdminService.arm_request_profile(
+        count=count,
+        interval_ms=interval_ms,
+    )
+
+@router.get("/admin/profile/requests", response_class=PlainTextResponse, operation_id="get-request-profile")
+async def get_request_profile(current_user: User = Depends(require_roles('admin'))):
+    logger.info('User %s requested request profile', current_user.username)
+    return AdminService.get_request_profile()
@@ -1,19 +1,21 @@
 from src.core.logger import logger
 from fastapi import APIRouter, Depends, Form
-from src.api.dependencies import get_db, Session
+from src.api.dependencies import get_client_ip, get_db, Session
+from src.api.routing import SessionReleasingRoute
 
 from src.services.auth_service import AuthService
 
-router = APIRouter(tags=["Auth"])
+router = APIRouter(tags=["Auth"], route_class=SessionReleasingRoute)
 
 @router.post("/auth/login")
 async def login(
     username: str = Form(),
     password: str = Form(),
+    client_ip: str | None = Depends(get_client_ip),
     db: Session = Depends(get_db)
 ):
     logger.info('User %s trying to login', username)
-    return AuthService.login(db, username, password)
+    return AuthService.login(db, username, password, client_ip)
 
 
 @router.patch("/auth/change-password")
@@ -21,7 +23,8 @@ async def change_password(
     username: str,
     password: str,
     new_password: str,
+    client_ip: str | None = Depends(get_client_ip),
     db: Session = Depends(get_db)
 ): 
     logger.info('User %s requested password change', username)
-    return AuthService.change_password(db, username, password, new_password)
\ No newline at end of file
+    return AuthService.change_password(db, username, password, new_password, client_ip)
\ No newline at end of file
@@ -0,0 +1,24 @@
+from src.core.logger import logger
+from fastapi import APIRouter, Depends
+from src.api.dependencies import Session, get_db, get_current_user
+from src.api.routing import SessionReleasingRoute
+
+from src.services.batch_service import BatchService
+from src.models import User
+from src.schemas.batch import BatchRequest, BatchResponse
+
+router = APIRouter(tags=['Batch'], route_class=SessionReleasingRoute)
+
+@router.post("/batch", response_model=BatchResponse, operation_id="batch")
+async def batch(
+    batch: BatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    ):
+    logger.info('User %s requested batch of %s operations (atomic=%s)',
+                current_user.username, len(batch.operations), batch.atomic)
+    return BatchService.run(
+        db=db,
+        current_user=current_user,
+        batch=batch
+    )
@@ -1,14 +1,15 @@
 from src.core.logger import logger
 from fastapi import APIRouter, Query, Depends
 from src.api.dependencies import Session, get_db, get_current_user, require_roles
+from src.api.routing import SessionReleasingRoute
 
 from src.services.clients_service import ClientsService
 from src.enums import SortOrder
 from src.models import User
-from src.schemas.client import ClientCreate, ClientsListResponse, StatusClientsResponse
+from src.schemas.client import ClientCreate, ClientsListResponse, StatusClientsResponse, ClientOverviewResponse
 
 
-router = APIRouter(tags=['Clients'])
+router = APIRouter(tags=['Clients'], route_class=SessionReleasingRoute)
 
 @router.get("/clients/get", response_model=ClientsListResponse, operation_id="get-all-clients")
 async def get_all_clients(
@@ -38,6 +39,19 @@ async def get_all_clients(
         order=order
     )
 
+@router.get("/clients/batch", response_model=ClientsListResponse, operation_id="get-clients-batch")
+async def get_clients_batch(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles('admin', 'manager')),
+    ids: list[int] = Query(..., description="Ids of clients to return"),
+    ):
+    logger.info('User %s requested clients batch (%s ids)', 
+                current_user.username, len(ids))
+    return ClientsService.get_by_ids(
+        db=db,
+        ids=ids
+    )
+
 @router.get("/clients/get/unassigned_clients", response_model=ClientsListResponse, operation_id="get-unassigned-clients")
 async def get_unassigned_clients(db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user),
@@ -59,6 +73,19 @@ async def get_unassigned_clients(db: Session = Depends(get_db),
         order=order
     )
 
+@router.get("/clients/{client_id}/overview", response_model=ClientOverviewResponse, operation_id="get-client-overview")
+async def get_client_overview(
+    client_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles('admin', 'manager')),
+    ):
+    logger.info('User %s requested overview of client %s', 
+                current_user.username, client_id)
+    return ClientsService.get_overview(
+        db=db,
+        client_id=client_id
+    )
+
 @router.patch("/clients/patch/take", response_model=StatusClientsResponse, operation_id="take-unassigned-client")
 async def take_unassigned_client(
     db: Session = Depends(get_db), 
@@ -1,6 +1,7 @@
 from src.core.logger import logger
 from fastapi import APIRouter, Depends, Query
 from src.api.dependencies import Session, get_db, require_roles
+from src.api.routing import SessionReleasingRoute
 
 from src.services.deals_service import DealsService
 from datetime import datetime
@@ -8,7 +9,7 @@ from src.enums import SortOrder, DealStatus, DateColumn
 from src.models import User
 from src.schemas.deal import DealCreate, DealsListResponse, StatusDealsResponse
 
-router = APIRouter(tags=['Deals'])
+router = APIRouter(tags=['Deals'], route_class=SessionReleasingRoute)
 
 @router.get("/deals/get-all", response_model=DealsListResponse, operation_id="get-all-deals")
 async def get_all_deals(
@@ -46,6 +47,19 @@ async def get_all_deals(
         order=order
     )
 
+@router.get("/deals/batch", response_model=DealsListResponse, operation_id="get-deals-batch")
+async def get_deals_batch(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles('admin', 'manager')),
+    ids: list[int] = Query(..., description="Ids of deals to return"),
+    ):
+    logger.info('User %s requested deals batch (%s ids)', 
+                current_user.username, len(ids))
+    return DealsService.get_by_ids(
+        db=db,
+        ids=ids
+    )
+
 @router.get("/deals/get-by-date", response_model=DealsListResponse, operation_id="get-by-date")
 async def get_by_date(
     db: Session = Depends(get_db),
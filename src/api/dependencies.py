@@ -1,16 +1,66 @@
 from src.core.logger import logger
-from src.database import Session, Session_local
-from fastapi import Depends, HTTPException
+import ipaddress
+from src.core.config import settings
+from src.database import Session, Session_local, read_only
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from src.core.security import verify_access_token, JWTValidationError
 from src.models import User
+from src.repositories.users_repository import UsersRepository
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
 
-def get_db():
+
+def read_only_mode(request: Request) -> str | None:
+    """Mode of ``read_only`` for the session of a request, None when it may write."""
+    if not settings.READ_ONLY_AUTOCOMMIT or request.method not in READ_ONLY_METHODS:
+        return None
+    operation_id = getattr(request.scope.get("route"), "operation_id", None)
+    # A count and its page must see the same rows, and SET LOCAL statement_timeout
+    # needs a transaction: these routes keep one
+    if operation_id in settings.READ_ONLY_TRANSACTION_ROUTES or operation_id in settings.ROUTE_TIMEOUTS_MS:
+        return "transaction"
+    return "autocommit"
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    # Entries are addresses or networks, or host names compared as they are
+    for proxy in settings.TRUSTED_PROXIES:
+        try:
+            if ipaddress.ip_address(host) in ipaddress.ip_network(proxy, strict=False):
+                return True
+        except ValueError:
+            if host == proxy:
+                return True
+    return False
+
+
+def get_client_ip(request: Request) -> str | None:
+    """Address of the client. Behind ``TRUSTED_PROXIES`` it is the last
+    ``X-Forwarded-For`` entry not added by one of them: the entries before
+    it were sent by the client and can be anything."""
+    if request.client is None:
+        return None
+    host = request.client.host
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or not _is_trusted_proxy(host):
+        return host
+    for entry in reversed(forwarded.split(",")):
+        host = entry.strip()
+        if not _is_trusted_proxy(host):
+            break
+    return host
+
+
+def get_db(request: Request = None):
     logger.debug('Connecting to database')
     db: Session = Session_local()
+    mode = read_only_mode(request) if request is not None else None
+    if mode:
+        logger.debug('Read-only session: %s', mode)
+        read_only(db, mode)
     try:
         yield db
     finally:
@@ -26,7 +76,7 @@ def get_current_user(
     except JWTValidationError as e:
         raise HTTPException(status_code=401, detail=str(e))
 
-    user = db.query(User).filter(User.username == payload["sub"]).first()
+    user = UsersRepository.get_by_username(db, payload["sub"])
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
 
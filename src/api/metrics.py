@@ -0,0 +1,25 @@
+import hmac
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from src.core.config import settings
+from src.core.metrics import render_metrics
+
+router = APIRouter(tags=['Metrics'])
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def require_metrics_token(credentials: HTTPAuthorizationCredentials | None = Depends(bearer)):
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode(),
+                                                      settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+def metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
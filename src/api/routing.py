@@ -0,0 +1,47 @@
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Callable
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.core.logger import logger
+
+
+def _release_sessions(values) -> None:
+    for value in values:
+        if isinstance(value, Session):
+            # Returns the connection to the pool; what the service returned is
+            # already built from the loaded rows
+            value.close()
+
+
+def release_sessions_after(endpoint: Callable) -> Callable:
+    """Closes the sessions an endpoint received as soon as it returns, before
+    the response is validated, rendered and written."""
+    if iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if settings.RELEASE_SESSION_EARLY:
+                    logger.debug('Releasing database session')
+                    _release_sessions(kwargs.values())
+    else:
+        @wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if settings.RELEASE_SESSION_EARLY:
+                    logger.debug('Releasing database session')
+                    _release_sessions(kwargs.values())
+    return wrapper
+
+
+class SessionReleasingRoute(APIRoute):
+    """Route whose database connection is held for the time the endpoint
+    runs rather than the whole request."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, release_sessions_after(endpoint), **kwargs)
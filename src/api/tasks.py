@@ -1,6 +1,7 @@
 from src.core.logger import logger
 from fastapi import APIRouter, HTTPException, Depends, Query
 from src.api.dependencies import Session, get_db, get_current_user, require_roles
+from src.api.routing import SessionReleasingRoute
 
 from src.services.tasks_service import TasksService
 from datetime import datetime, timezone
@@ -8,7 +9,7 @@ from src.enums import SortOrder, TaskStatus
 from src.models import User, Task
 from src.schemas.task import TaskRead, TaskCreate, TasksListResponse, StatusTasksResponse
 
-router = APIRouter(tags=['Tasks'])
+router = APIRouter(tags=['Tasks'], route_class=SessionReleasingRoute)
 
 @router.get("/tasks/get", response_model=TasksListResponse, operation_id="get-tasks")
 async def get_tasks(
@@ -38,6 +39,19 @@ async def get_tasks(
         order=order
     )
 
+@router.get("/tasks/batch", response_model=TasksListResponse, operation_id="get-tasks-batch")
+async def get_tasks_batch(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    ids: list[int] = Query(..., description="Ids of tasks to return"),
+    ):
+    logger.info('User %s requested tasks batch (%s ids)',
+                current_user.username, len(ids))
+    return TasksService.get_by_ids(
+        db=db,
+        ids=ids
+    )
+
 @router.patch("/tasks/take", response_model=StatusTasksResponse, operation_id="take-task")
 async def take_task(
     db: Session = Depends(get_db),
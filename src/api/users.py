@@ -1,6 +1,7 @@
 from src.core.logger import logger
 from fastapi import APIRouter, Query, Depends
 from src.api.dependencies import Session, get_db, get_current_user, require_roles
+from src.api.routing import SessionReleasingRoute
 
 from src.services.users_service import UsersService
 from src.enums import UserRole, SortOrder
@@ -8,7 +9,7 @@ from src.models import User
 from src.schemas.user import UserCreate, UserRead, UsersListResponse, StatusUsersResponse
 
 
-router = APIRouter(tags=['Users'])
+router = APIRouter(tags=['Users'], route_class=SessionReleasingRoute)
 
 @router.get("/users/me", response_model=UserRead, operation_id="my-info")
 async def get_my_info(current_user: User = Depends(get_current_user)) -> UserRead:
@@ -38,6 +39,18 @@ async def get_all_users(
         order=order,
     )
 
+@router.get("/users/batch", response_model=UsersListResponse, operation_id="get-users-batch")
+async def get_users_batch(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles('admin', 'manager')),
+    ids: list[int] = Query(..., description="Ids of users to return"),
+    ):
+    logger.info('User %s requested users batch (%s ids)', current_user.username, len(ids))
+    return UsersService.get_by_ids(
+        db=db,
+        ids=ids,
+    )
+
 @router.get("/users/get-user-by-id/{user_id}", response_model=UsersListResponse, operation_id="get-user-by-id")
 async def get_user_by_id(user_id: int,
                         db: Session = Depends(get_db), 
@@ -0,0 +1,127 @@
+import asyncio
+import heapq
+import itertools
+from collections import defaultdict
+from time import monotonic
+
+from src.core.config import settings
+from src.core.metrics import ADMISSION_QUEUE_TIME, ADMISSION_QUEUED, ADMISSION_REJECTIONS
+
+HIGH, NORMAL, LOW = 0, 1, 2
+PRIORITY_NAMES = {HIGH: "high", NORMAL: "normal", LOW: "low"}
+
+
+class Rejected(Exception):
+
+    def __init__(self, status_code: int, reason: str, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+
+
+def route_priority(operation_id: str | None) -> int:
+    if operation_id in settings.HIGH_PRIORITY_ROUTES:
+        return HIGH
+    if operation_id in settings.LOW_PRIORITY_ROUTES:
+        return LOW
+    return NORMAL
+
+
+class AdmissionController:
+    """Caps the requests a worker serves at once (``MAX_IN_FLIGHT``) and per
+    user (``MAX_IN_FLIGHT_PER_USER``).
+
+    Requests over the worker cap wait in a priority queue, cheap routes
+    first, for at most ``QUEUE_TARGET_MS``. Low priority requests are shed
+    on arrival once the queue is already that far behind. Only touched from
+    the event loop thread, so it needs no locks.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.user_in_flight: dict[str, int] = defaultdict(int)
+        self._waiters: list = []
+        self._queued = 0
+        self._counter = itertools.count()
+
+    async def acquire(self, priority: int, user: str | None) -> None:
+        name = PRIORITY_NAMES[priority]
+        if user is not None:
+            if self.user_in_flight[user] >= settings.MAX_IN_FLIGHT_PER_USER:
+                ADMISSION_REJECTIONS.labels(name, "user_limit").inc()
+                raise Rejected(429, "user_limit", "Too many concurrent requests")
+            self.user_in_flight[user] += 1
+        try:
+            await self._acquire_slot(priority, name)
+        except BaseException:
+            self._release_user(user)
+            raise
+
+    def release(self, user: str | None) -> None:
+        self._release_user(user)
+        self._release_slot()
+
+    async def _acquire_slot(self, priority: int, name: str) -> None:
+        if self.in_flight < settings.MAX_IN_FLIGHT and not self._queued:
+            self.in_flight += 1
+            ADMISSION_QUEUE_TIME.labels(name).observe(0)
+            return
+
+        target = settings.QUEUE_TARGET_MS / 1000
+        if priority == LOW and self._oldest_wait() > target:
+            ADMISSION_REJECTIONS.labels(name, "overload").inc()
+            raise Rejected(503, "overload", "Server overloaded, retry later")
+
+        enqueued = monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), enqueued, waiter))
+        self._queued += 1
+        ADMISSION_QUEUED.inc()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), target)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._abandon(waiter)
+                ADMISSION_REJECTIONS.labels(name, "queue_timeout").inc()
+                raise Rejected(503, "queue_timeout", "Server overloaded, retry later")
+        except BaseException:
+            if waiter.done():
+                # Cancelled after being handed a slot: pass it on
+                self._release_slot()
+            else:
+                self._abandon(waiter)
+            raise
+        finally:
+            ADMISSION_QUEUED.dec()
+            ADMISSION_QUEUE_TIME.labels(name).observe(monotonic() - enqueued)
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)[3]
+            if not waiter.done():
+                # Hand the slot over without dropping in_flight
+                self._queued -= 1
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _abandon(self, waiter) -> None:
+        waiter.cancel()
+        self._queued -= 1
+        if not self._queued:
+            self._waiters.clear()
+
+    def _release_user(self, user: str | None) -> None:
+        if user is None:
+            return
+        self.user_in_flight[user] -= 1
+        if not self.user_in_flight[user]:
+            del self.user_in_flight[user]
+
+    def _oldest_wait(self) -> float:
+        live = [enqueued for _, _, enqueued, waiter in self._waiters if not waiter.done()]
+        return monotonic() - min(live) if live else 0.0
+
+
+admission = AdmissionController()
@@ -1,21 +1,68 @@
-from src.core.logger import logger
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     TEST_DATABASE_URL: str
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5
+    REPLICA_CONNECT_TIMEOUT_SECONDS: int = 2
+    READ_ONLY_AUTOCOMMIT: bool = True
+    READ_ONLY_TRANSACTION_ROUTES: list[str] = [
+        "get-all-users", "get-all-clients", "get-unassigned-clients", "get-client-overview",
+        "get-all-deals", "get-by-date", "get-tasks",
+    ]
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    RELEASE_SESSION_EARLY: bool = True
     JWT_SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     ALGORITHM: str
     ADMIN_NAME: str
     ADMIN_PASSWORD: str
     ADMIN_ROLE: str
+    PASSWORD_HASH_PROFILE: str = "default"
+    BATCH_MAX_IDS: int = 100
+    BATCH_MAX_OPERATIONS: int = 100
+    QUERY_COUNT_WARNING_THRESHOLD: int = 20
+    N_PLUS_ONE_THRESHOLD: int = 5
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0
+    SLOW_QUERY_LOG_SIZE: int = 200
+    METRICS_TOKEN: str = ""
+    PROFILER_INTERVAL_MS: float = 5
+    STARTUP_WARMUP: bool = False
+    REQUEST_TIMEOUT_MS: int = 30000
+    ROUTE_TIMEOUTS_MS: dict[str, int] = {}
+    DEADLINE_GRACE_MS: int = 1000
+    MAX_IN_FLIGHT: int = 64
+    MAX_IN_FLIGHT_PER_USER: int = 8
+    QUEUE_TARGET_MS: int = 500
+    HIGH_PRIORITY_ROUTES: list[str] = ["my-info", "get-user-by-id", "get-user-by-username"]
+    LOW_PRIORITY_ROUTES: list[str] = [
+        "get-all-users", "get-all-clients", "get-unassigned-clients", "get-client-overview",
+        "get-all-deals", "get-by-date", "get-tasks", "batch",
+        "get-users-batch", "get-clients-batch", "get-deals-batch", "get-tasks-batch",
+    ]
+    RATE_LIMIT_STORAGE: str = "memory://"
+    AUTH_RATE_LIMIT_PER_USERNAME: int = 5
+    AUTH_RATE_LIMIT_PER_IP: int = 20
+    TRUSTED_PROXIES: list[str] = []
+    BIND: str = "0.0.0.0:8000"
+    WORKERS: int = 0
+    WORKER_LOOP: str = "auto"
+    WORKER_HTTP: str = "auto"
+    WORKER_TIMEOUT: int = 60
+    GRACEFUL_TIMEOUT: int = 30
+    KEEPALIVE: int = 5
+    MAX_REQUESTS: int = 10000
+    MAX_REQUESTS_JITTER: int = 1000
 
-    logger.info('Getting settings from env')
     model_config = SettingsConfigDict(
         env_file="./.env",
         env_file_encoding="utf-8"
     )
-    logger.info('Success')
 
 settings = Settings()
@@ -0,0 +1,151 @@
+from src.core.logger import logger
+import heapq
+import itertools
+import threading
+from contextvars import ContextVar
+from time import monotonic
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool, PoolProxiedConnection
+
+from src.core.config import settings
+from src.core.metrics import REQUEST_TIMEOUTS
+
+QUERY_CANCELED_SQLSTATE = "57014"
+
+
+def route_timeout_ms(operation_id: str | None) -> int:
+    return settings.ROUTE_TIMEOUTS_MS.get(operation_id, settings.REQUEST_TIMEOUT_MS)
+
+
+class RequestDeadline:
+    """Time budget of one request and the pooled connections it is running
+    queries on, so they can be cancelled when the budget runs out or the
+    client goes away.
+
+    A connection is untracked before it goes back to the pool, and
+    ``cancel`` runs under the same lock, so it never reaches a connection
+    another request has checked out since."""
+
+    def __init__(self, operation_id: str | None, timeout_ms: int):
+        self.operation_id = operation_id
+        self.timeout_ms = timeout_ms
+        self.expires_at = monotonic() + timeout_ms / 1000
+        self.connections: dict[tuple[int, int], object] = {}
+        self.reason: str | None = None
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def remaining_ms(self) -> int:
+        return max(int((self.expires_at - monotonic()) * 1000), 1)
+
+    def track(self, key: tuple[int, int], connection: PoolProxiedConnection) -> None:
+        with self._lock:
+            # Shared with the pool entry, which outlives this checkout
+            connection.info["deadline"] = self
+            self.connections[key] = connection.dbapi_connection
+
+    def untrack(self, session_id: int | None = None, dbapi_connection=None) -> None:
+        with self._lock:
+            for key in [key for key, tracked in self.connections.items()
+                        if key[0] == session_id or tracked is dbapi_connection]:
+                del self.connections[key]
+
+    def finish(self) -> None:
+        with self._lock:
+            self.finished = True
+            self.connections.clear()
+
+    def cancel(self, reason: str) -> None:
+        """Cancels the queries in flight. Runs outside the request's thread:
+        psycopg ``cancel()`` and sqlite3 ``interrupt()`` are thread-safe."""
+        with self._lock:
+            if self.reason is not None or self.finished:
+                return
+            self.reason = reason
+            REQUEST_TIMEOUTS.labels(self.operation_id or "", reason).inc()
+            logger.warning('Cancelling %s queries of %s: %s', len(self.connections), self.operation_id, reason)
+            for dbapi_connection in self.connections.values():
+                cancel = getattr(dbapi_connection, "cancel", None) or getattr(dbapi_connection, "interrupt", None)
+                try:
+                    cancel()
+                except Exception as e:
+                    logger.warning('Failed to cancel query: %s', str(e))
+
+
+class DeadlineWatchdog:
+    """Cancels the queries of requests that outlive their deadline.
+
+    A thread rather than an event loop timer: the async route handlers run
+    their queries on the event loop thread, which stays blocked until the
+    query returns.
+    """
+
+    def __init__(self):
+        self._heap: list = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def watch(self, deadline: RequestDeadline) -> None:
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="deadline-watchdog", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (deadline.expires_at, next(self._counter), deadline))
+            if self._heap[0][2] is deadline:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                expires_at, _, deadline = self._heap[0]
+                delay = expires_at - monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            deadline.cancel("deadline")
+
+
+watchdog = DeadlineWatchdog()
+
+current_deadline: ContextVar[RequestDeadline | None] = ContextVar("current_deadline", default=None)
+
+
+def is_query_canceled(exc) -> bool:
+    orig = getattr(exc, "orig", None)
+    sqlstate = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return sqlstate == QUERY_CANCELED_SQLSTATE or str(orig) == "interrupted"
+
+
+@event.listens_for(Session, "after_begin")
+def _track_connection(session, transaction, connection):
+    deadline = current_deadline.get()
+    if deadline is None:
+        return
+    # A session reading from a replica holds one connection per engine
+    deadline.track((id(session), id(connection.engine)), connection.connection)
+    # The connection default covers REQUEST_TIMEOUT_MS; only routes with their
+    # own budget pay for the extra round trip
+    if connection.dialect.name == "postgresql" and deadline.operation_id in settings.ROUTE_TIMEOUTS_MS:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {deadline.remaining_ms()}")
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _untrack_connection(session, transaction):
+    deadline = current_deadline.get()
+    if deadline is not None and transaction.parent is None:
+        deadline.untrack(session_id=id(session))
+
+
+@event.listens_for(Pool, "checkin")
+def _untrack_checkin(dbapi_connection, connection_record):
+    # Fires before the connection is back in the pool, and after_transaction_end
+    # only after; the record knows its deadline even when garbage collection
+    # checks it in from another thread
+    deadline = connection_record.info.pop("deadline", None)
+    if deadline is not None:
+        deadline.untrack(dbapi_connection=dbapi_connection)
@@ -0,0 +1,77 @@
+import json
+import logging
+import random
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+request_id_var: ContextVar[str] = ContextVar('request_id', default='-')
+
+_record_factory = logging.getLogRecordFactory()
+
+
+def _record_with_request_id(*args, **kwargs):
+    record = _record_factory(*args, **kwargs)
+    record.request_id = request_id_var.get()
+    return record
+
+
+logging.setLogRecordFactory(_record_with_request_id)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, truncating long fields."""
+
+    def __init__(self, max_field_length=1024, **kwargs):
+        super().__init__(**kwargs)
+        self.max_field_length = max_field_length
+
+    def _cap(self, value: str) -> str:
+        if len(value) <= self.max_field_length:
+            return value
+        return f'{value[:self.max_field_length]}...[{len(value) - self.max_field_length} more]'
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': self._cap(record.getMessage()),
+            'location': f'{record.filename}:{record.lineno}',
+        }
+        if record.exc_info:
+            entry['exception'] = self._cap(self.formatException(record.exc_info))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of records at or below ``max_level``.
+
+    ``rates`` maps logger names to the fraction to keep; the most specific
+    name wins, so ``server.api`` overrides ``server``. The decision is made per
+    request id, so a sampled request keeps all of its lines.
+    """
+
+    def __init__(self, rates=None, max_level='INFO'):
+        super().__init__()
+        self.rates = rates or {}
+        self.max_level = logging.getLevelName(max_level)
+
+    def _rate(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return self.rates.get('', 1.0)
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0:
+            return True
+        request_id = getattr(record, 'request_id', '-')
+        if request_id == '-':
+            return random.random() < rate
+        return zlib.crc32(request_id.encode()) % 10000 < rate * 10000
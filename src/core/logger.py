@@ -1,16 +1,33 @@
+import atexit
 import logging
 import logging.config
+import logging.handlers
+import queue
 import yaml
 import os
 from pathlib import Path
+import src.core.log_handlers  # noqa: F401 - installs the request id record factory
+
+CONFIG_DIR = Path(__file__).parent
+
+LOG_PROFILES = {
+    'dev': CONFIG_DIR / 'log_config.yaml',
+    'prod': CONFIG_DIR / 'log_config.prod.yaml',
+}
+
+_listeners: list[logging.handlers.QueueListener] = []
+
 
 def setup_logging(
-        default_path='log_config.yaml',
+        default_path=None,
         default_level=logging.DEBUG,
-        env_key='LOG_CFG'
+        env_key='LOG_CFG',
+        use_queue=True
 ):
     
-    path = os.getenv(env_key, default_path)
+    stop_logging()
+    profile = os.getenv('LOG_PROFILE', 'dev')
+    path = os.getenv(env_key, default_path or LOG_PROFILES.get(profile, LOG_PROFILES['dev']))
     if os.path.exists(path):
         with open(path, 'rt') as f:
             config = yaml.safe_load(f)
@@ -19,10 +36,35 @@ def setup_logging(
         log_dir.mkdir(exist_ok=True)
 
         logging.config.dictConfig(config)
+        if use_queue:
+            for name in [None, *config.get('loggers', {})]:
+                _enqueue_handlers(logging.getLogger(name))
     else:
         logging.basicConfig(level=default_level)
 
 
-setup_logging()
+def _enqueue_handlers(target: logging.Logger):
+    """Moves the handlers of ``target`` behind a QueueHandler so formatting
+    and console/file I/O run on a background thread instead of the caller's."""
+    handlers = target.handlers[:]
+    if not handlers:
+        return
+
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        target.removeHandler(handler)
+    target.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+def stop_logging():
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_logging)
 
 logger = logging.getLogger('server')
@@ -0,0 +1,110 @@
+import os
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# With PROMETHEUS_MULTIPROC_DIR set, every worker process writes its samples
+# to that directory and /metrics aggregates them, so a scrape hitting any
+# worker reports the totals for the whole server.
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "operation_id"]
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum"
+)
+RESPONSES = Counter(
+    "http_responses_total",
+    "HTTP responses by status code",
+    ["method", "route", "status"]
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Argon2 hashing and verification time",
+    ["operation"]
+)
+REQUEST_TIMEOUTS = Counter(
+    "http_request_timeouts_total",
+    "Requests cut short by a deadline, statement timeout, pool timeout or client disconnect",
+    ["operation_id", "reason"]
+)
+ADMISSION_QUEUE_TIME = Histogram(
+    "http_admission_queue_seconds",
+    "Time requests waited for a worker slot",
+    ["priority"],
+    buckets=(0, .001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5)
+)
+ADMISSION_QUEUED = Gauge(
+    "http_admission_queued",
+    "Requests waiting for a worker slot",
+    multiprocess_mode="livesum"
+)
+ADMISSION_REJECTIONS = Counter(
+    "http_admission_rejections_total",
+    "Requests shed by admission control",
+    ["priority", "reason"]
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by result",
+    ["cache", "result"]
+)
+
+
+class PoolCollector:
+    """Connections of a database pool by state, read when /metrics is scraped.
+
+    With several workers, these are the connections of the worker answering
+    the scrape: the multiprocess files only hold samples written beforehand.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        connections = GaugeMetricFamily("db_pool_connections", "Database pool connections by state",
+                                        labels=["state"])
+        pool = self.engine.pool
+        if hasattr(pool, "checkedout"):
+            connections.add_metric(["checked_out"], pool.checkedout())
+            connections.add_metric(["idle"], pool.checkedin())
+            connections.add_metric(["overflow"], max(pool.overflow(), 0))
+        yield connections
+
+
+# Collectors computing their samples at scrape time, in multiprocess mode too
+_scrape_collectors = []
+
+
+def register_scrape_collector(collector) -> None:
+    _scrape_collectors.append(collector)
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        REGISTRY.register(collector)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _scrape_collectors:
+            registry.register(collector)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,137 @@
+import os
+import sys
+import threading
+from collections import Counter
+
+from src.core.config import settings
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Leaf frames of threads that are parked rather than doing work: the event loop
+# waiting in select(), threadpool workers waiting for a job, the log listener
+# waiting for a record. uvloop runs its loop in C, so while it waits in epoll
+# the leaf Python frame is the one that started it: asyncio.Runner.run, or
+# uvicorn's own asyncio_run before Python 3.11.
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("runners.py", "run"),
+    ("_compat.py", "asyncio_run"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("handlers.py", "dequeue"),
+}
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of all threads every ``interval`` seconds
+    from a background thread.
+
+    Idle threads are skipped, and ``collapsed()`` returns one
+    ``frame;frame;frame count`` line per stack, the input format of
+    ``flamegraph.pl`` and speedscope.
+    """
+
+    def __init__(self, interval: float | None = None):
+        self.interval = interval if interval is not None else settings.PROFILER_INTERVAL_MS / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_ident)
+
+    def _sample(self, own_ident: int) -> None:
+        self.samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+
+
+class RequestProfiles:
+    """Profiles the next ``count`` requests into one aggregated profile.
+
+    The sampler only runs while at least one of the claimed requests is in
+    flight, and a new profile cannot be armed until they have all finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.profiler: SamplingProfiler | None = None
+        self.remaining = 0
+        self.in_flight = 0
+        self.completed = 0
+
+    def arm(self, count: int, interval: float | None = None) -> bool:
+        with self._lock:
+            if self.in_flight:
+                return False
+            self.profiler = SamplingProfiler(interval)
+            self.remaining = count
+            self.in_flight = 0
+            self.completed = 0
+            return True
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            self.in_flight += 1
+            if self.in_flight == 1:
+                self.profiler.start()
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            if self.in_flight == 0:
+                self.profiler.stop()
+
+
+request_profiles = RequestProfiles()
@@ -0,0 +1,63 @@
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.core.config import settings
+from src.core.metrics import DB_QUERY_DURATION
+from src.core.slow_queries import slow_query_log
+
+
+class QueryStats:
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, times) for statement, times in self.statements.items()
+                if times >= threshold]
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start_time"] = perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = perf_counter() - conn.info.get("query_start_time", perf_counter())
+    DB_QUERY_DURATION.observe(duration)
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        slow_query_log.record(conn, statement, parameters, duration)
+
+
+class QueryCounter(QueryStats):
+    """Counts every statement executed on ``engine`` while the block is active,
+    regardless of the thread or task running it."""
+
+    def __init__(self, engine: Engine):
+        super().__init__()
+        self.engine = engine
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "after_cursor_execute", self._after_cursor_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.record(statement, perf_counter() - conn.info.get("query_start_time", perf_counter()))
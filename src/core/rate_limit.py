@@ -0,0 +1,186 @@
+from src.core.logger import logger
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from time import time
+
+from src.core.config import settings
+
+
+class RateLimitBackend(ABC):
+    """Token bucket storage. ``take`` removes one token from ``key`` and
+    returns 0, or returns the seconds until a token is available."""
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        ...
+
+    @abstractmethod
+    def reset(self) -> None:
+        ...
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: int, rate: float) -> tuple[float, float]:
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets of this process only: each worker counts separately.
+
+    Like the rows of ``SqliteBackend``, every bucket records when it will be
+    full again, which is the same as no bucket. Past ``MAX_KEYS`` buckets,
+    those are dropped, and the next scan waits until the table has grown by
+    as many buckets as it kept."""
+
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._prune_at = self.MAX_KEYS
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens, wait = _refill(tokens, updated, now, capacity, refill_per_second)
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_second)
+            if len(self._buckets) > self._prune_at:
+                self._prune(now)
+        return wait
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._prune_at = self.MAX_KEYS
+
+    def _prune(self, now: float) -> None:
+        full = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+        for key in full:
+            del self._buckets[key]
+        self._prune_at = max(self.MAX_KEYS, 2 * len(self._buckets))
+
+
+class SqliteBackend(RateLimitBackend):
+    """Buckets in an SQLite file shared by the workers of one host; put it
+    on a tmpfs such as /dev/shm.
+
+    Every row records when its bucket will be full again, and rows past that
+    time, which are the same as no row, are deleted every
+    ``PRUNE_INTERVAL`` seconds. When the file stays locked for longer than
+    ``BUSY_TIMEOUT``, the attempt is counted in this worker's own buckets
+    instead, so the limit still applies, per worker."""
+
+    BUSY_TIMEOUT = 1
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._fallback = MemoryBackend()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS token_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                         "updated REAL NOT NULL, full_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS token_buckets_full_at ON token_buckets (full_at)")
+            self._local.conn = conn
+            self._local.pruned = 0.0
+        return conn
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        try:
+            return self._take(key, capacity, refill_per_second)
+        except sqlite3.OperationalError as e:
+            logger.warning('Rate limit storage %s unavailable (%s), counting in this worker', self.path, e)
+            return self._fallback.take(key, capacity, refill_per_second)
+
+    def _take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        conn = self._connection()
+        now = time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM token_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, wait = _refill(tokens, updated, now, capacity, refill_per_second)
+            conn.execute("INSERT OR REPLACE INTO token_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                         (key, tokens, now, now + (capacity - tokens) / refill_per_second))
+            if now - self._local.pruned >= self.PRUNE_INTERVAL:
+                conn.execute("DELETE FROM token_buckets WHERE full_at <= ?", (now,))
+                self._local.pruned = now
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def reset(self) -> None:
+        self._connection().execute("DELETE FROM token_buckets")
+        self._fallback.reset()
+
+
+class RedisBackend(RateLimitBackend):
+    """Buckets in Redis (or a compatible server), shared by every worker of
+    every host. Needs the ``redis`` package."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + (now - updated) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str, prefix: str = "rate-limit:"):
+        import redis
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        return float(self._script(keys=[self.prefix + key], args=[capacity, refill_per_second]))
+
+    def reset(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+
+def create_backend(url: str) -> RateLimitBackend:
+    if url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith("sqlite:///"):
+        return SqliteBackend(url.removeprefix("sqlite:///"))
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported rate limit storage: {url}")
+
+
+class RateLimiter:
+
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+
+    def hit(self, key: str, per_minute: int) -> float:
+        """Counts one attempt against a bucket of ``per_minute`` tokens refilled
+        over a minute; returns 0 when allowed, else seconds to wait."""
+        return self.backend.take(key, per_minute, per_minute / 60)
+
+    def reset(self) -> None:
+        self.backend.reset()
+
+
+auth_limiter = RateLimiter(create_backend(settings.RATE_LIMIT_STORAGE))
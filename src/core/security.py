@@ -2,20 +2,32 @@ from src.core.logger import logger
 from passlib.context import CryptContext
 from datetime import datetime, timezone, timedelta
 from src.core.config import settings
+from src.core.metrics import PASSWORD_HASH_DURATION
 import jwt
 
-argon2_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Argon2 costs per PASSWORD_HASH_PROFILE. "fast" is for test suites only: its
+# hashes take microseconds to compute, and so to brute-force. Verifying uses
+# the costs stored in each hash, so both profiles verify each other's hashes.
+HASH_PROFILES = {
+    "default": {},
+    "fast": {"argon2__time_cost": 1, "argon2__memory_cost": 8, "argon2__parallelism": 1},
+}
+
+argon2_context = CryptContext(schemes=["argon2"], deprecated="auto",
+                              **HASH_PROFILES[settings.PASSWORD_HASH_PROFILE])
 
 class JWTValidationError(Exception):
     pass
 
 def hash_password(password: str) -> str:
     logger.debug('Hashing password')
-    return argon2_context.hash(password)
+    with PASSWORD_HASH_DURATION.labels("hash").time():
+        return argon2_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     logger.debug('Verifying password')
-    return argon2_context.verify(plain_password, hashed_password)
+    with PASSWORD_HASH_DURATION.labels("verify").time():
+        return argon2_context.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict) -> str:
     logger.debug('Creating acess token')
@@ -34,5 +46,5 @@ def verify_access_token(token: str) -> dict:
         exp_datetime = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
         return payload if exp_datetime >= datetime.now(timezone.utc) else None
     except jwt.PyJWTError:
-        raise JWTValidationError(status_code=401, detail="Invalid or expired token")
+        raise JWTValidationError("Invalid or expired token")
     
\ No newline at end of file
@@ -0,0 +1,148 @@
+from src.core.logger import logger
+import os
+import queue
+import random
+import re
+import sys
+import threading
+from time import time
+
+from src.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+# Items are literals or placeholders, including pyformat ones: %(ids_1_1)s
+_IN_LIST = re.compile(r"\bIN \((?:[^()]|\(\w+\))*\)", re.IGNORECASE)
+_SERVICES_DIR = f"{os.sep}services{os.sep}"
+
+
+def normalize(statement: str) -> str:
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def redact(parameters):
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return [redact(parameters[0]), f"... {len(parameters)} rows"]
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def calling_service_method() -> str | None:
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if _SERVICES_DIR in code.co_filename:
+            return getattr(code, "co_qualname", code.co_name)
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Aggregates statements slower than ``SLOW_QUERY_THRESHOLD_MS`` by their
+    normalized text, keeping the slowest ``SLOW_QUERY_LOG_SIZE`` of them.
+
+    Sampled ``EXPLAIN ANALYZE`` runs go through one worker thread, one at a
+    time: a sample taken while another statement is being explained, or of a
+    statement that already has a plan, is dropped. The plans run the query
+    again, and must not pile up on a database that is already slow.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._explain_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._explaining: str | None = None
+        self._worker: threading.Thread | None = None
+
+    def record(self, conn, statement: str, parameters, duration: float) -> None:
+        if statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+
+        normalized = normalize(statement)
+        caller = calling_service_method()
+        duration_ms = duration * 1000
+        logger.warning('Slow query (%.1f ms) in %s: %s', duration_ms, caller, normalized[:500])
+
+        with self._lock:
+            entry = self._entries.get(normalized)
+            if entry is None:
+                entry = self._entries[normalized] = {
+                    "statement": normalized,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "caller": caller,
+                    "parameters": None,
+                    "last_seen": None,
+                    "explain": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["last_seen"] = time()
+            if duration_ms >= entry["max_ms"]:
+                entry["max_ms"] = duration_ms
+                entry["caller"] = caller
+                entry["parameters"] = redact(parameters)
+            self._trim()
+
+        if (conn.dialect.name == "postgresql"
+                and normalized[:6].upper() == "SELECT"
+                and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE):
+            self._submit_explain(conn.engine, statement, parameters, normalized)
+
+    def top(self, limit: int, order_by: str = "max_ms") -> list[dict]:
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry[order_by], reverse=True)
+            return [dict(entry) for entry in entries[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _trim(self) -> None:
+        overflow = len(self._entries) - settings.SLOW_QUERY_LOG_SIZE
+        if overflow > 0:
+            fastest = sorted(self._entries, key=lambda key: self._entries[key]["max_ms"])[:overflow]
+            for key in fastest:
+                del self._entries[key]
+
+    def _submit_explain(self, engine, statement: str, parameters, normalized: str) -> None:
+        with self._lock:
+            entry = self._entries.get(normalized)
+            if self._explaining is not None or entry is None or entry["explain"] is not None:
+                return
+            self._explaining = normalized
+            # Started on first use, so every forked worker process gets its own
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._explain_worker, name="slow-query-explain",
+                                                daemon=True)
+                self._worker.start()
+        self._explain_queue.put_nowait((engine, statement, parameters, normalized))
+
+    def _explain_worker(self) -> None:
+        while True:
+            engine, statement, parameters, normalized = self._explain_queue.get()
+            try:
+                self._explain(engine, statement, parameters, normalized)
+            finally:
+                with self._lock:
+                    self._explaining = None
+
+    def _explain(self, engine, statement: str, parameters, normalized: str) -> None:
+        try:
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+                conn.rollback()
+        except Exception as e:
+            logger.warning('Failed to explain slow query: %s', str(e))
+            return
+
+        with self._lock:
+            entry = self._entries.get(normalized)
+            if entry is not None:
+                entry["explain"] = "\n".join(row[0] for row in rows)
+
+
+slow_query_log = SlowQueryLog()
@@ -1,11 +1,262 @@
-from sqlalchemy import create_engine
+import threading
+from functools import cache
+from itertools import count
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from src.core.config import settings
+from src.core.logger import logger
 
-engine = create_engine(settings.DATABASE_URL)
 
-Session_local = sessionmaker(autoflush=False, 
+def _connect_args(url: str, connect_timeout: int | None = None) -> dict:
+    if url.startswith("postgresql"):
+        # Default budget of every statement; routes with their own one SET LOCAL it
+        args = {"options": f"-c statement_timeout={settings.REQUEST_TIMEOUT_MS}"}
+        if connect_timeout is not None:
+            args["connect_timeout"] = connect_timeout
+        return args
+    if url.startswith("sqlite"):
+        # A connection serves one thread at a time, but not always the same one:
+        # sessions are closed, and queries interrupted, from other threads
+        return {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000, "check_same_thread": False}
+    return {}
+
+
+def _engine_url(url: str) -> str:
+    if "+psycopg_async" in url.split("://", 1)[0]:
+        raise ValueError("Sessions are synchronous: use postgresql+psycopg:// rather than "
+                         "postgresql+psycopg_async://")
+    return url
+
+
+def _configure_sqlite(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # pysqlite would BEGIN only before a write, so the first SAVEPOINT of a
+        # transaction would start one of its own and RELEASE would commit it
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+        dbapi_connection.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        dbapi_connection.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        dbapi_connection.execute(f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}")
+        # ON DELETE CASCADE and SET NULL are only enforced with foreign keys on
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        options = conn.get_execution_options()
+        if options.get("isolation_level") != "AUTOCOMMIT":
+            # IMMEDIATE takes the write lock now, waiting up to the busy timeout. A
+            # deferred transaction that has read fails at its first write, without
+            # waiting, when another connection has committed meanwhile. Read-only
+            # sessions never write, and take no lock. Sent on the driver
+            # connection, uncounted like the implicit BEGIN of other drivers
+            conn.connection.driver_connection.execute("BEGIN" if options.get("read_only") else "BEGIN IMMEDIATE")
+
+
+def make_engine(url: str, connect_timeout: int | None = None, **kwargs) -> Engine:
+    """Creates the engine of a database URL. SQLite gets the settings of a
+    single node deployment: WAL journal, ``synchronous=NORMAL``, memory-mapped
+    reads, a busy timeout and real transactions around SAVEPOINTs.
+    ``connect_timeout`` (seconds) bounds opening a PostgreSQL connection."""
+    engine = create_engine(_engine_url(url), connect_args=_connect_args(url, connect_timeout), **kwargs)
+    if engine.dialect.name == "sqlite":
+        _configure_sqlite(engine)
+    return engine
+
+
+REPLICA_LAG_QUERY = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.healthy = True
+
+    def lag_seconds(self) -> float:
+        # Autocommit: no transaction to open, nor a write lock on SQLite
+        with _autocommit(self.engine).connect() as conn:
+            if conn.dialect.name != "postgresql":
+                conn.exec_driver_sql("SELECT 1")
+                return 0.0
+            return float(conn.exec_driver_sql(REPLICA_LAG_QUERY).scalar() or 0)
+
+    def check(self) -> None:
+        try:
+            lag = self.lag_seconds()
+            healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not healthy:
+                logger.warning('Replica %s is %.1fs behind', self.engine.url.host, lag)
+        except Exception as e:
+            logger.warning('Replica %s is unreachable: %s', self.engine.url.host, e)
+            healthy = False
+        if healthy != self.healthy:
+            logger.info('Replica %s is %s', self.engine.url.host, "back" if healthy else "out")
+        self.healthy = healthy
+
+
+class ReplicaSet:
+    """Read replicas used in turn. A replica that cannot be reached or lags
+    more than ``REPLICA_MAX_LAG_SECONDS`` behind the primary is skipped until
+    a later check finds it back.
+
+    Checks run in a background thread every ``REPLICA_CHECK_INTERVAL_SECONDS``
+    once ``start`` is called, so choosing a replica never waits on one."""
+
+    def __init__(self, engines: list[Engine]):
+        self.replicas = [Replica(engine) for engine in engines]
+        self._next = count()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Checks every replica once, then starts the checking thread."""
+        if not self.replicas or (self._thread is not None and self._thread.is_alive()):
+            return
+        self.check()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-checks", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self) -> None:
+        for replica in self.replicas:
+            replica.check()
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.REPLICA_CHECK_INTERVAL_SECONDS):
+            self.check()
+
+    def choose(self) -> Engine | None:
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.healthy:
+                return replica.engine
+        return None
+
+    def dispose(self, close: bool = True) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose(close=close)
+
+
+class RoutingSession(Session):
+    """Sends the SELECTs of a session marked with ``prefer_replica`` to a
+    replica. Everything else goes to the primary: writes, the flushes of
+    the ORM and, once the session has written, its reads too, so a request
+    always sees its own changes."""
+
+    def __init__(self, *args, replicas: ReplicaSet | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (self.replicas is not None
+                and self.info.get("prefer_replica")
+                and not self.info.get("wrote")
+                and not self._flushing
+                and clause is not None
+                and clause.is_select):
+            if "replica" not in self.info:
+                # Sticky for the session: one snapshot per request
+                self.info["replica"] = self.replicas.choose()
+            if self.info["replica"] is not None:
+                mode = self.info.get("read_only")
+                return _read_only_bind(self.info["replica"], mode) if mode else self.info["replica"]
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_bulk_written(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "before_flush")
+def _refuse_read_only_flush(session, flush_context, instances):
+    if session.info.get("read_only"):
+        raise InvalidRequestError("Cannot flush a read-only session")
+
+
+@cache
+def _autocommit(engine: Engine) -> Engine:
+    return engine.execution_options(isolation_level="AUTOCOMMIT")
+
+
+@cache
+def _read_only_transactions(engine: Engine) -> Engine:
+    if engine.dialect.name == "postgresql":
+        # psycopg2 and psycopg then open transactions with BEGIN READ ONLY
+        return engine.execution_options(postgresql_readonly=True)
+    return engine.execution_options(read_only=True)
+
+
+def _read_only_bind(engine: Engine, mode: str) -> Engine:
+    return _autocommit(engine) if mode == "autocommit" else _read_only_transactions(engine)
+
+
+def read_only(db: Session, mode: str = "autocommit") -> None:
+    """Marks ``db`` as only reading, and refuses to flush it.
+
+    In ``"autocommit"`` mode every statement runs in its own implicit
+    transaction, which saves the BEGIN and ROLLBACK round trips of a request
+    that sends one query. In ``"transaction"`` mode the statements share one
+    read-only transaction, and so one snapshot: ``BEGIN READ ONLY`` on
+    PostgreSQL, a deferred ``BEGIN`` that takes no write lock on SQLite. A
+    session bound to a connection rather than an engine stays in the
+    connection's transaction."""
+    db.info["read_only"] = mode
+    if isinstance(db.bind, Engine):
+        db.bind = _read_only_bind(db.bind, mode)
+
+
+def release_connection(db: Session) -> None:
+    """Returns the connection of ``db`` to the pool once a service has loaded
+    its rows, so building the response does not hold it. The loaded objects
+    stay readable; a later query checks out a connection again."""
+    if settings.RELEASE_SESSION_EARLY:
+        db.close()
+
+
+def prefer_replica(db: Session) -> None:
+    """Lets the reads of ``db`` go to a replica until it writes."""
+    db.info["prefer_replica"] = True
+
+
+engine = make_engine(settings.DATABASE_URL)
+
+replicas = ReplicaSet([make_engine(url, connect_timeout=settings.REPLICA_CONNECT_TIMEOUT_SECONDS, pool_pre_ping=True)
+                       for url in settings.DATABASE_REPLICA_URLS])
+
+Session_local = sessionmaker(class_=RoutingSession,
+                             autoflush=False, 
                              autocommit=False, 
-                             bind=engine)
+                             # Committed objects keep their values: no refresh SELECT per write
+                             expire_on_commit=False,
+                             bind=engine,
+                             replicas=replicas)
 
 Base = declarative_base()
+
+
+def warm_up():
+    """Opens the first pool connection ahead of the first request."""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
@@ -1,18 +1,82 @@
-from src.core.logger import logger
+from src.core.logger import logger, setup_logging
+import logging
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from src.api import main_router
+from src.core.config import settings
+from src.core.deadlines import current_deadline, is_query_canceled
+from src.core.metrics import REQUEST_TIMEOUTS, PoolCollector, register_scrape_collector
+from src.database import engine, replicas, warm_up
+from src.middleware import (
+    AdmissionMiddleware,
+    DeadlineMiddleware,
+    MetricsMiddleware,
+    ProfilerMiddleware,
+    QueryStatsMiddleware,
+    RequestIdMiddleware
+)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Leave logging alone when the process running the app has configured it
+    if not logging.getLogger().handlers:
+        setup_logging()
+    logger.info('Initializing the application')
+    if settings.STARTUP_WARMUP:
+        logger.debug('Warming up database connection')
+        await run_in_threadpool(warm_up)
+    await run_in_threadpool(replicas.start)
+    yield
+    logger.info('Shutting down the application')
+    replicas.stop()
+    engine.dispose()
+    replicas.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc: RequestValidationError):
     msg = exc.errors()[0]["msg"]
     raise HTTPException(status_code=400, detail=msg)
 
+@app.exception_handler(OperationalError)
+async def query_canceled_handler(request, exc: OperationalError):
+    if not is_query_canceled(exc):
+        raise exc
+    deadline = current_deadline.get()
+    reason = deadline.reason if deadline and deadline.reason else "statement_timeout"
+    if reason == "statement_timeout":
+        operation_id = getattr(request.scope.get("route"), "operation_id", None) or ""
+        REQUEST_TIMEOUTS.labels(operation_id, reason).inc()
+    logger.warning('Query of %s %s canceled: %s', request.method, request.url.path, reason)
+    return JSONResponse(status_code=504, content={"detail": f"Query canceled: {reason}"})
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request, exc: PoolTimeoutError):
+    operation_id = getattr(request.scope.get("route"), "operation_id", None) or ""
+    REQUEST_TIMEOUTS.labels(operation_id, "pool_timeout").inc()
+    logger.warning('No database connection available for %s %s', request.method, request.url.path)
+    return JSONResponse(status_code=503, content={"detail": "Database busy, retry later"},
+                        headers={"Retry-After": "1"})
+
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(RequestIdMiddleware)
+# Outermost, to count the requests shed or cut short by the middleware above
+app.add_middleware(MetricsMiddleware)
 app.include_router(main_router)
 
+register_scrape_collector(PoolCollector(engine))
+
 if __name__ == "__main__":
-    logger.info('Initializing the application')
-    uvicorn.run("src.main:app", host="0.0.0.0", log_config="src/core/log_config.yaml")
+    setup_logging()
+    uvicorn.run("src.main:app", host="0.0.0.0", log_config=None)
@@ -0,0 +1,6 @@
+from src.middleware.admission import AdmissionMiddleware
+from src.middleware.deadline import DeadlineMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.profiler import ProfilerMiddleware
+from src.middleware.query_stats import QueryStatsMiddleware
+from src.middleware.request_id import RequestIdMiddleware
@@ -0,0 +1,53 @@
+from src.core.logger import logger
+import json
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.admission import Rejected, admission, route_priority
+from src.core.security import verify_access_token, JWTValidationError
+from src.middleware.routes import matched_operation_id
+
+
+def _token_subject(scope: Scope) -> str | None:
+    """Username of a valid bearer token. Only the signature is checked, so
+    the limit applies before the database is touched."""
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = verify_access_token(token)
+    except JWTValidationError:
+        return None
+    return payload.get("sub") if payload else None
+
+
+class AdmissionMiddleware:
+    """Admits requests through the worker's ``AdmissionController`` and
+    sheds the rest with 429/503 and ``Retry-After``."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        operation_id = matched_operation_id(scope)
+        user = _token_subject(scope)
+        try:
+            await admission.acquire(route_priority(operation_id), user)
+        except Rejected as e:
+            logger.warning('Rejected %s %s (user=%s): %s', scope["method"], scope["path"], user, e.reason)
+            await send({
+                "type": "http.response.start",
+                "status": e.status_code,
+                "headers": [(b"content-type", b"application/json"), (b"retry-after", b"1")],
+            })
+            await send({"type": "http.response.body", "body": json.dumps({"detail": e.detail}).encode()})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(user)
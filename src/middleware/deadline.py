@@ -0,0 +1,112 @@
+import json
+import anyio
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.deadlines import RequestDeadline, current_deadline, route_timeout_ms, watchdog
+from src.core.config import settings
+from src.middleware.routes import matched_operation_id
+
+
+def _has_body(scope: Scope) -> bool:
+    headers = dict(scope["headers"])
+    return b"transfer-encoding" in headers or headers.get(b"content-length", b"0") != b"0"
+
+
+class DeadlineMiddleware:
+    """Enforces the route's time budget and cancels the request's queries
+    when it runs out or the client disconnects.
+
+    On expiry the watchdog cancels the queries, so the handler fails with a
+    504 and releases its session normally. A handler still running
+    ``DEADLINE_GRACE_MS`` later is abandoned. This is pure ASGI rather than
+    ``BaseHTTPMiddleware`` because it has to own the receive channel to hear
+    the disconnect while the handler runs.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        operation_id = matched_operation_id(scope)
+        deadline = RequestDeadline(operation_id, route_timeout_ms(operation_id))
+        token = current_deadline.set(deadline)
+        watchdog.watch(deadline)
+
+        has_body = _has_body(scope)
+        body_done = anyio.Event()
+        disconnected = anyio.Event()
+        app_done = anyio.Event()
+        pending: list[Message] = []
+        response = {"started": False, "complete": False}
+        app_error: list[BaseException] = []
+
+        async def receive_wrapper() -> Message:
+            if has_body and not body_done.is_set():
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                if message["type"] == "http.disconnect" or not message.get("more_body", False):
+                    body_done.set()
+                return message
+            await body_done.wait()
+            if pending:
+                return pending.pop()
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["started"] = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response["complete"] = True
+            await send(message)
+
+        async def watch_disconnect() -> None:
+            if has_body:
+                await body_done.wait()
+                message = {"type": "http.disconnect"} if disconnected.is_set() else await receive()
+            else:
+                pending.append(await receive())
+                body_done.set()
+                message = pending[0] if pending[0]["type"] == "http.disconnect" else await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+                if not response["complete"]:
+                    await run_in_threadpool(deadline.cancel, "client_disconnect")
+
+        async def run_app() -> None:
+            try:
+                await self.app(scope, receive_wrapper, send_wrapper)
+            except Exception as e:
+                app_error.append(e)
+            finally:
+                app_done.set()
+
+        try:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(watch_disconnect)
+                tg.start_soon(run_app)
+                with anyio.move_on_after((deadline.timeout_ms + settings.DEADLINE_GRACE_MS) / 1000):
+                    await app_done.wait()
+                tg.cancel_scope.cancel()
+        finally:
+            deadline.finish()
+            current_deadline.reset(token)
+
+        if app_error:
+            raise app_error[0]
+        if not app_done.is_set() and not response["started"]:
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [(b"content-type", b"application/json")],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": json.dumps({"detail": "Request deadline exceeded"}).encode(),
+            })
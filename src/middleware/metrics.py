@@ -0,0 +1,43 @@
+from time import perf_counter
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import REQUEST_LATENCY, REQUESTS_IN_PROGRESS, RESPONSES
+from src.middleware.routes import matched_route
+
+
+class MetricsMiddleware:
+    """Records latency, status codes and in-flight requests per route template.
+
+    It is the outermost middleware, so the requests shed by admission control
+    and those cut short by a deadline are counted too. Pure ASGI rather than
+    ``BaseHTTPMiddleware``, which would get in the way of the deadline
+    middleware owning the receive channel.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        REQUESTS_IN_PROGRESS.inc()
+        started = perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            route = matched_route(scope)
+            path = getattr(route, "path", "unmatched")
+            operation_id = getattr(route, "operation_id", None) or ""
+            REQUEST_LATENCY.labels(scope["method"], path, operation_id).observe(perf_counter() - started)
+            RESPONSES.labels(scope["method"], path, str(status)).inc()
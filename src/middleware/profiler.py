@@ -0,0 +1,57 @@
+from src.core.logger import logger
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from src.api.dependencies import get_db, get_current_user, require_roles, oauth2_scheme
+from src.core.profiler import SamplingProfiler, request_profiles
+
+
+class ProfilerMiddleware(BaseHTTPMiddleware):
+    """Feeds requests to a profile armed through ``/admin/profile/requests``
+    and, for admins, replaces the response of a ``?profile=1`` request with
+    its collapsed stacks."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.query_params.get("profile") in ("1", "true"):
+            return await self._profile_request(request, call_next)
+
+        if request.url.path.startswith("/admin/profile") or not request_profiles.claim():
+            return await call_next(request)
+        try:
+            return await call_next(request)
+        finally:
+            request_profiles.release()
+
+    async def _profile_request(self, request: Request, call_next):
+        try:
+            token = await oauth2_scheme(request)
+            user = await run_in_threadpool(self._authorize, request, token)
+        except HTTPException as e:
+            return JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+
+        logger.info('User %s requested profile of %s %s', user.username, request.method, request.url.path)
+        with SamplingProfiler() as profiler:
+            response = await call_next(request)
+            async for _ in response.body_iterator:
+                pass
+
+        return PlainTextResponse(
+            profiler.collapsed(),
+            headers={
+                "X-Profiled-Status": str(response.status_code),
+                "X-Profile-Samples": str(profiler.samples),
+            }
+        )
+
+    @staticmethod
+    def _authorize(request: Request, token: str):
+        dependency = request.app.dependency_overrides.get(get_db, get_db)
+        db_gen = dependency(request)
+        db = next(db_gen)
+        try:
+            return require_roles("admin")(get_current_user(token=token, db=db))
+        finally:
+            db_gen.close()
@@ -0,0 +1,38 @@
+from src.core.logger import logger
+from time import perf_counter
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from src.core.config import settings
+from src.core.query_counter import QueryStats, current_query_stats
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """Counts SQL statements and DB time per request and reports them
+    in the ``Server-Timing`` header."""
+
+    async def dispatch(self, request: Request, call_next):
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            current_query_stats.reset(token)
+        total_ms = (perf_counter() - started) * 1000
+        db_ms = stats.duration * 1000
+
+        response.headers.append(
+            "Server-Timing",
+            f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+        )
+
+        if stats.count > settings.QUERY_COUNT_WARNING_THRESHOLD:
+            logger.warning('%s %s issued %s queries (%.2f ms in DB)',
+                           request.method, request.url.path, stats.count, db_ms)
+
+        for statement, times in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+            logger.warning('Probable N+1 in %s %s: statement executed %s times: %s',
+                           request.method, request.url.path, times, statement[:200])
+
+        return response
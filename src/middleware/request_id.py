@@ -0,0 +1,26 @@
+import re
+from uuid import uuid4
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from src.core.log_handlers import request_id_var
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class RequestIdMiddleware(BaseHTTPMiddleware):
+    """Tags every log line of a request with the caller's ``X-Request-ID``
+    (or a generated one) and echoes it back in the response."""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get(REQUEST_ID_HEADER, "")
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid4().hex
+        token = request_id_var.set(request_id)
+        try:
+            response = await call_next(request)
+        finally:
+            request_id_var.reset(token)
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
@@ -0,0 +1,17 @@
+from starlette.routing import BaseRoute, Match
+from starlette.types import Scope
+
+
+def matched_route(scope: Scope) -> BaseRoute | None:
+    """Route the request is going to. Routing runs after the middleware
+    stack, so middleware has to match the route itself; the result is kept
+    in the scope for the next one."""
+    if "matched_route" not in scope:
+        scope["matched_route"] = next(
+            (route for route in scope["app"].router.routes if route.matches(scope)[0] == Match.FULL), None)
+    return scope["matched_route"]
+
+
+def matched_operation_id(scope: Scope) -> str | None:
+    """operation_id of ``matched_route``."""
+    return getattr(matched_route(scope), "operation_id", None)
@@ -0,0 +1,51 @@
+"""Brings the database schema up to date before the server starts.
+
+    python -m src.migrate
+
+Databases created before the app had migrations were built by
+``Base.metadata.create_all`` and have the tables of the initial revision but
+no ``alembic_version`` table, so ``alembic upgrade head`` would try to create
+the tables again. Such a database is stamped with the initial revision
+first, then every database is upgraded to head. ``upgrade`` does the same
+for any URL, for the tools that fill databases of their own.
+"""
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+from src.core.config import settings
+
+INITIAL_REVISION = "f2dfcdaf3c45"
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def needs_stamp(url: str) -> bool:
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            tables = set(inspect(connection).get_table_names())
+    finally:
+        engine.dispose()
+    return "users" in tables and "alembic_version" not in tables
+
+
+def upgrade(url: str, configure_logging: bool = True) -> None:
+    config = Config(os.path.join(_ROOT, "alembic.ini"))
+    # Read by env.py in place of settings.DATABASE_URL and the logging setup of alembic.ini
+    config.attributes["url"] = url
+    config.attributes["configure_logging"] = configure_logging
+    if needs_stamp(url):
+        print(f"Tables without migration history, stamping revision {INITIAL_REVISION}")
+        command.stamp(config, INITIAL_REVISION)
+    command.upgrade(config, "head")
+
+
+def main():
+    upgrade(settings.DATABASE_URL)
+
+
+if __name__ == "__main__":
+    main()
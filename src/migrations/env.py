@@ -11,10 +11,13 @@ from alembic import context
 
 config = context.config
 
-if config.config_file_name is not None:
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
     fileConfig(config.config_file_name)
 
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# src.migrate.upgrade passes the URL of the database it migrates; the
+# options are interpolated by configparser, so a quoted "%" is doubled
+url = config.attributes.get("url", settings.DATABASE_URL)
+config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
 
 target_metadata = Base.metadata
 
@@ -59,7 +62,9 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection, 
             target_metadata=target_metadata,
-            compare_server_default=True
+            compare_server_default=True,
+            # SQLite cannot ALTER most of a table: autogenerate copy-and-move batches
+            render_as_batch=connection.dialect.name == "sqlite"
         )
 
         with context.begin_transaction():
@@ -0,0 +1,52 @@
+"""seed admin user
+
+Revision ID: 7c1e4b9a2d56
+Revises: f2dfcdaf3c45
+Create Date: 2026-10-19 16:20:11.402317
+
+"""
+
+from src.core.config import settings
+from src.core.security import hash_password
+from src.enums import UserRole
+from src.models import role_priority_map
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e4b9a2d56"
+down_revision: Union[str, Sequence[str], None] = "f2dfcdaf3c45"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+users = sa.table(
+    "users",
+    sa.column("username", sa.String),
+    sa.column("password", sa.String),
+    sa.column("role", sa.Enum("user", "manager", "admin", name="userrole")),
+    sa.column("role_level", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    """Create the ADMIN_NAME user, unless a database built before the
+    migrations already has it."""
+    bind = op.get_bind()
+    exists = bind.scalar(
+        sa.select(users.c.username).where(users.c.username == settings.ADMIN_NAME)
+    )
+    if exists is None:
+        op.bulk_insert(users, [{
+            "username": settings.ADMIN_NAME,
+            "password": hash_password(settings.ADMIN_PASSWORD),
+            "role": settings.ADMIN_ROLE,
+            "role_level": role_priority_map.get(UserRole(settings.ADMIN_ROLE), 0),
+        }])
+
+
+def downgrade() -> None:
+    """Remove the ADMIN_NAME user."""
+    op.execute(users.delete().where(users.c.username == settings.ADMIN_NAME))
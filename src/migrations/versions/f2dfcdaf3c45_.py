@@ -6,8 +6,6 @@ Create Date: 2025-11-17 12:18:31.869198
 
 """
 
-from src.core.config import settings
-from src.core.security import hash_password
 from typing import Sequence, Union
 
 from alembic import op
@@ -130,19 +128,12 @@ def upgrade() -> None:
     op.create_index(op.f("ix_deals_id"), "deals", ["id"], unique=False)
     op.create_index(op.f("ix_deals_status"), "deals", ["status"], unique=False)
     op.create_index(op.f("ix_deals_title"), "deals", ["title"], unique=True)
-    op.execute(
-        f"""
-        INSERT INTO users (username, password, role)
-        VALUES ('{settings.ADMIN_NAME}', '{hash_password(settings.ADMIN_NAME)}', '{settings.ADMIN_NAME}')
-        """
-    )
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.execute(f"DELETE FROM users WHERE username='{settings.ADMIN_NAME}'")
     op.drop_index(op.f("ix_deals_title"), table_name="deals")
     op.drop_index(op.f("ix_deals_status"), table_name="deals")
     op.drop_index(op.f("ix_deals_id"), table_name="deals")
@@ -1,8 +1,27 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, TypeDecorator
+from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from src.database import Base
 from src.enums import DealStatus, TaskStatus, UserRole
 
+class UTCDateTime(TypeDecorator):
+    """``timestamp with time zone`` on PostgreSQL. SQLite has no such type and
+    stores the text of a datetime without its offset, so values are stored in
+    UTC there and read back as UTC."""
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and dialect.name == "sqlite" and value.tzinfo is not None:
+            return value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and dialect.name == "sqlite":
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
 role_priority_map = {
     UserRole.user: 1,
     UserRole.manager: 2,
@@ -18,6 +37,8 @@ class User(Base):
     role = Column(Enum(UserRole), default="user")
     role_level = Column(Integer, default=0, nullable=False, index=True)
 
+    tasks = relationship("Task", viewonly=True, order_by="Task.id")
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.role_level = role_priority_map.get(self.role, 0)  
@@ -32,6 +53,9 @@ class Client(Base):
     phone = Column(String, nullable=False, index=True)
     notes = Column(String, nullable=True)
 
+    owner = relationship("User", viewonly=True)
+    deals = relationship("Deal", viewonly=True, order_by="Deal.id")
+
 class Deal(Base):
     __tablename__ = 'deals'
 
@@ -40,12 +64,12 @@ class Deal(Base):
     title = Column(String, nullable=False, unique=True, index=True)
     status = Column(Enum(DealStatus), nullable=False, index=True)
     value = Column(Integer, nullable=False)
-    created_at = Column(DateTime(timezone=True), 
+    created_at = Column(UTCDateTime, 
                         default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
-    updated_at = Column(DateTime(timezone=True), 
+    updated_at = Column(UTCDateTime, 
                         default=lambda: datetime.now(timezone.utc), 
                         onupdate=lambda: datetime.now(timezone.utc))
-    closed_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    closed_at = Column(UTCDateTime, nullable=True, index=True)
 
 class Task(Base):
     __tablename__ = 'tasks'
@@ -55,9 +79,9 @@ class Task(Base):
     title = Column(String, nullable=False, unique=True, index=True)
     description = Column(String, nullable=True)
     status = Column(Enum(TaskStatus), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), 
+    created_at = Column(UTCDateTime, 
                         default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
-    updated_at = Column(DateTime(timezone=True), 
+    updated_at = Column(UTCDateTime, 
                         default=lambda: datetime.now(timezone.utc), 
                         onupdate=lambda: datetime.now(timezone.utc))
-    due_date = Column(DateTime(timezone=True), nullable=True, index=True)
+    due_date = Column(UTCDateTime, nullable=True, index=True)
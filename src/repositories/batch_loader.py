@@ -0,0 +1,62 @@
+from sqlalchemy import event, inspect, lambda_stmt, select
+from sqlalchemy.orm import Session
+from src.core.metrics import CACHE_REQUESTS
+
+
+class BatchLoader:
+    """Primary key lookups of one model within a session transaction.
+
+    ``load_many`` fetches the ids it is given with a single ``IN`` query, and
+    every object loaded, or id found missing, is served from the loader until
+    the transaction ends, so repeated ``get_by_id`` calls during one request
+    hit the database only once. Loaders are dropped when the session commits,
+    rolls back or closes: its objects may be expired or detached by then, and
+    a missing id may have been inserted.
+    """
+
+    def __init__(self, db: Session, model):
+        self.db = db
+        self.model = model
+        self._objects: dict[int, object] = {}
+        self._missing: set[int] = set()
+
+    @staticmethod
+    def for_session(db: Session, model) -> "BatchLoader":
+        loaders = db.info.setdefault("batch_loaders", {})
+        if model not in loaders:
+            loaders[model] = BatchLoader(db, model)
+        return loaders[model]
+
+    def load(self, id: int | None):
+        if id is None:
+            return None
+        found = self.load_many([id])
+        return found[0] if found else None
+
+    def load_many(self, ids) -> list:
+        self._fetch({id for id in ids if id is not None})
+        objects = []
+        for id in ids:
+            obj = self._objects.get(id)
+            if obj is not None and not inspect(obj).was_deleted:
+                objects.append(obj)
+        return objects
+
+    def _fetch(self, requested: set[int]) -> None:
+        ids = requested - self._objects.keys() - self._missing
+        CACHE_REQUESTS.labels("batch_loader", "hit").inc(len(requested) - len(ids))
+        CACHE_REQUESTS.labels("batch_loader", "miss").inc(len(ids))
+        if not ids:
+            return
+
+        model = self.model
+        rows = self.db.scalars(lambda_stmt(lambda: select(model).where(model.id.in_(ids)))).all()
+        for obj in rows:
+            self._objects[obj.id] = obj
+        self._missing.update(ids - self._objects.keys())
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_batch_loaders(session, transaction):
+    # Commit, rollback, the release or rollback of a SAVEPOINT, and close
+    session.info.pop("batch_loaders", None)
@@ -1,16 +1,30 @@
-from sqlalchemy import or_ 
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, lambda_stmt, select
+from sqlalchemy.orm import Session, joinedload
 from src.models import Client, User
+from src.database import prefer_replica, release_connection
+from src.repositories.batch_loader import BatchLoader
 
 class ClientsRepository:
     
     @staticmethod
     def get_by_name(db: Session, name: str) -> Client | None:
-        return db.query(Client).filter(Client.name == name).first()
+        return db.scalars(lambda_stmt(lambda: select(Client).where(Client.name == name).limit(1))).first()
     
     @staticmethod
     def get_by_id(db: Session, id: int) -> Client | None:
-        return db.query(Client).filter(Client.id == id).first()
+        return BatchLoader.for_session(db, Client).load(id)
+    
+    @staticmethod
+    def get_by_ids(db: Session, ids: list[int]) -> list[Client]:
+        return BatchLoader.for_session(db, Client).load_many(ids)
+    
+    @staticmethod
+    def get_overview(db: Session, id: int) -> Client | None:
+        return (db.query(Client)
+                .options(joinedload(Client.owner).selectinload(User.tasks),
+                         joinedload(Client.deals))
+                .filter(Client.id == id)
+                .one_or_none())
     
     @staticmethod
     def get_unassign():
@@ -54,7 +68,6 @@ class ClientsRepository:
     def take_client(db: Session, client, id: int | None) -> int:
         client.user_id = id
         db.commit()
-        db.refresh(client)
         return client
     
     @staticmethod
@@ -74,7 +87,6 @@ class ClientsRepository:
 
         db.add(client)
         db.commit()
-        db.refresh(client)
         return client
     
     @staticmethod
@@ -93,7 +105,6 @@ class ClientsRepository:
         client.phone = phone
         client.notes = notes
         db.commit()
-        db.refresh(client)
         return client
 
     @staticmethod
@@ -104,4 +115,12 @@ class ClientsRepository:
 
     @staticmethod
     def rollback(db: Session):
-        db.rollback()
\ No newline at end of file
+        db.rollback()
+
+    @staticmethod
+    def use_replica(db: Session):
+        prefer_replica(db)
+
+    @staticmethod
+    def release(db: Session):
+        release_connection(db)
\ No newline at end of file
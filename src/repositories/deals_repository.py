@@ -1,18 +1,35 @@
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, exists, lambda_stmt
 from sqlalchemy.orm import Session, Query
 from src.models import User, Client, Deal
+from src.database import prefer_replica, release_connection
+from src.repositories.batch_loader import BatchLoader
 from datetime import datetime, timedelta
 
 class DealsRepository:
     
     @staticmethod
     def get_by_id(db: Session, id: int):
-        return db.query(Deal).filter(Deal.id == id).first()
+        return BatchLoader.for_session(db, Deal).load(id)
+    
+    @staticmethod
+    def get_by_ids(db: Session, ids: list[int]) -> list[Deal]:
+        return BatchLoader.for_session(db, Deal).load_many(ids)
     
     @staticmethod
     def get_by_title(db: Session, title: str):
-        return db.query(Deal).filter(Deal.title == title).first()
+        return db.scalars(lambda_stmt(lambda: select(Deal).where(Deal.title == title).limit(1))).first()
     
+    @staticmethod
+    def get_client_and_title_taken(db: Session, client_name: str, title: str) -> tuple[Client | None, bool]:
+        """The client a new deal goes to and whether its title is taken, in one query
+        when the client exists."""
+        row = db.execute(lambda_stmt(
+            lambda: select(Client, exists().where(Deal.title == title))
+            .where(Client.name == client_name).limit(1))).first()
+        if row is None:
+            return None, DealsRepository.get_by_title(db, title) is not None
+        return row[0], row[1]
+
     @staticmethod
     def get_by_client_name(name: str):
         client_ids = select(Client.id).filter(Client.name == name)
@@ -34,7 +51,7 @@ class DealsRepository:
     
     @staticmethod
     def less_than(value: int):
-        return Deal.value >= value
+        return Deal.value <= value
     
     @staticmethod
     def exact_date(date: datetime, attribute: str):
@@ -102,7 +119,6 @@ class DealsRepository:
 
         db.add(deal)
         db.commit()
-        db.refresh(deal)
         return deal
     
     @staticmethod
@@ -121,7 +137,6 @@ class DealsRepository:
         deal.value = value
         deal.closed_at = closed_at
         db.commit()
-        db.refresh(deal)
         return deal
 
     @staticmethod
@@ -131,11 +146,22 @@ class DealsRepository:
         return deal
     
     @staticmethod
-    def delete_group(db: Session, query: Query) -> list: 
-        query.delete(synchronize_session='fetch')
+    def delete_group(db: Session, query: Query) -> list[Deal]:
+        if query.whereclause is None:
+            # delete() would render WHERE NULL, or with no WHERE delete every row
+            raise ValueError("delete_group needs a filtered query")
+        deals = db.scalars(delete(Deal).where(query.whereclause).returning(Deal)).all()
         db.commit()
-        return 
+        return deals
 
     @staticmethod
     def rollback(db: Session):
-        db.rollback()
\ No newline at end of file
+        db.rollback()
+
+    @staticmethod
+    def use_replica(db: Session):
+        prefer_replica(db)
+
+    @staticmethod
+    def release(db: Session):
+        release_connection(db)
\ No newline at end of file
@@ -0,0 +1,110 @@
+from src.repositories.memory.database import ClientRow, MemoryDatabase, MemoryQuery, Related, contains, where
+
+
+class MemoryClientsRepository:
+
+    @staticmethod
+    def get_by_name(db: MemoryDatabase, name: str) -> ClientRow | None:
+        return db.clients.get_by("name", name)
+
+    @staticmethod
+    def get_by_id(db: MemoryDatabase, id: int) -> ClientRow | None:
+        return db.clients.get(id)
+
+    @staticmethod
+    def get_by_ids(db: MemoryDatabase, ids: list[int]) -> list[ClientRow]:
+        return [db.clients.rows[id] for id in ids if id in db.clients.rows]
+
+    @staticmethod
+    def get_overview(db: MemoryDatabase, id: int) -> Related | None:
+        client = db.clients.get(id)
+        if client is None:
+            return None
+        owner = db.users.get(client.user_id)
+        if owner is not None:
+            owner = Related(owner, tasks=db.tasks.children("user_id", owner.id))
+        return Related(client, owner=owner, deals=db.deals.children("client_id", client.id))
+
+    @staticmethod
+    def get_unassign():
+        return where(lambda client: client.user_id is None)
+
+    @staticmethod
+    def filter_related_to_user(db: MemoryDatabase, username: str):
+        def resolve(db: MemoryDatabase):
+            user_ids = {user.id for user in db.users.rows.values() if username.lower() in user.username.lower()}
+            return lambda client: client.user_id in user_ids
+        return resolve
+
+    @staticmethod
+    def search(search: str):
+        return contains(search, "name", "email", "phone")
+
+    @staticmethod
+    def apply_filters(db: MemoryDatabase, filters: list) -> MemoryQuery:
+        return MemoryQuery(db, db.clients, filters)
+
+    @staticmethod
+    def apply_sorting(query: MemoryQuery, sort_attr, order: str) -> MemoryQuery:
+        sort_attr = sort_attr if sort_attr in query.table.indexes else "name"
+        return query.sorted(sort_attr, order == "desc")
+
+    @staticmethod
+    def paginate(query: MemoryQuery, skip: int | None, limit: int | None) -> list[ClientRow]:
+        return query.page(skip, limit)
+
+    @staticmethod
+    def count(query: MemoryQuery) -> int:
+        return query.count()
+
+    @staticmethod
+    def take_client(db: MemoryDatabase, client, id: int | None) -> ClientRow:
+        return db.clients.update(client, user_id=id)
+
+    @staticmethod
+    def add(db: MemoryDatabase,
+            user_id,
+            name,
+            email,
+            phone,
+            notes) -> ClientRow:
+
+        return db.clients.insert(ClientRow(id=db.clients.next_id(),
+                                           user_id=user_id,
+                                           name=name,
+                                           email=email,
+                                           phone=phone,
+                                           notes=notes))
+
+    @staticmethod
+    def update(db: MemoryDatabase,
+               client,
+               user_id,
+               name,
+               email,
+               phone,
+               notes
+               ) -> ClientRow:
+
+        return db.clients.update(client,
+                                 user_id=user_id,
+                                 name=name,
+                                 email=email,
+                                 phone=phone,
+                                 notes=notes)
+
+    @staticmethod
+    def delete(db: MemoryDatabase, client) -> ClientRow:
+        return db.delete(db.clients, client)
+
+    @staticmethod
+    def rollback(db: MemoryDatabase):
+        pass
+
+    @staticmethod
+    def use_replica(db: MemoryDatabase):
+        pass
+
+    @staticmethod
+    def release(db: MemoryDatabase):
+        pass
@@ -0,0 +1,327 @@
+"""Tables kept in dicts, to run the services without a database.
+
+A ``Table`` maps ids to rows and keeps, for every column it can be sorted
+by, a list of ``(is null, value, id)`` entries in order: NULLs sort last,
+as on PostgreSQL, and ties by id. A page is read by walking that list and
+stops once it is full; a ``Range`` filter on the sort column is a slice of
+it. Unique columns have a dict from value to id and foreign keys one from
+parent id to child ids, for lookups, relationships and the ``ON DELETE``
+actions of ``src.models``.
+
+Indexes are maintained by ``Table.insert``/``update``/``delete``, so rows
+must not be changed by setting their attributes. There are no transactions:
+every write is applied at once.
+"""
+from bisect import bisect_left, bisect_right, insort
+from copy import copy
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import count
+from math import inf
+from operator import attrgetter
+from typing import Any, Callable
+
+from src.enums import DealStatus, TaskStatus, UserRole
+
+Predicate = Callable[[Any], bool]
+
+
+@dataclass(slots=True, eq=False)
+class UserRow:
+    id: int
+    username: str
+    password: str
+    role: UserRole
+    role_level: int
+
+
+@dataclass(slots=True, eq=False)
+class ClientRow:
+    id: int
+    user_id: int | None
+    name: str
+    email: str
+    phone: str
+    notes: str | None
+
+
+@dataclass(slots=True, eq=False)
+class DealRow:
+    id: int
+    client_id: int
+    title: str
+    status: DealStatus
+    value: int
+    created_at: datetime
+    updated_at: datetime
+    closed_at: datetime | None
+
+
+@dataclass(slots=True, eq=False)
+class TaskRow:
+    id: int
+    user_id: int | None
+    title: str
+    description: str | None
+    status: TaskStatus
+    created_at: datetime
+    updated_at: datetime
+    due_date: datetime | None
+
+
+class Related:
+    """A row with its related rows as attributes, like a relationship
+    loaded by the ORM."""
+
+    def __init__(self, row, **related):
+        self._row = row
+        self.__dict__.update(related)
+
+    def __getattr__(self, name):
+        return getattr(self._row, name)
+
+
+def utc(value):
+    # Columns hold aware datetimes, and naive ones cannot be compared to them
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _entry(row, attribute: str) -> tuple:
+    value = getattr(row, attribute)
+    return (value is None, value, row.id)
+
+
+class Table:
+
+    def __init__(self, name: str, indexed: tuple[str, ...], unique: tuple[str, ...] = (),
+                 foreign_keys: tuple[str, ...] = ()):
+        self.name = name
+        self.rows: dict[int, Any] = {}
+        self.indexes: dict[str, list[tuple]] = {attribute: [] for attribute in indexed}
+        self.unique: dict[str, dict] = {attribute: {} for attribute in unique}
+        self.groups: dict[str, dict[Any, set[int]]] = {attribute: {} for attribute in foreign_keys}
+        self._ids = count(1)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def get(self, id: int | None):
+        return self.rows.get(id)
+
+    def get_by(self, attribute: str, value):
+        return self.rows.get(self.unique[attribute].get(value))
+
+    def children(self, foreign_key: str, parent_id: int) -> list:
+        """Rows whose ``foreign_key`` is ``parent_id``, by id."""
+        return [self.rows[id] for id in sorted(self.groups[foreign_key].get(parent_id, ()))]
+
+    def insert(self, row):
+        self._check_unique(row.id, {attribute: getattr(row, attribute) for attribute in self.unique})
+        self.rows[row.id] = row
+        self._index(row)
+        return row
+
+    def load(self, rows) -> None:
+        """Inserts many rows with ids of their own, a column at a time, and
+        sorts every index once at the end."""
+        rows = list(rows)
+        self.rows.update((row.id, row) for row in rows)
+        for attribute, ids in self.unique.items():
+            ids.update((getattr(row, attribute), row.id) for row in rows)
+            if len(ids) != len(self.rows):
+                raise ValueError(f"{self.name}.{attribute} has duplicates")
+        for attribute, groups in self.groups.items():
+            for row in rows:
+                groups.setdefault(getattr(row, attribute), set()).add(row.id)
+        for attribute, index in self.indexes.items():
+            index.extend([_entry(row, attribute) for row in rows])
+            index.sort()
+        self._ids = count(max(self.rows, default=0) + 1)
+
+    def update(self, row, **values):
+        changed = {attribute: value for attribute, value in values.items() if getattr(row, attribute) != value}
+        self._check_unique(row.id, changed)
+        self._unindex(row, changed)
+        for attribute, value in changed.items():
+            setattr(row, attribute, value)
+        self._index(row, changed)
+        return row
+
+    def delete(self, row):
+        self._unindex(row)
+        del self.rows[row.id]
+        return row
+
+    def _check_unique(self, id: int, values: dict) -> None:
+        for attribute, ids in self.unique.items():
+            if attribute in values and ids.get(values[attribute], id) != id:
+                raise ValueError(f"{self.name}.{attribute} {values[attribute]!r} already exists")
+
+    # Both take the attributes to (un)index, all of them by default: an
+    # update only moves the entries of the columns it changes
+
+    def _index(self, row, attributes=None) -> None:
+        for attribute, index in self.indexes.items():
+            if attributes is None or attribute in attributes:
+                insort(index, _entry(row, attribute))
+        for attribute, ids in self.unique.items():
+            if attributes is None or attribute in attributes:
+                ids[getattr(row, attribute)] = row.id
+        for attribute, groups in self.groups.items():
+            if attributes is None or attribute in attributes:
+                groups.setdefault(getattr(row, attribute), set()).add(row.id)
+
+    def _unindex(self, row, attributes=None) -> None:
+        for attribute, index in self.indexes.items():
+            if attributes is None or attribute in attributes:
+                del index[bisect_left(index, _entry(row, attribute))]
+        for attribute, ids in self.unique.items():
+            if attributes is None or attribute in attributes:
+                del ids[getattr(row, attribute)]
+        for attribute, groups in self.groups.items():
+            if attributes is None or attribute in attributes:
+                group = groups[getattr(row, attribute)]
+                group.discard(row.id)
+                if not group:
+                    del groups[getattr(row, attribute)]
+
+
+class Range:
+    """Filter on ``low <= attribute <= high``, either bound optional. NULL
+    never matches, as in SQL."""
+
+    def __init__(self, attribute: str, low=None, high=None):
+        self.attribute = attribute
+        self.low = utc(low)
+        self.high = utc(high)
+
+    def __call__(self, db) -> Predicate:
+        return self.matches
+
+    def matches(self, row) -> bool:
+        value = getattr(row, self.attribute)
+        return (value is not None
+                and (self.low is None or value >= self.low)
+                and (self.high is None or value <= self.high))
+
+    def span(self, index: list[tuple]) -> tuple[int, int]:
+        """Positions of the matching entries of a sorted index of the attribute."""
+        lo = 0 if self.low is None else bisect_left(index, (False, self.low))
+        hi = bisect_left(index, (True,)) if self.high is None else bisect_right(index, (False, self.high, inf))
+        return lo, hi
+
+
+def where(predicate: Predicate) -> Callable:
+    """Filter that needs nothing from the database to test a row."""
+    return lambda db: predicate
+
+
+def contains(search: str, *attributes: str) -> Callable:
+    """Case-insensitive substring of any of ``attributes``, like ``ilike '%search%'``."""
+    needle = search.lower()
+    if len(attributes) == 1:
+        get = attrgetter(attributes[0])
+        return where(lambda row: needle in (get(row) or "").lower())
+    return where(lambda row: any(needle in (getattr(row, attribute) or "").lower()
+                                 for attribute in attributes))
+
+
+class MemoryQuery:
+    """The rows of a table matching all filters, in the order of one of its
+    indexes. A filter is called with the database once, when the query is
+    built, and returns the test for a row.
+
+    Without filters besides a range on the sort column, a page is read from
+    the index directly. Otherwise the matching rows are collected in one
+    pass, which ``count`` needs anyway, and the page is a slice of them.
+    """
+
+    def __init__(self, db: "MemoryDatabase", table: Table, filters: list):
+        self.table = table
+        self.filters = [(f, f(db)) for f in filters]
+        self.order_by = "id"
+        self.descending = False
+        self._matches = None
+
+    def sorted(self, attribute: str, descending: bool) -> "MemoryQuery":
+        query = copy(self)
+        query.order_by = attribute
+        query.descending = descending
+        query._matches = None
+        return query
+
+    def _plan(self) -> tuple[list, range, list[Predicate]]:
+        index = self.table.indexes[self.order_by]
+        lo, hi = 0, len(index)
+        predicates = []
+        for f, predicate in self.filters:
+            if isinstance(f, Range) and f.attribute == self.order_by:
+                f_lo, f_hi = f.span(index)
+                lo, hi = max(lo, f_lo), min(hi, f_hi)
+            else:
+                predicates.append(predicate)
+        positions = range(hi - 1, lo - 1, -1) if self.descending else range(lo, max(hi, lo))
+        return index, positions, predicates
+
+    def _rows(self) -> list | None:
+        """The matching rows, or None when the index positions are all it takes."""
+        if self._matches is None:
+            index, positions, predicates = self._plan()
+            if not predicates:
+                return None
+            test = predicates[0] if len(predicates) == 1 else (
+                lambda row: all(predicate(row) for predicate in predicates))
+            rows = self.table.rows
+            self._matches = [row for row in (rows[index[position][-1]] for position in positions) if test(row)]
+        return self._matches
+
+    def __iter__(self):
+        return iter(self.page(None, None))
+
+    def count(self) -> int:
+        matches = self._rows()
+        return len(self._plan()[1]) if matches is None else len(matches)
+
+    def page(self, skip: int | None, limit: int | None) -> list:
+        window = slice(skip or 0, None if limit is None else (skip or 0) + limit)
+        matches = self._rows()
+        if matches is not None:
+            return matches[window]
+        index, positions, _ = self._plan()
+        rows = self.table.rows
+        return [rows[index[position][-1]] for position in positions[window]]
+
+
+class MemoryDatabase:
+    """The four tables of ``src.models``, passed to the memory repositories
+    as ``db``."""
+
+    # Child table, foreign key and ON DELETE action, by parent table
+    ON_DELETE = {
+        "users": (("clients", "user_id", "SET NULL"), ("tasks", "user_id", "SET NULL")),
+        "clients": (("deals", "client_id", "CASCADE"),),
+    }
+
+    def __init__(self):
+        self.users = Table("users", indexed=("id", "username", "role_level"), unique=("username",))
+        self.clients = Table("clients", indexed=("id", "name", "email", "phone"), unique=("name",),
+                             foreign_keys=("user_id",))
+        self.deals = Table("deals", indexed=("id", "title", "value", "created_at", "updated_at", "closed_at"),
+                           unique=("title",), foreign_keys=("client_id",))
+        self.tasks = Table("tasks", indexed=("id", "title", "status"), unique=("title",),
+                           foreign_keys=("user_id",))
+
+    def delete(self, table: Table, row):
+        for child_name, foreign_key, action in self.ON_DELETE.get(table.name, ()):
+            child = getattr(self, child_name)
+            for child_row in child.children(foreign_key, row.id):
+                if action == "CASCADE":
+                    self.delete(child, child_row)
+                else:
+                    child.update(child_row, **{foreign_key: None})
+        return table.delete(row)
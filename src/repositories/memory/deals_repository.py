@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+from src.repositories.memory.database import ClientRow, DealRow, MemoryDatabase, MemoryQuery, Range, contains
+
+
+class MemoryDealsRepository:
+
+    @staticmethod
+    def get_by_id(db: MemoryDatabase, id: int) -> DealRow | None:
+        return db.deals.get(id)
+
+    @staticmethod
+    def get_by_ids(db: MemoryDatabase, ids: list[int]) -> list[DealRow]:
+        return [db.deals.rows[id] for id in ids if id in db.deals.rows]
+
+    @staticmethod
+    def get_by_title(db: MemoryDatabase, title: str) -> DealRow | None:
+        return db.deals.get_by("title", title)
+
+    @staticmethod
+    def get_client_and_title_taken(db: MemoryDatabase, client_name: str, title: str) -> tuple[ClientRow | None, bool]:
+        return db.clients.get_by("name", client_name), title in db.deals.unique["title"]
+
+    @staticmethod
+    def get_by_client_name(name: str):
+        def resolve(db: MemoryDatabase):
+            client = db.clients.get_by("name", name)
+            client_id = client.id if client is not None else None
+            return lambda deal: deal.client_id == client_id
+        return resolve
+
+    @staticmethod
+    def get_by_username(username: str):
+        def resolve(db: MemoryDatabase):
+            user = db.users.get_by("username", username)
+            client_ids = db.clients.groups["user_id"].get(user.id, set()) if user is not None else set()
+            return lambda deal: deal.client_id in client_ids
+        return resolve
+
+    @staticmethod
+    def search(search: str):
+        return contains(search, "title")
+
+    @staticmethod
+    def more_than(value: int):
+        return Range("value", low=value)
+
+    @staticmethod
+    def less_than(value: int):
+        return Range("value", high=value)
+
+    @staticmethod
+    def exact_date(date: datetime, attribute: str):
+        start_of_day = datetime.combine(date.date(), datetime.min.time())
+        end_of_day = datetime.combine(date.date(), datetime.max.time())
+        return Range(attribute, low=start_of_day, high=end_of_day)
+
+    @staticmethod
+    def earlier_than(date: datetime, attribute: str):
+        return Range(attribute, high=date)
+
+    @staticmethod
+    def later_than(date: datetime, attribute: str):
+        return Range(attribute, low=date)
+
+    @staticmethod
+    def new(attribute: str):
+        today = datetime.today()
+        start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        if today.month == 12:
+            next_month = today.replace(year=today.year+1, month=1, day=1)
+        else:
+            next_month = today.replace(month=today.month+1, day=1)
+        end_of_month = next_month - timedelta(seconds=1)
+
+        return Range(attribute, low=start_of_month, high=end_of_month)
+
+    @staticmethod
+    def apply_filters(db: MemoryDatabase, filters: list) -> MemoryQuery:
+        return MemoryQuery(db, db.deals, filters)
+
+    @staticmethod
+    def apply_sorting(query: MemoryQuery, sort_attr, order: str) -> MemoryQuery:
+        sort_attr = sort_attr if sort_attr in query.table.indexes else "title"
+        return query.sorted(sort_attr, order == "desc")
+
+    @staticmethod
+    def paginate(query: MemoryQuery, skip: int | None, limit: int | None) -> list[DealRow]:
+        return query.page(skip, limit)
+
+    @staticmethod
+    def count(query: MemoryQuery) -> int:
+        return query.count()
+
+    @staticmethod
+    def add(db: MemoryDatabase,
+            client_id: int,
+            title: str,
+            status: str,
+            value: int,
+            closed_at: datetime) -> DealRow:
+
+        now = datetime.now(timezone.utc)
+        return db.deals.insert(DealRow(id=db.deals.next_id(),
+                                       client_id=client_id,
+                                       title=title,
+                                       status=status,
+                                       value=value,
+                                       created_at=now,
+                                       updated_at=now,
+                                       closed_at=closed_at))
+
+    @staticmethod
+    def update(db: MemoryDatabase,
+               deal: DealRow,
+               client_id: int,
+               title: str,
+               status: str,
+               value: int,
+               closed_at: datetime
+               ) -> DealRow:
+
+        return db.deals.update(deal,
+                               client_id=client_id,
+                               title=title,
+                               status=status,
+                               value=value,
+                               closed_at=closed_at,
+                               updated_at=datetime.now(timezone.utc))
+
+    @staticmethod
+    def delete(db: MemoryDatabase, deal) -> DealRow:
+        return db.delete(db.deals, deal)
+
+    @staticmethod
+    def delete_group(db: MemoryDatabase, query: MemoryQuery) -> list[DealRow]:
+        if not query.filters:
+            raise ValueError("delete_group needs a filtered query")
+        return [db.delete(db.deals, deal) for deal in list(query)]
+
+    @staticmethod
+    def rollback(db: MemoryDatabase):
+        pass
+
+    @staticmethod
+    def use_replica(db: MemoryDatabase):
+        pass
+
+    @staticmethod
+    def release(db: MemoryDatabase):
+        pass
@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from src.repositories.memory.database import MemoryDatabase, MemoryQuery, TaskRow, contains, where
+
+
+class MemoryTasksRepository:
+
+    @staticmethod
+    def get_by_id(db: MemoryDatabase, id: int) -> TaskRow | None:
+        return db.tasks.get(id)
+
+    @staticmethod
+    def get_by_ids(db: MemoryDatabase, ids: list[int]) -> list[TaskRow]:
+        return [db.tasks.rows[id] for id in ids if id in db.tasks.rows]
+
+    @staticmethod
+    def get_by_title(db: MemoryDatabase, title: str) -> TaskRow | None:
+        return db.tasks.get_by("title", title)
+
+    @staticmethod
+    def get_all_done(db: MemoryDatabase) -> MemoryQuery:
+        return MemoryQuery(db, db.tasks, [where(lambda task: task.status == 'done')])
+
+    @staticmethod
+    def get_all_expired(db: MemoryDatabase) -> MemoryQuery:
+        now = datetime.now(timezone.utc)
+        return MemoryQuery(db, db.tasks, [where(lambda task: task.due_date is not None and task.due_date <= now)])
+
+    @staticmethod
+    def get_by_username(db: MemoryDatabase, username: str):
+        def resolve(db: MemoryDatabase):
+            user_ids = {user.id for user in db.users.rows.values() if username.lower() in user.username.lower()}
+            return lambda task: task.user_id in user_ids
+        return resolve
+
+    @staticmethod
+    def search(search: str):
+        return contains(search, "title", "description")
+
+    @staticmethod
+    def apply_filters(db: MemoryDatabase, filters: list) -> MemoryQuery:
+        return MemoryQuery(db, db.tasks, filters)
+
+    @staticmethod
+    def apply_sorting(query: MemoryQuery, sort_attr, order: str) -> MemoryQuery:
+        sort_attr = sort_attr if sort_attr in query.table.indexes else "title"
+        return query.sorted(sort_attr, order == "desc")
+
+    @staticmethod
+    def paginate(query: MemoryQuery, skip: int | None, limit: int | None) -> list[TaskRow]:
+        return query.page(skip, limit)
+
+    @staticmethod
+    def count(query: MemoryQuery) -> int:
+        return query.count()
+
+    @staticmethod
+    def update(db: MemoryDatabase,
+               task,
+               id: int,
+               title: str,
+               description: str,
+               status: str,
+               due_date: datetime
+               ) -> TaskRow:
+
+        return db.tasks.update(task,
+                               user_id=id,
+                               title=title,
+                               description=description,
+                               status=status,
+                               due_date=due_date,
+                               updated_at=datetime.now(timezone.utc))
+
+    @staticmethod
+    def add(db: MemoryDatabase,
+            user_id: int,
+            title: str,
+            description: str,
+            status: int,
+            due_date: datetime) -> TaskRow:
+
+        now = datetime.now(timezone.utc)
+        return db.tasks.insert(TaskRow(id=db.tasks.next_id(),
+                                       user_id=user_id,
+                                       title=title,
+                                       description=description,
+                                       status=status,
+                                       created_at=now,
+                                       updated_at=now,
+                                       due_date=due_date))
+
+    @staticmethod
+    def delete(db: MemoryDatabase, task) -> TaskRow:
+        return db.delete(db.tasks, task)
+
+    @staticmethod
+    def delete_group(db: MemoryDatabase, query: MemoryQuery) -> list[TaskRow]:
+        if not query.filters:
+            raise ValueError("delete_group needs a filtered query")
+        return [db.delete(db.tasks, task) for task in list(query)]
+
+    @staticmethod
+    def rollback(db: MemoryDatabase):
+        pass
+
+    @staticmethod
+    def use_replica(db: MemoryDatabase):
+        pass
+
+    @staticmethod
+    def release(db: MemoryDatabase):
+        pass
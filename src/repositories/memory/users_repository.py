@@ -0,0 +1,80 @@
+from src.models import role_priority_map
+from src.repositories.memory.database import MemoryDatabase, MemoryQuery, UserRow, contains, where
+
+
+class MemoryUsersRepository:
+
+    @staticmethod
+    def get_by_username(db: MemoryDatabase, username: str) -> UserRow | None:
+        return db.users.get_by("username", username)
+
+    @staticmethod
+    def get_by_id(db: MemoryDatabase, id: int) -> UserRow | None:
+        return db.users.get(id)
+
+    @staticmethod
+    def get_by_ids(db: MemoryDatabase, ids: list[int]) -> list[UserRow]:
+        return [db.users.rows[id] for id in ids if id in db.users.rows]
+
+    @staticmethod
+    def update_password(db: MemoryDatabase, user: UserRow, new_password_hash: str) -> UserRow:
+        return db.users.update(user, password=new_password_hash)
+
+    @staticmethod
+    def filter_by_role(role):
+        return where(lambda user: user.role == role)
+
+    @staticmethod
+    def search(search: str):
+        return contains(search, "username")
+
+    @staticmethod
+    def apply_filters(db: MemoryDatabase, filters: list) -> MemoryQuery:
+        return MemoryQuery(db, db.users, filters)
+
+    @staticmethod
+    def apply_sorting(query: MemoryQuery, sort_attr, order: str) -> MemoryQuery:
+        sort_attr = sort_attr if sort_attr in query.table.indexes else "username"
+        return query.sorted(sort_attr, order == "desc")
+
+    @staticmethod
+    def paginate(query: MemoryQuery, skip: int | None, limit: int | None) -> list[UserRow]:
+        return query.page(skip, limit)
+
+    @staticmethod
+    def count(query: MemoryQuery) -> int:
+        return query.count()
+
+    @staticmethod
+    def add(db: MemoryDatabase, username, password, role) -> UserRow:
+        return db.users.insert(UserRow(id=db.users.next_id(),
+                                       username=username,
+                                       password=password,
+                                       role=role,
+                                       role_level=role_priority_map.get(role, 0)))
+
+    @staticmethod
+    def update(db: MemoryDatabase,
+               db_user: UserRow,
+               username: str,
+               password: str,
+               role: str
+               ) -> UserRow:
+        # Like the model, role_level keeps the value the user was created with
+        return db.users.update(db_user, username=username, password=password, role=role)
+
+    @staticmethod
+    def delete(db: MemoryDatabase, user) -> UserRow:
+        return db.delete(db.users, user)
+
+    @staticmethod
+    def rollback(db: MemoryDatabase):
+        pass
+
+    @staticmethod
+    def use_replica(db: MemoryDatabase):
+        pass
+
+    @staticmethod
+    def release(db: MemoryDatabase):
+        pass
@@ -0,0 +1,162 @@
+"""What the services need from a repository.
+
+The SQLAlchemy repositories take a ``Session`` as ``db``, the in-memory ones
+of ``src.repositories.memory`` a ``MemoryDatabase``. Filters and queries are
+opaque to the services: they come from a repository and only go back to the
+same repository.
+"""
+from datetime import datetime
+from typing import Any, Protocol
+
+
+class ListRepository(Protocol):
+
+    @staticmethod
+    def get_by_id(db, id: int) -> Any | None: ...
+
+    @staticmethod
+    def get_by_ids(db, ids: list[int]) -> list: ...
+
+    @staticmethod
+    def apply_filters(db, filters: list) -> Any: ...
+
+    @staticmethod
+    def apply_sorting(query, sort_attr: str, order: str) -> Any: ...
+
+    @staticmethod
+    def paginate(query, skip: int | None, limit: int | None) -> list: ...
+
+    @staticmethod
+    def count(query) -> int: ...
+
+    @staticmethod
+    def delete(db, row) -> Any: ...
+
+    @staticmethod
+    def rollback(db) -> None: ...
+
+    @staticmethod
+    def use_replica(db) -> None: ...
+
+    @staticmethod
+    def release(db) -> None: ...
+
+
+class UsersRepositoryProtocol(ListRepository, Protocol):
+
+    @staticmethod
+    def get_by_username(db, username: str) -> Any | None: ...
+
+    @staticmethod
+    def update_password(db, user, new_password_hash: str) -> Any: ...
+
+    @staticmethod
+    def filter_by_role(role) -> Any: ...
+
+    @staticmethod
+    def search(search: str) -> Any: ...
+
+    @staticmethod
+    def add(db, username: str, password: str, role) -> Any: ...
+
+    @staticmethod
+    def update(db, db_user, username: str, password: str, role) -> Any: ...
+
+
+class ClientsRepositoryProtocol(ListRepository, Protocol):
+
+    @staticmethod
+    def get_by_name(db, name: str) -> Any | None: ...
+
+    @staticmethod
+    def get_overview(db, id: int) -> Any | None: ...
+
+    @staticmethod
+    def get_unassign() -> Any: ...
+
+    @staticmethod
+    def filter_related_to_user(db, username: str) -> Any: ...
+
+    @staticmethod
+    def search(search: str) -> Any: ...
+
+    @staticmethod
+    def take_client(db, client, id: int | None) -> Any: ...
+
+    @staticmethod
+    def add(db, user_id, name, email, phone, notes) -> Any: ...
+
+    @staticmethod
+    def update(db, client, user_id, name, email, phone, notes) -> Any: ...
+
+
+class DealsRepositoryProtocol(ListRepository, Protocol):
+
+    @staticmethod
+    def get_by_title(db, title: str) -> Any | None: ...
+
+    @staticmethod
+    def get_client_and_title_taken(db, client_name: str, title: str) -> tuple[Any | None, bool]: ...
+
+    @staticmethod
+    def get_by_client_name(name: str) -> Any: ...
+
+    @staticmethod
+    def get_by_username(username: str) -> Any: ...
+
+    @staticmethod
+    def search(search: str) -> Any: ...
+
+    @staticmethod
+    def more_than(value: int) -> Any: ...
+
+    @staticmethod
+    def less_than(value: int) -> Any: ...
+
+    @staticmethod
+    def exact_date(date: datetime, attribute: str) -> Any: ...
+
+    @staticmethod
+    def earlier_than(date: datetime, attribute: str) -> Any: ...
+
+    @staticmethod
+    def later_than(date: datetime, attribute: str) -> Any: ...
+
+    @staticmethod
+    def new(attribute: str) -> Any: ...
+
+    @staticmethod
+    def add(db, client_id: int, title: str, status: str, value: int, closed_at: datetime) -> Any: ...
+
+    @staticmethod
+    def update(db, deal, client_id: int, title: str, status: str, value: int, closed_at: datetime) -> Any: ...
+
+    @staticmethod
+    def delete_group(db, query) -> list: ...
+
+
+class TasksRepositoryProtocol(ListRepository, Protocol):
+
+    @staticmethod
+    def get_by_title(db, title: str) -> Any | None: ...
+
+    @staticmethod
+    def get_all_done(db) -> Any: ...
+
+    @staticmethod
+    def get_all_expired(db) -> Any: ...
+
+    @staticmethod
+    def get_by_username(db, username: str) -> Any: ...
+
+    @staticmethod
+    def search(search: str) -> Any: ...
+
+    @staticmethod
+    def add(db, user_id: int, title: str, description: str, status, due_date: datetime) -> Any: ...
+
+    @staticmethod
+    def update(db, task, id: int, title: str, description: str, status, due_date: datetime) -> Any: ...
+
+    @staticmethod
+    def delete_group(db, query) -> list: ...
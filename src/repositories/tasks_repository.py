@@ -1,17 +1,23 @@
-from sqlalchemy import or_ 
+from sqlalchemy import or_, delete, lambda_stmt, select
 from sqlalchemy.orm import Session, Query
 from src.models import User, Task
+from src.database import prefer_replica, release_connection
+from src.repositories.batch_loader import BatchLoader
 from datetime import datetime, timezone
 
 class TasksRepository:
 
     @staticmethod
     def get_by_id(db: Session, id: int):
-        return db.query(Task).filter(Task.id == id).first()
+        return BatchLoader.for_session(db, Task).load(id)
+    
+    @staticmethod
+    def get_by_ids(db: Session, ids: list[int]) -> list[Task]:
+        return BatchLoader.for_session(db, Task).load_many(ids)
     
     @staticmethod
     def get_by_title(db: Session, title: str):
-        return db.query(Task).filter(Task.title == title).first()
+        return db.scalars(lambda_stmt(lambda: select(Task).where(Task.title == title).limit(1))).first()
     
     @staticmethod
     def get_all_done(db: Session):
@@ -70,7 +76,6 @@ class TasksRepository:
         task.status = status
         task.due_date = due_date
         db.commit()
-        db.refresh(task)
         return task
     
     @staticmethod
@@ -91,7 +96,6 @@ class TasksRepository:
 
         db.add(task)
         db.commit()
-        db.refresh(task)
         return task
 
     @staticmethod
@@ -101,14 +105,22 @@ class TasksRepository:
         return task
     
     @staticmethod
-    def delete_group(db: Session, query: Query) -> list:
-        tasks = query.all()
-        if not tasks:
-            return []
-        query.delete(synchronize_session='fetch')
+    def delete_group(db: Session, query: Query) -> list[Task]:
+        if query.whereclause is None:
+            # delete() would render WHERE NULL, or with no WHERE delete every row
+            raise ValueError("delete_group needs a filtered query")
+        tasks = db.scalars(delete(Task).where(query.whereclause).returning(Task)).all()
         db.commit()
         return tasks
 
     @staticmethod
     def rollback(db: Session):
-        db.rollback()
\ No newline at end of file
+        db.rollback()
+
+    @staticmethod
+    def use_replica(db: Session):
+        prefer_replica(db)
+
+    @staticmethod
+    def release(db: Session):
+        release_connection(db)
\ No newline at end of file
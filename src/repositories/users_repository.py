@@ -1,21 +1,27 @@
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
 from src.models import User
+from src.database import prefer_replica, release_connection
+from src.repositories.batch_loader import BatchLoader
 
 class UsersRepository:
 
     @staticmethod
     def get_by_username(db: Session, username: str) -> User | None:
-        return db.query(User).filter(User.username == username).first()
+        return db.scalars(lambda_stmt(lambda: select(User).where(User.username == username).limit(1))).first()
     
     @staticmethod
     def get_by_id(db: Session, id: int) -> User | None:
-        return db.query(User).filter(User.id == id).first()
+        return BatchLoader.for_session(db, User).load(id)
+    
+    @staticmethod
+    def get_by_ids(db: Session, ids: list[int]) -> list[User]:
+        return BatchLoader.for_session(db, User).load_many(ids)
 
     @staticmethod
     def update_password(db: Session, user: User, new_password_hash: str) -> User:
         user.password = new_password_hash
         db.commit()
-        db.refresh(user)
         return user
     
     @staticmethod
@@ -54,7 +60,6 @@ class UsersRepository:
         )
         db.add(user)
         db.commit()
-        db.refresh(user)
         return user
     
     @staticmethod
@@ -68,7 +73,6 @@ class UsersRepository:
         db_user.password = password
         db_user.role = role
         db.commit()
-        db.refresh(db_user)
         return db_user
 
     @staticmethod
@@ -79,4 +83,12 @@ class UsersRepository:
 
     @staticmethod
     def rollback(db: Session):
-        db.rollback()
\ No newline at end of file
+        db.rollback()
+
+    @staticmethod
+    def use_replica(db: Session):
+        prefer_replica(db)
+
+    @staticmethod
+    def release(db: Session):
+        release_connection(db)
\ No newline at end of file
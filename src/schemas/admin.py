@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Any
+
+
+class SlowQuery(BaseModel):
+    statement: str
+    count: int = Field(ge=1)
+    total_ms: float
+    max_ms: float
+    caller: Optional[str] = None
+    parameters: Optional[Any] = None
+    last_seen: datetime
+    explain: Optional[str] = None
+
+class SlowQueriesResponse(BaseModel):
+    threshold_ms: float
+    total: int = Field(default=0, ge=0)
+    queries: List[SlowQuery] = []
+
+class RequestProfileStatusResponse(BaseModel):
+    remaining: int = Field(ge=0)
+    in_flight: int = Field(ge=0)
+    completed: int = Field(ge=0)
+    samples: int = Field(default=0, ge=0)
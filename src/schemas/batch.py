@@ -0,0 +1,71 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Any
+from src.enums import DealStatus, TaskStatus
+from src.schemas.client import ClientCreate
+from src.schemas.deal import DealCreate
+from src.schemas.task import TaskCreate
+
+
+class ClientLookup(BaseModel):
+    client_id: Optional[int] = None
+    name: str = ""
+
+class DealLookup(BaseModel):
+    deal_id: Optional[int] = None
+    title: str = ""
+
+class TaskLookup(BaseModel):
+    task_id: Optional[int] = None
+    title: str = ""
+
+class DelegateClientParams(ClientLookup):
+    username: str = "User"
+
+class AddClientParams(BaseModel):
+    client: ClientCreate
+
+class UpdateClientParams(ClientLookup):
+    client: ClientCreate
+
+class SetDealStatusParams(DealLookup):
+    status: DealStatus = DealStatus.new
+
+class SetDealCloseDateParams(DealLookup):
+    date: datetime
+
+class AddDealParams(BaseModel):
+    deal: DealCreate
+
+class UpdateDealParams(DealLookup):
+    deal: DealCreate
+
+class TakeTaskParams(TaskLookup):
+    status: TaskStatus = TaskStatus.doing
+
+class AddTaskParams(BaseModel):
+    task: TaskCreate
+
+class UpdateTaskParams(TaskLookup):
+    task: TaskCreate
+
+
+class BatchOperation(BaseModel):
+    operation_id: str = Field(description="operation_id of the endpoint to run, e.g. set-status")
+    params: dict = Field(default_factory=dict)
+
+class BatchRequest(BaseModel):
+    atomic: bool = False
+    operations: List[BatchOperation] = Field(min_length=1)
+
+class BatchOperationResult(BaseModel):
+    index: int = Field(ge=0)
+    operation_id: str
+    status_code: int
+    result: Optional[Any] = None
+    detail: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    atomic: bool
+    committed: bool
+    results: List[BatchOperationResult]
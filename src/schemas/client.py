@@ -1,6 +1,9 @@
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
-from typing import Optional, List, Union
-from src.enums import ActionStatus
+from typing import Optional, List, Union, Dict
+from src.enums import ActionStatus, DealStatus
+from src.schemas.deal import DealRead
+from src.schemas.task import TaskRead
+from src.schemas.user import UserRead
 
 class ClientBase(BaseModel):
     name: str = Field(max_length=50, min_length=2, json_schema_extra={"strip_whitespace": True})
@@ -29,3 +32,15 @@ class ClientsListResponse(BaseModel):
     skip: Optional[int] = Field(default=None, ge=0)
     limit: Optional[int] = Field(default=None, ge=0)
     clients: Optional[Union[List[ClientRead], ClientRead]] = None
+
+class DealsSummary(BaseModel):
+    total: int = Field(ge=0)
+    total_value: int = Field(ge=0)
+    by_status: Dict[DealStatus, int] = Field(default_factory=dict)
+
+class ClientOverviewResponse(BaseModel):
+    client: ClientRead
+    owner: Optional[UserRead] = None
+    deals_summary: DealsSummary
+    deals: List[DealRead] = Field(default_factory=list)
+    tasks: List[TaskRead] = Field(default_factory=list)
@@ -0,0 +1,72 @@
+"""Production entry point: a gunicorn master supervising uvicorn workers.
+
+    python -m src.server
+
+The app is imported once in the master (``preload_app``) and forked into
+``WORKERS`` processes, so the code and import-time objects are shared
+copy-on-write. Workers are recycled after ``MAX_REQUESTS`` requests, and
+``kill -HUP <master pid>`` replaces them all gracefully.
+"""
+import os
+import tempfile
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+from src.core.config import settings
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": settings.WORKER_LOOP, "http": settings.WORKER_HTTP}
+
+
+def worker_count() -> int:
+    return settings.WORKERS or os.cpu_count() or 1
+
+
+def post_fork(server, worker):
+    # Pool connections opened by the master must not be shared with the workers
+    from src.database import engine, replicas
+    engine.dispose(close=False)
+    replicas.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+class Server(BaseApplication):
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from src.main import app
+        return app
+
+
+def main():
+    # Must be set before prometheus_client is imported by the preloaded app
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="prometheus-"))
+    Server({
+        "bind": settings.BIND,
+        "workers": worker_count(),
+        "worker_class": Worker,
+        "preload_app": True,
+        "max_requests": settings.MAX_REQUESTS,
+        "max_requests_jitter": settings.MAX_REQUESTS_JITTER,
+        "timeout": settings.WORKER_TIMEOUT,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "keepalive": settings.KEEPALIVE,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
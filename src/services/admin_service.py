@@ -0,0 +1,95 @@
+from src.core.logger import logger
+import asyncio
+from fastapi import HTTPException
+from fastapi.responses import PlainTextResponse
+from datetime import datetime
+
+from src.core.config import settings
+from src.core.profiler import SamplingProfiler, request_profiles
+from src.core.slow_queries import slow_query_log
+from src.schemas.admin import SlowQuery, SlowQueriesResponse, RequestProfileStatusResponse
+
+
+class AdminService:
+
+    ALLOWED_SLOW_QUERY_SORT_FIELDS = {"max_ms", "total_ms", "count"}
+
+    @staticmethod
+    def get_slow_queries(limit: int, sort_by: str) -> SlowQueriesResponse:
+
+        logger.debug('Trying to get slow queries')
+        if sort_by not in AdminService.ALLOWED_SLOW_QUERY_SORT_FIELDS:
+            logger.warning('Invalid sort field %s', sort_by)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid sort field: {sort_by}"
+            )
+
+        queries = [SlowQuery(**{**entry, "last_seen": datetime.fromtimestamp(entry["last_seen"])})
+                   for entry in slow_query_log.top(limit, sort_by)]
+
+        logger.info('Success')
+        return SlowQueriesResponse(
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            total=len(queries),
+            queries=queries
+        )
+
+    @staticmethod
+    def reset_slow_queries() -> SlowQueriesResponse:
+        logger.debug('Trying to reset slow queries')
+        slow_query_log.reset()
+        logger.info('Success')
+        return SlowQueriesResponse(threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS)
+
+    @staticmethod
+    async def profile_process(seconds: float, interval_ms: float) -> PlainTextResponse:
+        logger.debug('Profiling process for %s s', seconds)
+        with SamplingProfiler(interval_ms / 1000) as profiler:
+            await asyncio.sleep(seconds)
+
+        logger.info('Success')
+        return PlainTextResponse(profiler.collapsed(),
+                                 headers={"X-Profile-Samples": str(profiler.samples)})
+
+    @staticmethod
+    def arm_request_profile(count: int, interval_ms: float) -> RequestProfileStatusResponse:
+        logger.debug('Arming profile of next %s requests', count)
+        if not request_profiles.arm(count, interval_ms / 1000):
+            logger.warning('Request profile is still running: %s in flight', request_profiles.in_flight)
+            raise HTTPException(
+                status_code=409,
+                detail="Requests of the current profile are still in flight, try again when they finish"
+            )
+        logger.info('Success')
+        return AdminService._request_profile_status()
+
+    @staticmethod
+    def get_request_profile() -> PlainTextResponse:
+        logger.debug('Trying to get request profile')
+        if request_profiles.profiler is None:
+            logger.warning('Request profile is not armed')
+            raise HTTPException(
+                status_code=404,
+                detail="No request profile, arm one with POST /admin/profile/requests"
+            )
+
+        status = AdminService._request_profile_status()
+        logger.info('Success')
+        return PlainTextResponse(
+            request_profiles.profiler.collapsed(),
+            headers={
+                "X-Profile-Samples": str(status.samples),
+                "X-Profile-Remaining": str(status.remaining),
+                "X-Profile-Completed": str(status.completed),
+            }
+        )
+
+    @staticmethod
+    def _request_profile_status() -> RequestProfileStatusResponse:
+        return RequestProfileStatusResponse(
+            remaining=request_profiles.remaining,
+            in_flight=request_profiles.in_flight,
+            completed=request_profiles.completed,
+            samples=request_profiles.profiler.samples if request_profiles.profiler else 0
+        )
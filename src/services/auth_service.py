@@ -1,6 +1,9 @@
 from src.core.logger import logger
+from math import ceil
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.core.rate_limit import auth_limiter
 
 from src.repositories.users_repository import UsersRepository
 from src.core.security import (
@@ -12,8 +15,9 @@ from src.core.security import (
 class AuthService:
 
     @staticmethod
-    def login(db: Session, username: str, password: str):
+    def login(db: Session, username: str, password: str, client_ip: str | None = None):
         logger.info('Logging user %s', username)
+        AuthService.check_rate_limit("login", username, client_ip)
         user = UsersRepository.get_by_username(db, username)
 
         if not user or not verify_password(password, user.password):
@@ -34,8 +38,10 @@ class AuthService:
         }
 
     @staticmethod
-    def change_password(db: Session, username: str, password: str, new_password: str):
+    def change_password(db: Session, username: str, password: str, new_password: str,
+                        client_ip: str | None = None):
         logger.info('Changing %s user password', username)
+        AuthService.check_rate_limit("change-password", username, client_ip)
         user = UsersRepository.get_by_username(db, username)
 
         if not user or not verify_password(password, user.password):
@@ -53,3 +59,20 @@ class AuthService:
 
         logger.info('Password change successful for %s', username)
         return updated_user
+
+    @staticmethod
+    def check_rate_limit(action: str, username: str, client_ip: str | None):
+        # Runs before the user lookup and the argon2 verify it protects
+        retry_after = 0.0
+        if client_ip:
+            retry_after = auth_limiter.hit(f"{action}:ip:{client_ip}", settings.AUTH_RATE_LIMIT_PER_IP)
+        if not retry_after:
+            retry_after = auth_limiter.hit(f"{action}:user:{username.lower()}",
+                                           settings.AUTH_RATE_LIMIT_PER_USERNAME)
+        if retry_after:
+            logger.warning('Too many %s attempts: username=%s, ip=%s', action, username, client_ip)
+            raise HTTPException(
+                status_code=429,
+                detail="Too many attempts, retry later",
+                headers={"Retry-After": str(ceil(retry_after))}
+            )
@@ -0,0 +1,15 @@
+class Service:
+    """Services reach their repositories through ``*_repository`` class
+    attributes, the SQLAlchemy repositories by default.
+
+    ``using`` returns a copy of the service on other repositories, e.g.
+    ``DealsService.using(deals_repository=MemoryDealsRepository, ...)``.
+    """
+
+    @classmethod
+    def using(cls, **repositories) -> type:
+        unknown = [name for name in repositories
+                   if not name.endswith("_repository") or not hasattr(cls, name)]
+        if unknown:
+            raise TypeError(f"{cls.__name__} has no {', '.join(unknown)}")
+        return type(cls.__name__, (cls,), {"__module__": cls.__module__, **repositories})
@@ -0,0 +1,212 @@
+from src.core.logger import logger
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from typing import NamedTuple, Callable
+
+from src.core.config import settings
+from src.database import Session_local, read_only
+from src.schemas.batch import (
+    BatchRequest,
+    BatchResponse,
+    BatchOperationResult,
+    ClientLookup,
+    DelegateClientParams,
+    AddClientParams,
+    UpdateClientParams,
+    SetDealStatusParams,
+    SetDealCloseDateParams,
+    AddDealParams,
+    UpdateDealParams,
+    TakeTaskParams,
+    AddTaskParams,
+    UpdateTaskParams
+)
+from src.services.clients_service import ClientsService
+from src.services.deals_service import DealsService
+from src.services.tasks_service import TasksService
+
+
+class BatchOperationSpec(NamedTuple):
+    roles: tuple | None
+    params: type
+    handler: Callable
+
+
+class BatchService:
+
+    OPERATIONS = {
+        "take-unassigned-client": BatchOperationSpec(
+            None, ClientLookup,
+            lambda db, user, p: ClientsService.take_unassigned_client(
+                db=db, current_user=user, client_id=p.client_id, name=p.name)),
+        "delegete-unassigned-client": BatchOperationSpec(
+            ("admin",), DelegateClientParams,
+            lambda db, user, p: ClientsService.delegete_unassigned_client(
+                db=db, username=p.username, client_id=p.client_id, name=p.name)),
+        "discharge": BatchOperationSpec(
+            ("admin",), ClientLookup,
+            lambda db, user, p: ClientsService.discharge(
+                db=db, client_id=p.client_id, name=p.name)),
+        "add-client": BatchOperationSpec(
+            ("admin", "manager"), AddClientParams,
+            lambda db, user, p: ClientsService.add_client(
+                client=p.client, db=db, current_user=user)),
+        "update-client": BatchOperationSpec(
+            ("admin", "manager"), UpdateClientParams,
+            lambda db, user, p: ClientsService.update_client(
+                client=p.client, db=db, current_user=user, client_id=p.client_id, name=p.name)),
+        "set-status": BatchOperationSpec(
+            ("admin", "manager"), SetDealStatusParams,
+            lambda db, user, p: DealsService.set_status(
+                status=p.status, db=db, current_user=user, deal_id=p.deal_id, title=p.title)),
+        "set-close-date": BatchOperationSpec(
+            ("admin", "manager"), SetDealCloseDateParams,
+            lambda db, user, p: DealsService.set_close_date(
+                date=p.date, db=db, current_user=user, deal_id=p.deal_id, title=p.title)),
+        "add-deal": BatchOperationSpec(
+            ("admin", "manager"), AddDealParams,
+            lambda db, user, p: DealsService.add_deal(
+                deal=p.deal, db=db, current_user=user)),
+        "update-deal": BatchOperationSpec(
+            ("admin", "manager"), UpdateDealParams,
+            lambda db, user, p: DealsService.update_deal(
+                deal=p.deal, db=db, current_user=user, deal_id=p.deal_id, title=p.title)),
+        "take-task": BatchOperationSpec(
+            None, TakeTaskParams,
+            lambda db, user, p: TasksService.take_task(
+                db=db, status=p.status, current_user=user, task_id=p.task_id, title=p.title)),
+        "add-task": BatchOperationSpec(
+            ("admin", "manager"), AddTaskParams,
+            lambda db, user, p: TasksService.add(
+                task=p.task, db=db)),
+        "update-task": BatchOperationSpec(
+            ("admin", "manager"), UpdateTaskParams,
+            lambda db, user, p: TasksService.update_task(
+                task=p.task, db=db, task_id=p.task_id, title=p.title)),
+    }
+
+    @staticmethod
+    def run(
+        db: Session,
+        current_user,
+        batch: BatchRequest,
+    ) -> BatchResponse:
+
+        logger.debug('Trying to run batch')
+        if len(batch.operations) > settings.BATCH_MAX_OPERATIONS:
+            logger.warning('Too many operations in batch (%s)', len(batch.operations))
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many operations: at most {settings.BATCH_MAX_OPERATIONS} allowed"
+            )
+
+        if not batch.atomic:
+            results = [BatchService._run_in_savepoint(db, current_user, index, operation)
+                       for index, operation in enumerate(batch.operations)]
+            logger.info('Success')
+            return BatchResponse(atomic=False, committed=True, results=results)
+
+        logger.debug('Opening batch transaction')
+        # The request's session only loaded the user: end its transaction, whose
+        # write lock the batch connection would wait for on SQLite
+        db.close()
+        connection = db.get_bind().connect()
+        transaction = connection.begin()
+        # The operations' commits only release a SAVEPOINT of the batch transaction
+        batch_db = Session_local(bind=connection, join_transaction_mode="create_savepoint")
+        if db.info.get("read_only"):
+            read_only(batch_db, db.info["read_only"])
+        results = []
+        try:
+            for index, operation in enumerate(batch.operations):
+                result = BatchService._run_operation(batch_db, current_user, index, operation)
+                results.append(result)
+                if result.status_code >= 400:
+                    break
+
+            committed = all(result.status_code < 400 for result in results)
+            if committed:
+                logger.debug('Committing batch transaction')
+                transaction.commit()
+            else:
+                logger.warning('Batch operation %s failed, rolling back', len(results) - 1)
+                transaction.rollback()
+        finally:
+            batch_db.close()
+            connection.close()
+
+        logger.info('Success')
+        return BatchResponse(atomic=True, committed=committed, results=results)
+
+    @staticmethod
+    def _run_in_savepoint(db: Session, current_user, index: int, operation) -> BatchOperationResult:
+        # The operations commit their own changes; a failed one is rolled back
+        # to its SAVEPOINT, so it cannot undo or fail the others
+        savepoint = db.begin_nested()
+        try:
+            result = BatchService._run_operation(db, current_user, index, operation)
+        except SQLAlchemyError as e:
+            logger.error('Batch operation %s failed: %s', index, e.__class__.__name__)
+            result = BatchOperationResult(
+                index=index,
+                operation_id=operation.operation_id,
+                status_code=500,
+                detail=f"Database error: {e.__class__.__name__}"
+            )
+        # Gone once the operation has committed or rolled back the session
+        if db.get_nested_transaction() is savepoint:
+            if result.status_code < 400:
+                savepoint.commit()
+            else:
+                savepoint.rollback()
+        return result
+
+    @staticmethod
+    def _run_operation(db: Session, current_user, index: int, operation) -> BatchOperationResult:
+        logger.debug('Running batch operation %s (%s)', index, operation.operation_id)
+        spec = BatchService.OPERATIONS.get(operation.operation_id)
+
+        if spec is None:
+            logger.warning('Unknown batch operation %s', operation.operation_id)
+            return BatchOperationResult(
+                index=index,
+                operation_id=operation.operation_id,
+                status_code=400,
+                detail=f"Unknown operation: {operation.operation_id}"
+            )
+
+        if spec.roles and current_user.role not in spec.roles:
+            logger.warning('User %s acess denied, role=%s', current_user.username, current_user.role)
+            return BatchOperationResult(
+                index=index,
+                operation_id=operation.operation_id,
+                status_code=403,
+                detail=f"Access denied. Allowed roles: {', '.join(spec.roles)}"
+            )
+
+        try:
+            params = spec.params.model_validate(operation.params)
+            result = spec.handler(db, current_user, params)
+        except ValidationError as e:
+            return BatchOperationResult(
+                index=index,
+                operation_id=operation.operation_id,
+                status_code=400,
+                detail=e.errors()[0]["msg"]
+            )
+        except HTTPException as e:
+            return BatchOperationResult(
+                index=index,
+                operation_id=operation.operation_id,
+                status_code=e.status_code,
+                detail=str(e.detail)
+            )
+
+        return BatchOperationResult(
+            index=index,
+            operation_id=operation.operation_id,
+            status_code=200,
+            result=result
+        )
@@ -1,18 +1,35 @@
 from src.core.logger import logger
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
+from src.core.config import settings
 
-from src.schemas.client import ClientsListResponse, StatusClientsResponse, ClientRead, ClientCreate
+from src.schemas.client import (
+    ClientsListResponse,
+    StatusClientsResponse,
+    ClientRead,
+    ClientCreate,
+    ClientOverviewResponse,
+    DealsSummary
+)
+from src.schemas.deal import DealRead
+from src.schemas.task import TaskRead
+from src.schemas.user import UserRead
 from src.repositories.clients_repository import ClientsRepository
 from src.repositories.users_repository import UsersRepository
+from src.repositories.protocols import ClientsRepositoryProtocol, UsersRepositoryProtocol
+from src.services.base import Service
 
 
-class ClientsService:
+class ClientsService(Service):
+
+    clients_repository: ClientsRepositoryProtocol = ClientsRepository
+    users_repository: UsersRepositoryProtocol = UsersRepository
 
     ALLOWED_SORT_FIELDS = {"id", "name", "email", "phone"}
 
-    @staticmethod
+    @classmethod
     def get_all(
+        cls,
         db: Session,
         current_user,
         skip: int | None,
@@ -25,7 +42,8 @@ class ClientsService:
     ) -> ClientsListResponse:
 
         logger.debug('Trying to get all clients')
-        if sort_by not in ClientsService.ALLOWED_SORT_FIELDS:
+        cls.clients_repository.use_replica(db)
+        if sort_by not in cls.ALLOWED_SORT_FIELDS:
             logger.warning('Invalid sort field %s', sort_by)
             raise HTTPException(
                 status_code=400,
@@ -40,21 +58,23 @@ class ClientsService:
             
         if related_to_user:
             logger.debug('Add related_to_user filter (%s)', related_to_user)
-            filters.append(ClientsRepository.filter_related_to_user(db, related_to_user))
+            filters.append(cls.clients_repository.filter_related_to_user(db, related_to_user))
         
         if search:
             logger.debug('Add search filter (%s)', search)
-            filters.append(ClientsRepository.search(search))        
+            filters.append(cls.clients_repository.search(search))        
 
         logger.debug('Applying filters')
-        query = ClientsRepository.apply_filters(db, filters)
+        query = cls.clients_repository.apply_filters(db, filters)
         logger.debug('Applying sorting')
-        query = ClientsRepository.apply_sorting(query, sort_by, order)
+        query = cls.clients_repository.apply_sorting(query, sort_by, order)
         logger.debug('Counting total items')
-        total_clients = ClientsRepository.count(query)
+        total_clients = cls.clients_repository.count(query)
         logger.debug('Paginating')
-        clients = ClientsRepository.paginate(query, skip, limit)
+        clients = cls.clients_repository.paginate(query, skip, limit)
 
+        logger.debug('Releasing connection')
+        cls.clients_repository.release(db)
         logger.debug('Forming ClientsListResponse')
         response = ClientsListResponse(
             total=total_clients,
@@ -65,8 +85,40 @@ class ClientsService:
         logger.info('Success')
         return response
     
-    @staticmethod
+    @classmethod
+    def get_by_ids(
+        cls,
+        db: Session,
+        ids: list[int],
+    ) -> ClientsListResponse:
+
+        logger.debug('Trying to get clients by ids')
+        cls.clients_repository.use_replica(db)
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.BATCH_MAX_IDS:
+            logger.warning('Too many ids requested (%s)', len(ids))
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many ids: at most {settings.BATCH_MAX_IDS} allowed"
+            )
+
+        clients = cls.clients_repository.get_by_ids(db, ids)
+
+        logger.debug('Releasing connection')
+        cls.clients_repository.release(db)
+        logger.debug('Forming ClientsListResponse')
+        response = ClientsListResponse(
+            total=len(clients),
+            skip=None,
+            limit=None,
+            clients=[ClientRead.model_validate(client) for client in clients]
+        )
+        logger.info('Success')
+        return response
+    
+    @classmethod
     def get_unassigned_clients(
+        cls,
         db: Session,
         skip: int | None,
         limit: int | None,
@@ -76,7 +128,8 @@ class ClientsService:
     ) -> ClientsListResponse:
 
         logger.debug('Trying to get unassigned clients')
-        if sort_by not in ClientsService.ALLOWED_SORT_FIELDS:
+        cls.clients_repository.use_replica(db)
+        if sort_by not in cls.ALLOWED_SORT_FIELDS:
             logger.warning('Invalid sort field %s', sort_by)
             raise HTTPException(
                 status_code=400,
@@ -86,21 +139,23 @@ class ClientsService:
         filters = []
 
         logger.debug('Add unassigned clients filter')
-        filters.append(ClientsRepository.get_unassign())
+        filters.append(cls.clients_repository.get_unassign())
 
         if search:
             logger.debug('Add search filter (%s)', search)
-            filters.append(ClientsRepository.search(search))     
+            filters.append(cls.clients_repository.search(search))     
 
         logger.debug('Applying filters')
-        query = ClientsRepository.apply_filters(db, filters)
+        query = cls.clients_repository.apply_filters(db, filters)
         logger.debug('Applying sorting')
-        query = ClientsRepository.apply_sorting(query, sort_by, order)
+        query = cls.clients_repository.apply_sorting(query, sort_by, order)
         logger.debug('Counting total items')
-        total_clients = ClientsRepository.count(query)
+        total_clients = cls.clients_repository.count(query)
         logger.debug('Paginating')
-        clients = ClientsRepository.paginate(query, skip, limit)
+        clients = cls.clients_repository.paginate(query, skip, limit)
 
+        logger.debug('Releasing connection')
+        cls.clients_repository.release(db)
         logger.debug('Forming ClientsListResponse')
         response = ClientsListResponse(
             total=total_clients,
@@ -111,8 +166,46 @@ class ClientsService:
         logger.info('Success')
         return response
     
-    @staticmethod
+    @classmethod
+    def get_overview(
+        cls,
+        db: Session,
+        client_id: int,
+    ) -> ClientOverviewResponse:
+
+        logger.debug('Trying to get client overview')
+        cls.clients_repository.use_replica(db)
+        db_client = cls.clients_repository.get_overview(db, client_id)
+
+        if not db_client:
+            logger.warning('Client (%s) not found', client_id)
+            raise HTTPException(status_code=404, detail="Client not found")
+
+        logger.debug('Aggregating deals')
+        by_status = {}
+        for deal in db_client.deals:
+            by_status[deal.status] = by_status.get(deal.status, 0) + 1
+
+        owner = db_client.owner
+
+        logger.debug('Forming ClientOverviewResponse')
+        response = ClientOverviewResponse(
+            client=ClientRead.model_validate(db_client),
+            owner=UserRead.model_validate(owner) if owner else None,
+            deals_summary=DealsSummary(
+                total=len(db_client.deals),
+                total_value=sum(deal.value for deal in db_client.deals),
+                by_status=by_status
+            ),
+            deals=[DealRead.model_validate(deal) for deal in db_client.deals],
+            tasks=[TaskRead.model_validate(task) for task in owner.tasks] if owner else []
+        )
+        logger.info('Success')
+        return response
+    
+    @classmethod
     def take_unassigned_client(
+        cls,
         db: Session, 
         current_user,
         client_id: int | None,
@@ -122,10 +215,10 @@ class ClientsService:
         
         if client_id:
             logger.debug('Searching by id')
-            db_client = ClientsRepository.get_by_id(db, client_id)
+            db_client = cls.clients_repository.get_by_id(db, client_id)
         else:
             logger.debug('Searching by client_name')
-            db_client = ClientsRepository.get_by_name(db, name)
+            db_client = cls.clients_repository.get_by_name(db, name)
 
         if not db_client:
             logger.warning('Client not found')
@@ -137,7 +230,7 @@ class ClientsService:
     
         try:
             logger.debug('Trying to take unassigned client')
-            taken_client = ClientsRepository.take_client(db, db_client, current_user.id)
+            taken_client = cls.clients_repository.take_client(db, db_client, current_user.id)
             logger.debug('Forming StatusClientsResponse')
             responce = StatusClientsResponse(
                 status="changed",
@@ -147,11 +240,12 @@ class ClientsService:
             return responce
         except Exception as e:
             logger.error('Failed to take client: %s', str(e))
-            ClientsRepository.rollback(db)
+            cls.clients_repository.rollback(db)
             raise HTTPException(500, f"Failed to take client: {str(e)}")
         
-    @staticmethod
+    @classmethod
     def delegete_unassigned_client(
+        cls,
         db: Session, 
         username: str,
         client_id: int | None,
@@ -160,23 +254,23 @@ class ClientsService:
         
         if client_id:
             logger.debug('Searching by id')
-            db_client = ClientsRepository.get_by_id(db, client_id)
+            db_client = cls.clients_repository.get_by_id(db, client_id)
         else:
             logger.debug('Searching by client_name')
-            db_client = ClientsRepository.get_by_name(db, name)
+            db_client = cls.clients_repository.get_by_name(db, name)
 
         if not db_client:
             logger.warning('Client not found')
             raise HTTPException(status_code=404, detail="Client not found")
         
-        assigned_user = UsersRepository.get_by_username(db, username)
+        assigned_user = cls.users_repository.get_by_username(db, username)
         if not assigned_user:
             logger.warning('Client %s is already assigned.', db_client.name)
             raise HTTPException(status_code=404, detail="User not found")
         
         try:
             logger.debug('Trying to delegete client')
-            delegeted_user = ClientsRepository.take_client(db, db_client, assigned_user.id)
+            delegeted_user = cls.clients_repository.take_client(db, db_client, assigned_user.id)
             logger.debug('Forming StatusClientsResponse')
             responce = StatusClientsResponse(
                 status="changed",
@@ -186,11 +280,12 @@ class ClientsService:
             return responce
         except Exception as e:
             logger.error('Failed to delegete client: %s', str(e))
-            ClientsRepository.rollback(db)
+            cls.clients_repository.rollback(db)
             raise HTTPException(500, f"Failed to delegete client: {str(e)}")
     
-    @staticmethod
+    @classmethod
     def discharge(
+        cls,
         db: Session, 
         client_id: int | None,
         name: str | None,
@@ -198,10 +293,10 @@ class ClientsService:
         
         if client_id:
             logger.debug('Searching by id')
-            db_client = ClientsRepository.get_by_id(db, client_id)
+            db_client = cls.clients_repository.get_by_id(db, client_id)
         else:
             logger.debug('Searching by client_name')
-            db_client = ClientsRepository.get_by_name(db, name)
+            db_client = cls.clients_repository.get_by_name(db, name)
 
         if not db_client:
             logger.warning('Client not found')
@@ -209,7 +304,7 @@ class ClientsService:
         
         try:
             logger.debug('Trying to discharge client')
-            discharged_client = ClientsRepository.take_client(db, db_client, None)
+            discharged_client = cls.clients_repository.take_client(db, db_client, None)
             logger.debug('Forming StatusClientsResponse')
             response = StatusClientsResponse(
                 status="changed",
@@ -219,25 +314,26 @@ class ClientsService:
             return response
         except Exception as e:
             logger.error('Failed to discharge client: %s', str(e))
-            ClientsRepository.rollback(db)
+            cls.clients_repository.rollback(db)
             raise HTTPException(500, f"Failed to discharge client: {str(e)}")
     
-    @staticmethod
+    @classmethod
     def add_client(
+        cls,
         client: ClientCreate,
         db: Session, 
         current_user
         ) -> StatusClientsResponse:
         
         logger.debug('Searching by client_name')
-        query = ClientsRepository.get_by_name(db, client.name)
+        query = cls.clients_repository.get_by_name(db, client.name)
 
         if query:
             logger.warning('Client already exists')
             raise HTTPException(status_code=409, detail="Client already exists")
         
         logger.debug('Getting assigned user')
-        assigned_user = UsersRepository.get_by_username(db, client.user_name)
+        assigned_user = cls.users_repository.get_by_username(db, client.user_name)
 
         if current_user.role == 'manager' and assigned_user.id != current_user.id:
             logger.warning('Access denied')
@@ -253,7 +349,7 @@ class ClientsService:
 
         try:
             logger.debug('Trying to take add client')
-            created_client = ClientsRepository.add(db, 
+            created_client = cls.clients_repository.add(db, 
                                                    assigned_user.id, 
                                                    client.name,
                                                    client.email,
@@ -268,11 +364,12 @@ class ClientsService:
             return response
         except Exception as e:
             logger.error('Failed to create client')
-            ClientsRepository.rollback(db)
+            cls.clients_repository.rollback(db)
             raise HTTPException(500, f"Failed to create client: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def update_client(
+        cls,
         client: ClientCreate,
         db: Session, 
         current_user,
@@ -282,17 +379,17 @@ class ClientsService:
         
         if client_id:
             logger.debug('Searching by id')
-            db_client = ClientsRepository.get_by_id(db, client_id)
+            db_client = cls.clients_repository.get_by_id(db, client_id)
         else:
             logger.debug('Searching by client_name')
-            db_client = ClientsRepository.get_by_name(db, name)
+            db_client = cls.clients_repository.get_by_name(db, name)
 
         if not db_client:
             logger.warning('Client not found')
             raise HTTPException(status_code=404, detail="Client not found")
         
         logger.debug('Getting assigned user')
-        assigned_user = UsersRepository.get_by_username(db, client.user_name)
+        assigned_user = cls.users_repository.get_by_username(db, client.user_name)
 
         if current_user.role == 'manager' and assigned_user.id != current_user.id:
             logger.warning('Access denied')
@@ -308,7 +405,7 @@ class ClientsService:
 
         try:
             logger.debug('Trying update client')
-            updated_client = ClientsRepository.update(db, 
+            updated_client = cls.clients_repository.update(db, 
                                                    db_client,
                                                    assigned_user.id, 
                                                    client.name,
@@ -324,17 +421,18 @@ class ClientsService:
             return response
         except Exception as e:
             logger.error('Failed to change user')
-            ClientsRepository.rollback(db)
+            cls.clients_repository.rollback(db)
             raise HTTPException(500, f"Failed to change user: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def delete_client(
+        cls,
         name: str, 
         db: Session,
         ) -> StatusClientsResponse:
         
         logger.debug('Searching by client name')
-        db_client = ClientsRepository.get_by_name(db, name)
+        db_client = cls.clients_repository.get_by_name(db, name)
 
         if not db_client:
             logger.warning('Client not found')
@@ -342,7 +440,7 @@ class ClientsService:
 
         try:
             logger.debug('Trying to delete client')
-            deleted_client = ClientsRepository.delete(db, db_client)
+            deleted_client = cls.clients_repository.delete(db, db_client)
             logger.debug('Forming StatusClientsResponse')
             response = StatusClientsResponse(
                 status="deleted",
@@ -352,5 +450,5 @@ class ClientsService:
             return response
         except Exception as e:
             logger.error('Failed to delete client: %s', str(e))
-            ClientsRepository.rollback(db)
+            cls.clients_repository.rollback(db)
             raise HTTPException(500, f"Failed to delete client: {str(e)}")
@@ -1,20 +1,26 @@
 from src.core.logger import logger
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
+from src.core.config import settings
 from datetime import datetime
 
 from src.schemas.deal import DealsListResponse, StatusDealsResponse, DealRead, DealCreate
 from src.repositories.deals_repository import DealsRepository
 from src.repositories.clients_repository import ClientsRepository
-from src.repositories.users_repository import UsersRepository
+from src.repositories.protocols import DealsRepositoryProtocol, ClientsRepositoryProtocol
+from src.services.base import Service
 
 
-class DealsService:
+class DealsService(Service):
+
+    deals_repository: DealsRepositoryProtocol = DealsRepository
+    clients_repository: ClientsRepositoryProtocol = ClientsRepository
 
     ALLOWED_SORT_FIELDS = {"id", "tittle", "value", "created_at", "updated_at", "closed_at"}
 
-    @staticmethod
+    @classmethod
     def get_all(
+        cls,
         db: Session,
         current_user,
         skip: int | None,
@@ -30,7 +36,8 @@ class DealsService:
     ) -> DealsListResponse:
         
         logger.debug('Trying to get all deals')
-        if sort_by not in DealsService.ALLOWED_SORT_FIELDS:
+        cls.deals_repository.use_replica(db)
+        if sort_by not in cls.ALLOWED_SORT_FIELDS:
             logger.warning('Invalid sort field %s', sort_by)
             raise HTTPException(
                 status_code=400,
@@ -41,7 +48,7 @@ class DealsService:
         
         if related_to_client:
             logger.debug('Add related_to_client filter (%s)', related_to_client)
-            filters.append(DealsRepository.get_by_client_name(related_to_client))
+            filters.append(cls.deals_repository.get_by_client_name(related_to_client))
 
         if related_to_me:
             logger.debug('Add related_to_me filter (%s)', related_to_me)
@@ -49,29 +56,31 @@ class DealsService:
 
         if related_to_user:
             logger.debug('Add related_to_user filter (%s)', related_to_user)
-            filters.append(DealsRepository.get_by_username(related_to_user))
+            filters.append(cls.deals_repository.get_by_username(related_to_user))
         
         if search:
             logger.debug('Add search filter (%s)', search)
-            filters.append(DealsRepository.search(search))
+            filters.append(cls.deals_repository.search(search))
 
         if more_than:
             logger.debug('Add more_than filter (%s)', more_than)
-            filters.append(DealsRepository.more_than(more_than))
+            filters.append(cls.deals_repository.more_than(more_than))
     
         if less_than:
             logger.debug('Add less_than filter (%s)', less_than)
-            filters.append(DealsRepository.less_than(less_than))
+            filters.append(cls.deals_repository.less_than(less_than))
         
         logger.debug('Applying filters')
-        query = DealsRepository.apply_filters(db, filters)
+        query = cls.deals_repository.apply_filters(db, filters)
         logger.debug('Applying sorting')
-        query = DealsRepository.apply_sorting(query, sort_by, order)
+        query = cls.deals_repository.apply_sorting(query, sort_by, order)
         logger.debug('Counting total items')
-        total_deals = DealsRepository.count(query)
+        total_deals = cls.deals_repository.count(query)
         logger.debug('Paginating')
-        deals = DealsRepository.paginate(query, skip, limit)
+        deals = cls.deals_repository.paginate(query, skip, limit)
 
+        logger.debug('Releasing connection')
+        cls.deals_repository.release(db)
         logger.debug('Forming DealsListResponse')
         response = DealsListResponse(
             total=total_deals,
@@ -82,8 +91,40 @@ class DealsService:
         logger.info('Success')
         return response
     
-    @staticmethod
+    @classmethod
+    def get_by_ids(
+        cls,
+        db: Session,
+        ids: list[int],
+    ) -> DealsListResponse:
+
+        logger.debug('Trying to get deals by ids')
+        cls.deals_repository.use_replica(db)
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.BATCH_MAX_IDS:
+            logger.warning('Too many ids requested (%s)', len(ids))
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many ids: at most {settings.BATCH_MAX_IDS} allowed"
+            )
+
+        deals = cls.deals_repository.get_by_ids(db, ids)
+
+        logger.debug('Releasing connection')
+        cls.deals_repository.release(db)
+        logger.debug('Forming DealsListResponse')
+        response = DealsListResponse(
+            total=len(deals),
+            skip=None,
+            limit=None,
+            deals=[DealRead.model_validate(deal) for deal in deals]
+        )
+        logger.info('Success')
+        return response
+    
+    @classmethod
     def get_by_date(
+        cls,
         db: Session,
         current_user,
         skip: int | None,
@@ -104,7 +145,8 @@ class DealsService:
     ) -> DealsListResponse:
 
         logger.debug('Trying to get all deals by datefield')
-        if sort_by not in DealsService.ALLOWED_SORT_FIELDS:
+        cls.deals_repository.use_replica(db)
+        if sort_by not in cls.ALLOWED_SORT_FIELDS:
             logger.warning('Invalid sort field %s', sort_by)
             raise HTTPException(
                 status_code=400,
@@ -115,7 +157,7 @@ class DealsService:
 
         if related_to_client:
             logger.debug('Add related_to_client filter (%s)', related_to_client)
-            filters.append(DealsRepository.get_by_client_name(related_to_client))
+            filters.append(cls.deals_repository.get_by_client_name(related_to_client))
 
         if related_to_me:
             logger.debug('Add related_to_me filter (%s)', related_to_me)
@@ -123,45 +165,47 @@ class DealsService:
 
         if related_to_user:
             logger.debug('Add related_to_user filter (%s)', related_to_user)
-            filters.append(DealsRepository.get_by_username(related_to_user))
+            filters.append(cls.deals_repository.get_by_username(related_to_user))
         
         if search:
             logger.debug('Add search filter (%s)', search)
-            filters.append(DealsRepository.search(query, search))
+            filters.append(cls.deals_repository.search(search))
 
         if more_than:
             logger.debug('Add more_than filter (%s)', more_than)
-            filters.append(DealsRepository.more_than(query, more_than))
+            filters.append(cls.deals_repository.more_than(more_than))
     
         if less_than:
             logger.debug('Add less_than filter (%s)', less_than)
-            filters.append(DealsRepository.less_than(query, less_than))
+            filters.append(cls.deals_repository.less_than(less_than))
 
         if exact_date:
             logger.debug('Add exact_date filter (%s)', exact_date)
-            filters.append(DealsRepository.exact_date(exact_date, date_field))
+            filters.append(cls.deals_repository.exact_date(exact_date, date_field))
 
         if earlier_than:
             logger.debug('Add earlier_than filter (%s)', earlier_than)
-            filters.append(DealsRepository.earlier_than(earlier_than, date_field))
+            filters.append(cls.deals_repository.earlier_than(earlier_than, date_field))
         
         if later_than:
             logger.debug('Add later_than filter (%s)', later_than)
-            filters.append(DealsRepository.later_than(later_than, date_field))
+            filters.append(cls.deals_repository.later_than(later_than, date_field))
 
         if new:
             logger.debug('Add new filter (%s)', new)
-            filters.append(DealsRepository.new(date_field))
+            filters.append(cls.deals_repository.new(date_field))
 
         logger.debug('Applying filters')
-        query = DealsRepository.apply_filters(db, filters)
+        query = cls.deals_repository.apply_filters(db, filters)
         logger.debug('Applying sorting')
-        query = DealsRepository.apply_sorting(query, sort_by, order)
+        query = cls.deals_repository.apply_sorting(query, sort_by, order)
         logger.debug('Counting total items')
-        total_deals = DealsRepository.count(query)
+        total_deals = cls.deals_repository.count(query)
         logger.debug('Paginating')
-        deals = DealsRepository.paginate(query, skip, limit)
+        deals = cls.deals_repository.paginate(query, skip, limit)
 
+        logger.debug('Releasing connection')
+        cls.deals_repository.release(db)
         logger.debug('Forming DealsListResponse')
         response = DealsListResponse(
             total=total_deals,
@@ -172,8 +216,9 @@ class DealsService:
         logger.info('Success')
         return response
 
-    @staticmethod
+    @classmethod
     def update_deal(
+        cls,
         deal: DealCreate,
         db: Session, 
         current_user,
@@ -183,20 +228,19 @@ class DealsService:
         
         if deal_id:
             logger.debug('Searching by id')
-            db_deal = DealsRepository.get_by_id(db, deal_id)
+            db_deal = cls.deals_repository.get_by_id(db, deal_id)
         else:
             logger.debug('Searching by title')
-            db_deal = DealsRepository.get_by_title(db, title)
+            db_deal = cls.deals_repository.get_by_title(db, title)
         
         if not db_deal:
             logger.warning('Deal not found')
             raise HTTPException(status_code=404, detail="Deal not found")
         
-        client_id = ClientsRepository.get_by_id(db, db_deal.client_id)
-        user_id = UsersRepository.get_by_id(db, client_id.user_id)
+        db_client = cls.clients_repository.get_by_id(db, db_deal.client_id)
         
         if current_user.role == 'manager':
-            if user_id != current_user.id:
+            if db_client.user_id != current_user.id:
                 logger.warning('Access denied')
                 raise HTTPException(
                     status_code=403,
@@ -206,9 +250,9 @@ class DealsService:
 
         try:
             logger.debug('Trying update deal')
-            updated_deal = ClientsRepository.update(db, 
+            updated_deal = cls.deals_repository.update(db, 
                                                     db_deal,
-                                                    client_id,
+                                                    db_client.id,
                                                     deal.title,
                                                     deal.status,
                                                     deal.value,
@@ -222,11 +266,12 @@ class DealsService:
             return response
         except Exception as e:
             logger.error('Failed to change deal')
-            DealsRepository.rollback(db)
+            cls.deals_repository.rollback(db)
             raise HTTPException(500, f"Failed to change deal: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def set_status(
+        cls,
         status: str,
         db: Session, 
         current_user,
@@ -236,20 +281,19 @@ class DealsService:
         
         if deal_id:
             logger.debug('Searching by id')
-            db_deal = DealsRepository.get_by_id(db, deal_id)
+            db_deal = cls.deals_repository.get_by_id(db, deal_id)
         else:
             logger.debug('Searching by title')
-            db_deal = DealsRepository.get_by_title(db, title)
+            db_deal = cls.deals_repository.get_by_title(db, title)
         
         if not db_deal:
             logger.warning('Deal not found')
             raise HTTPException(status_code=404, detail="Deal not found")
         
-        client_id = ClientsRepository.get_by_id(db, db_deal.client_id)
+        db_client = cls.clients_repository.get_by_id(db, db_deal.client_id)
         
         if current_user.role == 'manager':
-            user_id = UsersRepository.get_by_id(db, client_id.user_id)
-            if user_id != current_user.id:
+            if db_client.user_id != current_user.id:
                 logger.warning('Access denied')
                 raise HTTPException(
                     status_code=403,
@@ -259,9 +303,9 @@ class DealsService:
 
         try:
             logger.debug('Trying set deal status')
-            updated_deal = DealsRepository.update(db, 
+            updated_deal = cls.deals_repository.update(db, 
                                                     db_deal,
-                                                    client_id.id,
+                                                    db_client.id,
                                                     db_deal.title,
                                                     status,
                                                     db_deal.value,
@@ -276,11 +320,12 @@ class DealsService:
 
         except Exception as e:
             logger.error('Failed to change deal status')
-            DealsRepository.rollback(db)
+            cls.deals_repository.rollback(db)
             raise HTTPException(500, f"Failed to change deal status: {str(e)}")
     
-    @staticmethod
+    @classmethod
     def set_close_date(
+        cls,
         date: datetime,
         db: Session, 
         current_user,
@@ -290,20 +335,19 @@ class DealsService:
         
         if deal_id:
             logger.debug('Searching by id')
-            db_deal = DealsRepository.get_by_id(db, deal_id)
+            db_deal = cls.deals_repository.get_by_id(db, deal_id)
         else:
             logger.debug('Searching by title')
-            db_deal = DealsRepository.get_by_title(db, title)
+            db_deal = cls.deals_repository.get_by_title(db, title)
         
         if not db_deal:
             logger.warning('Deal not found')
             raise HTTPException(status_code=404, detail="Deal not found")
         
-        db_client = ClientsRepository.get_by_id(db, db_deal.client_id)
+        db_client = cls.clients_repository.get_by_id(db, db_deal.client_id)
         
         if current_user.role == 'manager':
-            user_id = UsersRepository.get_by_id(db, db_client.user_id)
-            if user_id != current_user.id:
+            if db_client.user_id != current_user.id:
                 logger.warning('Access denied')
                 raise HTTPException(
                     status_code=403,
@@ -313,7 +357,7 @@ class DealsService:
 
         try:
             logger.debug('Trying set deal close date')
-            updated_deal = DealsRepository.update(db, 
+            updated_deal = cls.deals_repository.update(db, 
                                                     db_deal,
                                                     db_client.id,
                                                     db_deal.title,
@@ -329,32 +373,31 @@ class DealsService:
             return response
         except Exception as e:
             logger.error('Failed to change deal')
-            DealsRepository.rollback(db)
+            cls.deals_repository.rollback(db)
             raise HTTPException(500, f"Failed to change deal status: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def add_deal(
+        cls,
         deal: DealCreate,
         db: Session, 
         current_user
         ) -> StatusDealsResponse:
         
-        logger.debug('Searching by title')
-        query = DealsRepository.get_by_title(db, deal.title)
+        logger.debug('Searching by title and client name')
+        assigned_client, title_taken = cls.deals_repository.get_client_and_title_taken(
+            db, deal.client_name, deal.title)
 
-        if query:
+        if title_taken:
             logger.warning('Deal already exists')
             raise HTTPException(status_code=409, detail="Deal already exists")
-        
-        assigned_client = ClientsRepository.get_by_name(db, deal.client_name)
 
         if not assigned_client:
             logger.warning('Client not found')
             raise HTTPException(status_code=404, detail="Client not found")
         
         if current_user.role == 'manager':
-            user_id = UsersRepository.get_by_id(db, assigned_client.user_id)
-            if user_id != current_user.id:
+            if assigned_client.user_id != current_user.id:
                 logger.warning('Access denied')
                 raise HTTPException(
                     status_code=403,
@@ -364,7 +407,7 @@ class DealsService:
 
         try:
             logger.debug('Trying create deal')
-            created_deal = DealsRepository.add(db, 
+            created_deal = cls.deals_repository.add(db, 
                                                assigned_client.id,
                                                deal.title,
                                                deal.status,
@@ -379,11 +422,12 @@ class DealsService:
             return response
         except Exception as e:
             logger.error('Failed to create deal')
-            DealsRepository.rollback(db)
+            cls.deals_repository.rollback(db)
             raise HTTPException(500, f"Failed to create deal: {str(e)}")
         
-    @staticmethod
+    @classmethod
     def delete_deal(
+        cls,
         title: str,
         deal_id: int | None,
         db: Session,
@@ -391,10 +435,10 @@ class DealsService:
 
         if deal_id:
             logger.debug('Searching by id')
-            db_deal = DealsRepository.get_by_id(db, deal_id)
+            db_deal = cls.deals_repository.get_by_id(db, deal_id)
         else:
             logger.debug('Searching by title')
-            db_deal = DealsRepository.get_by_title(db, title)
+            db_deal = cls.deals_repository.get_by_title(db, title)
 
         if not db_deal:
                 logger.warning('Deal not found')
@@ -402,7 +446,7 @@ class DealsService:
         
         try:
             logger.debug('Trying delete deal')
-            deleted_deal = DealsRepository.delete(db, db_deal)
+            deleted_deal = cls.deals_repository.delete(db, db_deal)
             logger.debug('Forming StatusDealsResponse')
             response = StatusDealsResponse(
                 status="deleted",
@@ -414,8 +458,9 @@ class DealsService:
             logger.error('Failed to delete deal')
             raise HTTPException(500, f"Failed to delete deal: {str(e)}")
         
-    @staticmethod
+    @classmethod
     def delete_deal_by_client(
+        cls,
         client_name: str,
         client_id: int | None,
         db: Session,
@@ -425,7 +470,7 @@ class DealsService:
 
         if client_id:
             logger.debug('Searching by client_id')
-            client = ClientsRepository.get_by_id(db, client_id)
+            client = cls.clients_repository.get_by_id(db, client_id)
             if not client:
                 logger.warning('Client not found')
                 raise HTTPException(status_code=404, detail="Client not found")
@@ -433,27 +478,28 @@ class DealsService:
             client_name = client.name
 
         logger.debug('Searching by client_name')
-        filters.append(DealsRepository.get_by_client_name(client_name))
+        filters.append(cls.deals_repository.get_by_client_name(client_name))
 
         logger.debug('Applying filters')
-        query = DealsRepository.apply_filters(db, filters)
-        deals_to_delete = query.all()
+        query = cls.deals_repository.apply_filters(db, filters)
 
-        if not deals_to_delete:
-            logger.warning('No deals for this client')
-            raise HTTPException(status_code=404, detail="No deals for this client")
-        
         try:
             logger.debug('Trying delete deals by client')
-            _ = DealsRepository.delete_group(db, query)
-            logger.debug('Forming StatusDealsResponse')
-            response = StatusDealsResponse(
-                status="deleted",
-                deals=[DealRead.model_validate(deal_to_delete) for deal_to_delete in deals_to_delete]
-            )
-            logger.info('Success')
-            return response
+            deleted_deals = cls.deals_repository.delete_group(db, query)
         except Exception as e:
             logger.error('Failed to delete deals by client')
+            cls.deals_repository.rollback(db)
             raise HTTPException(500, f"Failed to delete deals: {str(e)}")
+
+        if not deleted_deals:
+            logger.warning('No deals for this client')
+            raise HTTPException(status_code=404, detail="No deals for this client")
+
+        logger.debug('Forming StatusDealsResponse')
+        response = StatusDealsResponse(
+            status="deleted",
+            deals=[DealRead.model_validate(deleted_deal) for deleted_deal in deleted_deals]
+        )
+        logger.info('Success')
+        return response
         
\ No newline at end of file
@@ -1,19 +1,26 @@
 from src.core.logger import logger
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
+from src.core.config import settings
 from datetime import datetime
 
 from src.schemas.task import TasksListResponse, StatusTasksResponse, TaskRead, TaskCreate
 from src.repositories.tasks_repository import TasksRepository
 from src.repositories.users_repository import UsersRepository
+from src.repositories.protocols import TasksRepositoryProtocol, UsersRepositoryProtocol
+from src.services.base import Service
 
 
-class TasksService:
+class TasksService(Service):
+
+    tasks_repository: TasksRepositoryProtocol = TasksRepository
+    users_repository: UsersRepositoryProtocol = UsersRepository
 
     ALLOWED_SORT_FIELDS = {"id", "tittle", "status"}
 
-    @staticmethod
+    @classmethod
     def get_all(
+        cls,
         db: Session,
         current_user,
         skip: int | None,
@@ -26,7 +33,8 @@ class TasksService:
     ) -> StatusTasksResponse:
         
         logger.debug('Trying to get all tasks')
-        if sort_by not in TasksService.ALLOWED_SORT_FIELDS:
+        cls.tasks_repository.use_replica(db)
+        if sort_by not in cls.ALLOWED_SORT_FIELDS:
             logger.warning('Invalid sort field %s', sort_by)
             raise HTTPException(
                 status_code=400,
@@ -41,21 +49,23 @@ class TasksService:
 
         if related_to_user:
             logger.debug('Add related_to_user filter (%s)', related_to_user)
-            filters.append(TasksRepository.get_by_username(db, related_to_user))
+            filters.append(cls.tasks_repository.get_by_username(db, related_to_user))
 
         if search:
             logger.debug('Add search filter (%s)', search)
-            filters.append(TasksRepository.search(search))
+            filters.append(cls.tasks_repository.search(search))
 
         logger.debug('Applying filters')
-        query = TasksRepository.apply_filters(db, filters)
+        query = cls.tasks_repository.apply_filters(db, filters)
         logger.debug('Applying sorting')
-        query = TasksRepository.apply_sorting(query, sort_by, order)
+        query = cls.tasks_repository.apply_sorting(query, sort_by, order)
         logger.debug('Counting total items')
-        total_tasks = TasksRepository.count(query)
+        total_tasks = cls.tasks_repository.count(query)
         logger.debug('Paginating')
-        tasks = TasksRepository.paginate(query, skip, limit)
+        tasks = cls.tasks_repository.paginate(query, skip, limit)
 
+        logger.debug('Releasing connection')
+        cls.tasks_repository.release(db)
         logger.debug('Forming TasksListResponse')
         response = TasksListResponse(
             total=total_tasks,
@@ -66,8 +76,40 @@ class TasksService:
         logger.info('Success')
         return response
 
-    @staticmethod
+    @classmethod
+    def get_by_ids(
+        cls,
+        db: Session,
+        ids: list[int],
+    ) -> TasksListResponse:
+
+        logger.debug('Trying to get tasks by ids')
+        cls.tasks_repository.use_replica(db)
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.BATCH_MAX_IDS:
+            logger.warning('Too many ids requested (%s)', len(ids))
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many ids: at most {settings.BATCH_MAX_IDS} allowed"
+            )
+
+        tasks = cls.tasks_repository.get_by_ids(db, ids)
+
+        logger.debug('Releasing connection')
+        cls.tasks_repository.release(db)
+        logger.debug('Forming TasksListResponse')
+        response = TasksListResponse(
+            total=len(tasks),
+            skip=None,
+            limit=None,
+            tasks=[TaskRead.model_validate(task) for task in tasks]
+        )
+        logger.info('Success')
+        return response
+    
+    @classmethod
     def take_task(
+            cls,
             db: Session,
             status: str,
             current_user,
@@ -77,10 +119,10 @@ class TasksService:
         
         if task_id:
             logger.debug('Searching by id')
-            db_task = TasksRepository.get_by_id(db, task_id)
+            db_task = cls.tasks_repository.get_by_id(db, task_id)
         else:
             logger.debug('Searching by title')
-            db_task = TasksRepository.get_by_title(db, title)
+            db_task = cls.tasks_repository.get_by_title(db, title)
 
         if not db_task:
             logger.warning('Task not found')
@@ -92,7 +134,7 @@ class TasksService:
         
         try:
             logger.debug('Trying take task')
-            taken_task = TasksRepository.update(db, 
+            taken_task = cls.tasks_repository.update(db, 
                                                    db_task, 
                                                    current_user.id,
                                                    db_task.title, 
@@ -108,11 +150,12 @@ class TasksService:
             return response
         except Exception as e:
             logger.error('Failed to take task')
-            TasksRepository.rollback(db)
+            cls.tasks_repository.rollback(db)
             raise HTTPException(500, f"Failed to take task: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def update_task(
+            cls,
             task: TaskCreate,
             db: Session,
             task_id: int | None,
@@ -121,23 +164,23 @@ class TasksService:
         
         if task_id:
             logger.debug('Searching by id')
-            db_task = TasksRepository.get_by_id(db, task_id)
+            db_task = cls.tasks_repository.get_by_id(db, task_id)
         else:
             logger.debug('Searching by title')
-            db_task = TasksRepository.get_by_title(db, title)
+            db_task = cls.tasks_repository.get_by_title(db, title)
 
         if not db_task:
             logger.warning('Task not found')
             raise HTTPException(status_code=404, detail="Task not found")
         
-        assigned_user = UsersRepository.get_by_username(db, task.user_name)
+        assigned_user = cls.users_repository.get_by_username(db, task.user_name)
         if not assigned_user:
             logger.warning('User not found')
             raise HTTPException(status_code=404, detail="User not found")
 
         try:
             logger.debug('Trying update task')
-            updated_task = TasksRepository.update(db, 
+            updated_task = cls.tasks_repository.update(db, 
                                                        db_task, 
                                                        assigned_user.id,
                                                        task.title, 
@@ -154,16 +197,17 @@ class TasksService:
             return response
         except Exception as e:
             logger.error('Failed to update task')
-            TasksRepository.rollback(db)
+            cls.tasks_repository.rollback(db)
             raise HTTPException(500, f"Failed to update task: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def add(
+            cls,
             task: TaskCreate,
             db: Session,
     ) -> StatusTasksResponse:
         
-        if TasksRepository.get_by_title(db, task.title):
+        if cls.tasks_repository.get_by_title(db, task.title):
             logger.warning('Task already exists')
             raise HTTPException(status_code=409, detail='Task already exists')
         
@@ -172,7 +216,7 @@ class TasksService:
         
         if task.user_name:
             logger.debug('Searching by user_name')
-            assigned_user = UsersRepository.get_by_username(db, user_name)
+            assigned_user = cls.users_repository.get_by_username(db, user_name)
 
             if not assigned_user:
                 logger.warning('User not found')
@@ -182,7 +226,7 @@ class TasksService:
 
         try:
             logger.debug('Trying add task')
-            created_task = TasksRepository.add(db, 
+            created_task = cls.tasks_repository.add(db, 
                                                user_id,
                                                task.title,
                                                task.description, 
@@ -198,11 +242,12 @@ class TasksService:
             return response
         except Exception as e:
             logger.error('Failed to create task')
-            TasksRepository.rollback(db)
+            cls.tasks_repository.rollback(db)
             raise HTTPException(500, f"Failed to create task: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def delete_task(
+            cls,
             db: Session,
             task_id: int | None,
             title: str
@@ -210,10 +255,10 @@ class TasksService:
         
         if task_id:
             logger.debug('Searching by id')
-            db_task = TasksRepository.get_by_id(db, task_id)
+            db_task = cls.tasks_repository.get_by_id(db, task_id)
         else:
             logger.debug('Searching by title')
-            db_task = TasksRepository.get_by_title(db, title)
+            db_task = cls.tasks_repository.get_by_title(db, title)
 
         if not db_task:
             logger.warning('Task not found')
@@ -221,7 +266,7 @@ class TasksService:
 
         try:
             logger.debug('Trying delete task')
-            deleted_task = TasksRepository.delete(db, db_task)
+            deleted_task = cls.tasks_repository.delete(db, db_task)
             logger.debug('Forming StatusTasksResponse')
             response = StatusTasksResponse(
                 status="deleted",
@@ -231,20 +276,21 @@ class TasksService:
             return response
         except Exception as e:
             logger.error('Failed to delete task')
-            TasksRepository.rollback(db)
+            cls.tasks_repository.rollback(db)
             raise HTTPException(500, f"Failed to delete task: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def delete_done_tasks(
+            cls,
             db: Session,
     ) -> StatusTasksResponse:
         
         logger.debug('Getting all done tasks')
-        query = TasksRepository.get_all_done(db)
+        query = cls.tasks_repository.get_all_done(db)
 
         try:
             logger.debug('Trying delete all done tasks')
-            deleted_tasks = TasksRepository.delete_group(db, query)
+            deleted_tasks = cls.tasks_repository.delete_group(db, query)
             logger.debug('Forming StatusTasksResponse')
             response = StatusTasksResponse(
                 status="deleted",
@@ -254,20 +300,21 @@ class TasksService:
             return response
         except Exception as e:
             logger.error('Failed to delete tasks')
-            TasksRepository.rollback(db)
+            cls.tasks_repository.rollback(db)
             raise HTTPException(500, f"Failed to delete tasks: {str(e)}")
 
-    @staticmethod
+    @classmethod
     def delete_expired_tasks(
+            cls,
             db: Session,
     ) -> StatusTasksResponse:
         
         logger.debug('Getting all expired tasks')
-        query = TasksRepository.get_all_expired(db)
+        query = cls.tasks_repository.get_all_expired(db)
 
         try:
             logger.debug('Trying delete all expired tasks')
-            deleted_tasks = TasksRepository.delete_group(db, query)
+            deleted_tasks = cls.tasks_repository.delete_group(db, query)
             logger.debug('Forming StatusTasksResponse')
             response = StatusTasksResponse(
                 status="deleted",
@@ -277,6 +324,6 @@ class TasksService:
             return response
         except Exception as e:
             logger.error('Failed to delete tasks')
-            TasksRepository.rollback(db)
+            cls.tasks_repository.rollback(db)
             raise HTTPException(500, f"Failed to delete tasks: {str(e)}")
         
\ No newline at end of file
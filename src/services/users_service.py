@@ -1,17 +1,23 @@
 from src.core.logger import logger
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
+from src.core.config import settings
 
 from src.schemas.user import UsersListResponse, StatusUsersResponse, UserRead, UserCreate
 from src.repositories.users_repository import UsersRepository
+from src.repositories.protocols import UsersRepositoryProtocol
+from src.services.base import Service
 
 
-class UsersService:
+class UsersService(Service):
+
+    users_repository: UsersRepositoryProtocol = UsersRepository
 
     ALLOWED_SORT_FIELDS = {"id", "username", "role"}
 
-    @staticmethod
+    @classmethod
     def get_all(
+        cls,
         db: Session,
         skip: int | None,
         limit: int | None,
@@ -22,7 +28,8 @@ class UsersService:
     ) -> UsersListResponse:
         
         logger.debug('Trying to get all users')
-        if sort_by not in UsersService.ALLOWED_SORT_FIELDS:
+        cls.users_repository.use_replica(db)
+        if sort_by not in cls.ALLOWED_SORT_FIELDS:
             logger.warning('Invalid sort field %s', sort_by)
             raise HTTPException(
                 status_code=400,
@@ -33,23 +40,25 @@ class UsersService:
 
         if role:
             logger.debug('Add role filter (%s)', role)
-            filters.append(UsersRepository.filter_by_role(role))
+            filters.append(cls.users_repository.filter_by_role(role))
 
         if search:
             logger.debug('Add search filter (%s)', search)
-            filters.append(UsersRepository.search(search))
+            filters.append(cls.users_repository.search(search))
 
         sort_by = "role_level" if sort_by == "role" else sort_by
 
         logger.debug('Applying filters')
-        query = UsersRepository.apply_filters(db, filters)
+        query = cls.users_repository.apply_filters(db, filters)
         logger.debug('Applying sorting')
-        query = UsersRepository.apply_sorting(query, sort_by, order)
+        query = cls.users_repository.apply_sorting(query, sort_by, order)
         logger.debug('Counting total items')
-        total = UsersRepository.count(query)
+        total = cls.users_repository.count(query)
         logger.debug('Paginating')
-        users = UsersRepository.paginate(query, skip, limit)
+        users = cls.users_repository.paginate(query, skip, limit)
 
+        logger.debug('Releasing connection')
+        cls.users_repository.release(db)
         logger.debug('Forming UsersListResponse')
         response = UsersListResponse(
             total=total,
@@ -60,19 +69,54 @@ class UsersService:
         logger.info('Success')
         return response
     
-    @staticmethod
+    @classmethod
+    def get_by_ids(
+        cls,
+        db: Session,
+        ids: list[int],
+    ) -> UsersListResponse:
+
+        logger.debug('Trying to get users by ids')
+        cls.users_repository.use_replica(db)
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.BATCH_MAX_IDS:
+            logger.warning('Too many ids requested (%s)', len(ids))
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many ids: at most {settings.BATCH_MAX_IDS} allowed"
+            )
+
+        users = cls.users_repository.get_by_ids(db, ids)
+
+        logger.debug('Releasing connection')
+        cls.users_repository.release(db)
+        logger.debug('Forming UsersListResponse')
+        response = UsersListResponse(
+            total=len(users),
+            skip=None,
+            limit=None,
+            users=[UserRead.model_validate(user) for user in users]
+        )
+        logger.info('Success')
+        return response
+    
+    @classmethod
     def get_user_by_id(
+        cls,
         user_id: int,
         db: Session,
     ) -> UsersListResponse:
 
         logger.debug('Trying to all user by id')
-        user = UsersRepository.get_by_id(db, user_id)
+        cls.users_repository.use_replica(db)
+        user = cls.users_repository.get_by_id(db, user_id)
 
         if not user:
             logger.warning('User (%s) not found', user_id)
             raise HTTPException(status_code=400, detail=f"User with id {user_id} not found")
 
+        logger.debug('Releasing connection')
+        cls.users_repository.release(db)
         logger.debug('Forming UsersListResponse')
         response = UsersListResponse(
             total=1,
@@ -83,19 +127,23 @@ class UsersService:
         logger.info('Success')
         return response
     
-    @staticmethod
+    @classmethod
     def get_user_by_username(
+        cls,
         username: str,
         db: Session,
     ) -> UsersListResponse:
 
         logger.debug('Trying to user by username')
-        user = UsersRepository.get_by_username(db, username)
+        cls.users_repository.use_replica(db)
+        user = cls.users_repository.get_by_username(db, username)
 
         if not user:
             logger.warning('User (%s) not found', username)
             raise HTTPException(status_code=400, detail=f"User {username} not found")
 
+        logger.debug('Releasing connection')
+        cls.users_repository.release(db)
         logger.debug('Forming UsersListResponse')
         response = UsersListResponse(
             total=1,
@@ -106,13 +154,14 @@ class UsersService:
         logger.info('Success')
         return response
     
-    @staticmethod
+    @classmethod
     def add_user(
+        cls,
         user: UserCreate,
         db: Session,
     ) -> StatusUsersResponse:
         
-        db_user = UsersRepository.get_by_username(db, user.username)
+        db_user = cls.users_repository.get_by_username(db, user.username)
         
         if db_user:
             logger.warning('User (%s) already exists', db_user.username)
@@ -120,7 +169,7 @@ class UsersService:
 
         try:
             logger.debug('Trying to add user')
-            new_user = UsersRepository.add(
+            new_user = cls.users_repository.add(
                 db=db,
                 username=user.username, 
                 password=user.password,
@@ -135,17 +184,18 @@ class UsersService:
             return responce
         except Exception as e:
             logger.error('Failed to create user: %s', str(e))
-            UsersRepository.rollback(db)
+            cls.users_repository.rollback(db)
             raise HTTPException(500, f"Failed to create user: {str(e)}")
     
-    @staticmethod
+    @classmethod
     def update_user(
+        cls,
         user: UserCreate,
         username: str,
         db: Session,
     ) -> StatusUsersResponse:
 
-        db_user = UsersRepository.get_by_username(db, username)
+        db_user = cls.users_repository.get_by_username(db, username)
         
         if not db_user:
             logger.warning('User (%s) not found')
@@ -153,7 +203,7 @@ class UsersService:
 
         try:
             logger.debug('Trying to update user')
-            changed_user = UsersRepository.update(db, db_user, user.username, user.password, user.role)
+            changed_user = cls.users_repository.update(db, db_user, user.username, user.password, user.role)
             logger.debug('Forming StatusUsersResponse')
             response = StatusUsersResponse(
                 status="changed",
@@ -163,16 +213,17 @@ class UsersService:
             return response
         except Exception as e:
             logger.error('Failed to update user: %s', str(e))
-            UsersRepository.rollback(db)
+            cls.users_repository.rollback(db)
             raise HTTPException(500, f"Failed to change user: {str(e)}")
         
-    @staticmethod
+    @classmethod
     def delete_user(
+        cls,
         username: str,
         db: Session,
     ) -> StatusUsersResponse:
 
-        db_user = UsersRepository.get_by_username(db, username)
+        db_user = cls.users_repository.get_by_username(db, username)
         
         if not db_user:
             logger.warning('User (%s) not found', username)
@@ -180,7 +231,7 @@ class UsersService:
 
         try:
             logger.debug('Trying to delete user')
-            deleted_user = UsersRepository.delete(db, db_user)
+            deleted_user = cls.users_repository.delete(db, db_user)
             logger.debug('Forming StatusUsersResponse')
             response = StatusUsersResponse(
                 status="deleted",
@@ -190,6 +241,6 @@ class UsersService:
             return response
         except Exception as e:
             logger.error('Failed to delete user: %s', str(e))
-            UsersRepository.rollback(db)
+            cls.users_repository.rollback(db)
             raise HTTPException(500, f"Failed to delete user: {str(e)}")
         
\ No newline at end of file
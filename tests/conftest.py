@@ -1,29 +1,129 @@
+import itertools
+import os
 import pytest
+from contextlib import contextmanager
+from fastapi import Request
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import delete, event, make_url
 from sqlalchemy.orm import sessionmaker
+
+# Fixture users log in on almost every test: hash their passwords cheaply.
+# Set before importing the app, which builds its hashing context at import
+os.environ.setdefault("PASSWORD_HASH_PROFILE", "fast")
+
 from src.main import app
-from src.database import Base
-from src.api.dependencies import get_db
+from src.database import Base, ReplicaSet, RoutingSession, make_engine, read_only
+from src.api.dependencies import get_db, read_only_mode
 from src.models import User
 from src.core.security import hash_password
 from src.core.config import settings
+from src.core.query_counter import QueryCounter
+from src.core.rate_limit import auth_limiter
+from tests.databases import create_database, create_template, drop_database, suffixed
+
+WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+TEMPLATE_URL = suffixed(settings.TEST_DATABASE_URL, "template")
+TEST_DATABASE_URL = (suffixed(settings.TEST_DATABASE_URL, WORKER) if WORKER
+                     else make_url(settings.TEST_DATABASE_URL))
+
+engine_test = make_engine(TEST_DATABASE_URL.render_as_string(hide_password=False))
+TestSessionLocal = sessionmaker(bind=engine_test, expire_on_commit=False,
+                                join_transaction_mode="create_savepoint")
+
+# The connection of the running test, in the transaction it rolls back
+_connection = None
+# Sessions of the fixtures and of the test on _connection, by the order
+# their transactions began
+_sessions = []
+_begins = itertools.count()
+
+SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def _distributed(config) -> bool:
+    return WORKER is None and getattr(config.option, "dist", "no") != "no"
+
+
+def pytest_configure(config):
+    if _distributed(config):
+        create_template(TEMPLATE_URL)
 
 
-engine_test = create_engine(settings.TEST_DATABASE_URL, echo=False)
-TestSessionLocal = sessionmaker(bind=engine_test, expire_on_commit=False)
+def pytest_unconfigure(config):
+    if _distributed(config):
+        drop_database(TEMPLATE_URL)
+
+
+@event.listens_for(TestSessionLocal, "after_begin")
+def _record_begin(session, transaction, connection):
+    session.info["begun"] = next(_begins)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Closes the sessions the test opened with ``next(override_get_db())``
+    before the fixtures tear down. Their SAVEPOINTs nest on one connection,
+    and ending one releases the ones begun inside it: sessions close
+    innermost first, and the fixtures then end SAVEPOINTs of their own."""
+    yield
+    for db in sorted(_sessions, key=lambda db: db.info.get("begun", -1), reverse=True):
+        db.close()
+    _sessions.clear()
 
 
 @pytest.fixture(scope="session", autouse=True)
 def prepare_database():
+    if WORKER:
+        create_database(TEST_DATABASE_URL, template=TEMPLATE_URL)
+        yield
+        engine_test.dispose()
+        drop_database(TEST_DATABASE_URL)
+        return
     Base.metadata.drop_all(bind=engine_test)
     Base.metadata.create_all(bind=engine_test)
     yield
     Base.metadata.drop_all(bind=engine_test)
 
 
-def override_get_db():
-    db = TestSessionLocal()
+@pytest.fixture(autouse=True)
+def transaction(request):
+    """Runs the test in a transaction rolled back at its end. The sessions of
+    the fixtures and of the app share its connection, and their commits only
+    release a SAVEPOINT. Tests marked ``committed`` commit for real, for code
+    that opens connections of its own."""
+    global _connection
+    if request.node.get_closest_marker("committed"):
+        yield
+        return
+    _connection = engine_test.connect()
+    outer = _connection.begin()
+    try:
+        yield
+    finally:
+        outer.rollback()
+        _connection.close()
+        _connection = None
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    auth_limiter.reset()
+
+
+def override_get_db(request: Request = None):
+    if _connection is not None:
+        db = TestSessionLocal(bind=_connection)
+        if request is None:
+            _sessions.append(db)
+    elif request is None:
+        # Fixtures of committed tests keep their sessions open: commit every
+        # statement, so they hold no transaction, nor SQLite's write lock
+        db = TestSessionLocal(bind=engine_test.execution_options(isolation_level="AUTOCOMMIT"))
+    else:
+        db = TestSessionLocal()
+    mode = read_only_mode(request) if request is not None else None
+    if mode:
+        read_only(db, mode)
     try:
         yield db
     finally:
@@ -33,12 +133,73 @@ def override_get_db():
 app.dependency_overrides[get_db] = override_get_db
 
 
+def remove(db, *objects) -> None:
+    """Deletes the rows of fixture objects by id. The test may have deleted
+    them already, or their client through a cascade: a DELETE of the
+    session's objects would expect rows that are gone."""
+    for obj in objects:
+        model = type(obj)
+        db.execute(delete(model).where(model.id == obj.id))
+    db.commit()
+
+
+@pytest.fixture
+def replica_set():
+    """A checked replica set of a second engine on the test database."""
+    replicas = ReplicaSet([make_engine(TEST_DATABASE_URL.render_as_string(hide_password=False))])
+    replicas.start()
+    yield replicas
+    replicas.stop()
+    replicas.dispose()
+
+
+@pytest.fixture
+def replica_engine(replica_set):
+    """Routes the reads marked for a replica to ``replica_set``, so tests can
+    tell which engine served a query. The replica only sees committed rows:
+    mark the tests using it ``committed``."""
+    ReplicaSessionLocal = sessionmaker(class_=RoutingSession,
+                                       bind=engine_test,
+                                       replicas=replica_set,
+                                       expire_on_commit=False)
+
+    def override_get_replica_db(request: Request = None):
+        db = ReplicaSessionLocal()
+        mode = read_only_mode(request) if request is not None else None
+        if mode:
+            read_only(db, mode)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_replica_db
+    yield replica_set.replicas[0].engine
+    app.dependency_overrides[get_db] = override_get_db
+
+
 @pytest.fixture
 def client():
     with TestClient(app) as c:
         yield c
 
 
+@pytest.fixture
+def query_budget():
+    @contextmanager
+    def budget(max_queries: int):
+        with QueryCounter(engine_test) as counter:
+            yield counter
+        # The SAVEPOINTs come from the test's transaction, not from the request
+        statements = [statement for statement in counter.statements.elements()
+                      if not statement.startswith(SAVEPOINT_STATEMENTS)]
+        assert len(statements) <= max_queries, (
+            f"{len(statements)} queries executed, budget is {max_queries}:\n"
+            + "\n".join(statements)
+        )
+    return budget
+
+
 @pytest.fixture
 def test_admin():
     db = next(override_get_db())
@@ -51,8 +212,7 @@ def test_admin():
     db.commit()
     db.refresh(admin)
     yield admin
-    db.delete(admin)
-    db.commit()
+    remove(db, admin)
 
 
 @pytest.fixture
@@ -67,8 +227,7 @@ def test_manager():
     db.commit()
     db.refresh(manager)
     yield manager
-    db.delete(manager)
-    db.commit()
+    remove(db, manager)
 
 
 @pytest.fixture
@@ -83,8 +242,7 @@ def test_user():
     db.commit()
     db.refresh(user)
     yield user
-    db.delete(user)
-    db.commit()
+    remove(db, user)
 
 @pytest.fixture
 def admin_auth_headers(client, test_admin):
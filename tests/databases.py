@@ -0,0 +1,60 @@
+"""Test databases for pytest-xdist: one per worker, cloned from a template.
+
+The controller process creates the schema once in ``<name>_template`` and
+every worker copies it to ``<name>_<worker id>``, which is faster than each
+of them running ``create_all``. PostgreSQL copies with ``CREATE DATABASE
+... TEMPLATE``, SQLite copies the file.
+"""
+import os
+import shutil
+from sqlalchemy import URL, create_engine, make_url
+from src.database import Base
+
+
+def suffixed(url: str, suffix: str) -> URL:
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        root, ext = os.path.splitext(url.database)
+        return url.set(database=f"{root}_{suffix}{ext}")
+    return url.set(database=f"{url.database}_{suffix}")
+
+
+def _execute_on_server(url: URL, statement: str) -> None:
+    # CREATE and DROP DATABASE cannot run in a transaction nor in the database itself
+    engine = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql(statement)
+    finally:
+        engine.dispose()
+
+
+def drop_database(url: URL) -> None:
+    if url.get_backend_name() == "sqlite":
+        for path in (url.database, f"{url.database}-wal", f"{url.database}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        return
+    _execute_on_server(url, f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)')
+
+
+def create_database(url: URL, template: URL | None = None) -> None:
+    drop_database(url)
+    if url.get_backend_name() == "sqlite":
+        if template is not None:
+            shutil.copyfile(template.database, url.database)
+        return
+    statement = f'CREATE DATABASE "{url.database}"'
+    if template is not None:
+        statement += f' TEMPLATE "{template.database}"'
+    _execute_on_server(url, statement)
+
+
+def create_template(url: URL) -> None:
+    create_database(url)
+    engine = create_engine(url)
+    try:
+        Base.metadata.create_all(bind=engine)
+    finally:
+        # A template cannot be copied while connections to it are open
+        engine.dispose()
@@ -1,7 +1,7 @@
 import pytest
 from faker import Faker
 from src.models import Client
-from tests.conftest import override_get_db
+from tests.conftest import override_get_db, remove
 
 fake = Faker("ru_RU")
 
@@ -24,11 +24,7 @@ def fake_clients():
         db.refresh(c)
 
     yield clients
-    for client in clients:
-        db_client = db.get(Client, client.id)
-        if db_client:
-            db.delete(db_client)
-    db.commit()
+    remove(db, *clients)
 
 @pytest.fixture
 def fake_client_with_no_user():
@@ -43,12 +39,7 @@ def fake_client_with_no_user():
     db.commit()
     db.refresh(client)
     yield client
-
-    db_client = db.get(Client, client.id)
-    if db_client is None:
-        return 
-    db.delete(db_client)
-    db.commit()
+    remove(db, client)
 
 @pytest.fixture
 def fake_client_for_delete():
@@ -3,7 +3,7 @@ from faker import Faker
 import random
 from src.enums import DealStatus
 from src.models import Deal
-from tests.conftest import override_get_db
+from tests.conftest import override_get_db, remove
 from tests.fixtures.fake_clients import fake_client_with_no_user
 
 fake = Faker()
@@ -25,9 +25,7 @@ def fake_deals(fake_client_with_no_user):
         deals.append(deal)
     db.commit()
     yield deals
-    for deal in deals:
-        db.delete(deal)
-    db.commit()
+    remove(db, *deals)
 
 @pytest.fixture
 def fake_deal(fake_client_with_no_user):
@@ -42,8 +40,7 @@ def fake_deal(fake_client_with_no_user):
     db.add(deal)
     db.commit()
     yield deal
-    db.delete(deal)
-    db.commit()
+    remove(db, deal)
 
 @pytest.fixture
 def fake_deals_for_delete(fake_client_with_no_user):
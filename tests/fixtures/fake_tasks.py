@@ -1,9 +1,10 @@
 import pytest
 from faker import Faker
 import random
+from datetime import datetime, timezone
 from src.enums import TaskStatus
 from src.models import Task
-from tests.conftest import override_get_db
+from tests.conftest import override_get_db, remove
 
 fake = Faker()
 
@@ -23,9 +24,7 @@ def fake_tasks():
         tasks.append(task)
     db.commit()
     yield tasks
-    for task in tasks:
-        db.delete(task)
-    db.commit()
+    remove(db, *tasks)
 
 @pytest.fixture
 def fake_task():
@@ -39,8 +38,7 @@ def fake_task():
     db.add(task)
     db.commit()
     yield task
-    db.delete(task)
-    db.commit()
+    remove(db, task)
 
 @pytest.fixture
 def fake_tasks_for_delete():
@@ -50,7 +48,7 @@ def fake_tasks_for_delete():
         task = Task(
             title=fake.text(max_nb_chars=50),
             description=fake.text(max_nb_chars=50),
-            due_date="2024-11-10",
+            due_date=datetime(2024, 11, 10, tzinfo=timezone.utc),
             status="done"
         )
 
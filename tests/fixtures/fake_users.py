@@ -4,7 +4,7 @@ import random
 from src.enums import UserRole
 from src.models import User
 from src.core.security import hash_password
-from tests.conftest import override_get_db
+from tests.conftest import override_get_db, remove
 
 fake = Faker()
 
@@ -22,6 +22,4 @@ def fake_users():
         users.append(user)
     db.commit()
     yield users
-    for user in users:
-        db.delete(user)
-    db.commit()
\ No newline at end of file
+    remove(db, *users)
\ No newline at end of file
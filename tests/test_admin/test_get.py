@@ -0,0 +1,102 @@
+import pytest
+import threading
+from types import SimpleNamespace
+
+from src.core.config import settings
+from src.core.slow_queries import SlowQueryLog, slow_query_log, normalize
+
+@pytest.fixture
+def slow_query_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    slow_query_log.reset()
+    yield
+    slow_query_log.reset()
+
+@pytest.mark.admin_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_slow_queries(client, admin_auth_headers, slow_query_threshold):
+    client.get("/users/batch?ids=1&ids=2&ids=3", headers=admin_auth_headers)
+    response = client.get("/admin/slow-queries?sort_by=count", headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["threshold_ms"] == 0
+    assert data["total"] > 0
+    batch_query = next(q for q in data["queries"] if q["caller"] == "UsersService.get_by_ids")
+    assert "IN (...)" in batch_query["statement"]
+    parameters = batch_query["parameters"]
+    # Positional on SQLite, named on PostgreSQL; only the types are kept
+    values = parameters.values() if isinstance(parameters, dict) else parameters
+    assert set(values) == {"int"}
+
+@pytest.mark.admin_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_slow_queries_invalid_sort(client, admin_auth_headers):
+    response = client.get("/admin/slow-queries?sort_by=statement", headers=admin_auth_headers)
+    assert response.status_code == 400
+
+@pytest.mark.admin_api
+@pytest.mark.non_admin
+@pytest.mark.get
+def test_get_slow_queries_non_admin(client, user_auth_headers):
+    response = client.get("/admin/slow-queries", headers=user_auth_headers)
+    assert response.status_code == 403
+
+@pytest.mark.admin_api
+def test_normalize_collapses_in_lists():
+    assert normalize("SELECT * FROM users\n WHERE id IN (?, ?, ?)") == \
+        "SELECT * FROM users WHERE id IN (...)"
+    assert normalize("SELECT * FROM users WHERE id IN (%(ids_1_1)s, %(ids_1_2)s) AND role = %(role_1)s") == \
+        "SELECT * FROM users WHERE id IN (...) AND role = %(role_1)s"
+
+@pytest.mark.admin_api
+def test_slow_query_explains_run_one_at_a_time(monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 1.0)
+    log = SlowQueryLog()
+    started, release, explained = threading.Event(), threading.Event(), []
+
+    def explain(engine, statement, parameters, normalized):
+        explained.append(normalized)
+        started.set()
+        release.wait(5)
+        log._entries[normalized]["explain"] = "Seq Scan on deals"
+
+    monkeypatch.setattr(log, "_explain", explain)
+    conn = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), engine=None)
+    log.record(conn, "SELECT * FROM deals", {}, 1.0)
+    assert started.wait(5)
+    log.record(conn, "SELECT * FROM deals", {}, 1.0)
+    log.record(conn, "SELECT * FROM clients", {}, 1.0)
+    release.set()
+    while log._explaining is not None:
+        log._worker.join(0.01)
+
+    log.record(conn, "SELECT  *  FROM deals", {}, 1.0)
+    log.record(conn, "UPDATE deals SET value = 1", {}, 1.0)
+    assert log._explaining is None
+    assert explained == ["SELECT * FROM deals"]
+    assert log.top(10, "count")[0]["count"] == 3
+
+@pytest.mark.admin_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_profile_single_request(client, admin_auth_headers):
+    response = client.get("/users/me?profile=1", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["X-Profiled-Status"] == "200"
+
+@pytest.mark.admin_api
+@pytest.mark.non_admin
+@pytest.mark.get
+def test_profile_single_request_non_admin(client, user_auth_headers):
+    response = client.get("/users/me?profile=1", headers=user_auth_headers)
+    assert response.status_code == 403
+    assert "Access denied" in response.text
+
+@pytest.mark.admin_api
+@pytest.mark.get
+def test_profile_single_request_anonymous(client):
+    response = client.get("/users/me?profile=1")
+    assert response.status_code == 401
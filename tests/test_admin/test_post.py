@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.core.profiler import SamplingProfiler, request_profiles
+
+@pytest.mark.admin_api
+@pytest.mark.admin
+@pytest.mark.post
+def test_profile_process(client, admin_auth_headers):
+    response = client.post("/admin/profile?seconds=0.2&interval_ms=2", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert int(response.headers["X-Profile-Samples"]) > 0
+
+@pytest.mark.admin_api
+@pytest.mark.non_admin
+@pytest.mark.post
+def test_profile_process_non_admin(client, user_auth_headers):
+    response = client.post("/admin/profile?seconds=0.2", headers=user_auth_headers)
+    assert response.status_code == 403
+
+@pytest.mark.admin_api
+@pytest.mark.admin
+@pytest.mark.post
+def test_profile_next_requests(client, admin_auth_headers):
+    response = client.post("/admin/profile/requests?count=2", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["remaining"] == 2
+
+    for _ in range(3):
+        client.get("/users/me", headers=admin_auth_headers)
+
+    response = client.get("/admin/profile/requests", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Remaining"] == "0"
+    assert response.headers["X-Profile-Completed"] == "2"
+
+@pytest.mark.admin_api
+@pytest.mark.admin
+@pytest.mark.post
+def test_profile_next_requests_not_rearmed_in_flight(client, admin_auth_headers):
+    request_profiles.arm(1)
+    assert request_profiles.claim()
+    try:
+        response = client.post("/admin/profile/requests?count=2", headers=admin_auth_headers)
+        assert response.status_code == 409
+        assert request_profiles.in_flight == 1
+    finally:
+        request_profiles.release()
+    assert request_profiles.in_flight == 0
+
+    response = client.post("/admin/profile/requests?count=2", headers=admin_auth_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.admin
+def test_profiler_skips_idle_uvloop():
+    uvloop = pytest.importorskip("uvloop")
+    started = threading.Event()
+
+    async def idle():
+        started.set()
+        await asyncio.sleep(0.3)
+
+    def run_loop():
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(idle())
+
+    loop_thread = threading.Thread(target=run_loop)
+    loop_thread.start()
+    started.wait()
+    profiler = SamplingProfiler(0.01)
+    profiler._sample(threading.get_ident())
+    loop_thread.join()
+
+    assert not any("run_loop" in stack for stack in profiler.stacks)
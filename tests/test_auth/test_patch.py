@@ -0,0 +1,15 @@
+import pytest
+
+from src.core.config import settings
+
+@pytest.mark.auth_api
+@pytest.mark.patch
+def test_change_password_rate_limited(client, test_user):
+    params = {"username": test_user.username, "password": "wrong", "new_password": "newp!1sword"}
+    for _ in range(settings.AUTH_RATE_LIMIT_PER_USERNAME):
+        response = client.patch("/auth/change-password", params=params)
+        assert response.status_code == 401
+
+    response = client.patch("/auth/change-password", params=params)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
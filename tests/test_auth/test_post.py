@@ -0,0 +1,128 @@
+import sqlite3
+import time
+import pytest
+from prometheus_client import REGISTRY
+
+from src.core.config import settings
+from src.core.rate_limit import auth_limiter, MemoryBackend, SqliteBackend
+
+def verify_count():
+    return REGISTRY.get_sample_value("password_hash_duration_seconds_count", {"operation": "verify"}) or 0
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter_backend(request, tmp_path, monkeypatch):
+    backend = MemoryBackend() if request.param == "memory" else SqliteBackend(str(tmp_path / "buckets.db"))
+    monkeypatch.setattr(auth_limiter, "backend", backend)
+    return backend
+
+@pytest.mark.auth_api
+@pytest.mark.post
+def test_login(client, test_admin):
+    response = client.post("/auth/login", data={"username": test_admin.username, "password": "testp!1sword"})
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+@pytest.mark.auth_api
+@pytest.mark.post
+def test_login_rate_limited_per_username(client, test_admin, limiter_backend):
+    for _ in range(settings.AUTH_RATE_LIMIT_PER_USERNAME):
+        response = client.post("/auth/login", data={"username": test_admin.username, "password": "wrong"})
+        assert response.status_code == 401
+
+    verified = verify_count()
+    response = client.post("/auth/login", data={"username": test_admin.username, "password": "testp!1sword"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert verify_count() == verified
+
+    response = client.post("/auth/login", data={"username": "someone-else", "password": "wrong"})
+    assert response.status_code == 401
+
+@pytest.mark.auth_api
+@pytest.mark.post
+def test_login_rate_limited_per_ip(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_PER_IP", 3)
+    for i in range(3):
+        response = client.post("/auth/login", data={"username": f"user{i}", "password": "wrong"})
+        assert response.status_code == 401
+
+    response = client.post("/auth/login", data={"username": "user9", "password": "wrong"})
+    assert response.status_code == 429
+
+@pytest.mark.auth_api
+@pytest.mark.post
+def test_login_rate_limited_per_forwarded_ip(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_PER_IP", 2)
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["testclient", "10.0.0.0/8"])
+    for i in range(2):
+        response = client.post("/auth/login", data={"username": f"user{i}", "password": "wrong"},
+                               headers={"X-Forwarded-For": f"198.51.100.{i}, 203.0.113.1, 10.0.0.2"})
+        assert response.status_code == 401
+
+    response = client.post("/auth/login", data={"username": "user8", "password": "wrong"},
+                           headers={"X-Forwarded-For": "203.0.113.1"})
+    assert response.status_code == 429
+
+    response = client.post("/auth/login", data={"username": "user9", "password": "wrong"},
+                           headers={"X-Forwarded-For": "203.0.113.2"})
+    assert response.status_code == 401
+
+@pytest.mark.auth_api
+@pytest.mark.post
+def test_login_ignores_forwarded_ip_from_untrusted_peer(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_PER_IP", 2)
+    for i in range(2):
+        response = client.post("/auth/login", data={"username": f"user{i}", "password": "wrong"},
+                               headers={"X-Forwarded-For": f"203.0.113.{i}"})
+        assert response.status_code == 401
+
+    response = client.post("/auth/login", data={"username": "user9", "password": "wrong"},
+                           headers={"X-Forwarded-For": "203.0.113.9"})
+    assert response.status_code == 429
+
+@pytest.mark.auth_api
+@pytest.mark.post
+def test_login_rate_limit_storage_busy(client, test_admin, tmp_path, monkeypatch):
+    backend = SqliteBackend(str(tmp_path / "buckets.db"))
+    monkeypatch.setattr(auth_limiter, "backend", backend)
+    monkeypatch.setattr(SqliteBackend, "BUSY_TIMEOUT", 0.01)
+    backend.take("warm-up", 1, 1)
+    holder = sqlite3.connect(backend.path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        for _ in range(settings.AUTH_RATE_LIMIT_PER_USERNAME):
+            response = client.post("/auth/login", data={"username": test_admin.username, "password": "wrong"})
+            assert response.status_code == 401
+        response = client.post("/auth/login", data={"username": test_admin.username, "password": "wrong"})
+        assert response.status_code == 429
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+
+@pytest.mark.auth_api
+def test_sqlite_backend_prunes_full_buckets(tmp_path, monkeypatch):
+    monkeypatch.setattr(SqliteBackend, "PRUNE_INTERVAL", 0)
+    backend = SqliteBackend(str(tmp_path / "buckets.db"))
+    assert backend.take("refilled", 2, 1000) == 0
+    time.sleep(0.01)
+    assert backend.take("draining", 2, 0.001) == 0
+    backend.take("draining", 2, 0.001)
+
+    keys = [key for key, in backend._connection().execute("SELECT key FROM token_buckets ORDER BY key")]
+    assert keys == ["draining"]
+
+@pytest.mark.auth_api
+def test_memory_backend_prunes_full_buckets_only(monkeypatch):
+    monkeypatch.setattr(MemoryBackend, "MAX_KEYS", 4)
+    backend = MemoryBackend()
+    for _ in range(10):
+        backend.take("ip:203.0.113.9", 20, 20 / 60)
+    scans = []
+    prune = backend._prune
+    monkeypatch.setattr(backend, "_prune", lambda now: (scans.append(now), prune(now)))
+    for i in range(8):
+        backend.take(f"username:user-{i}", 5, 5 / 60)
+
+    # The IP bucket, half empty, outlives username buckets of a smaller capacity
+    assert backend._buckets["ip:203.0.113.9"][0] == pytest.approx(10, abs=0.01)
+    assert len(scans) == 1
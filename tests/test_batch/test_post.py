@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from src.repositories.deals_repository import DealsRepository
+from tests.fixtures.fake_deals import fake_deal
+from tests.fixtures.fake_tasks import fake_task
+from tests.fixtures.fake_clients import fake_client_with_no_user
+
+@pytest.mark.batch_api
+@pytest.mark.admin
+@pytest.mark.post
+def test_batch_admin(client, admin_auth_headers, fake_deal, fake_task):
+    batch = {
+        "operations": [
+            {"operation_id": "set-status", "params": {"title": fake_deal.title, "status": "closed"}},
+            {"operation_id": "take-task", "params": {"title": fake_task.title}}
+        ]
+    }
+    response = client.post("/batch", headers=admin_auth_headers, json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is True
+    assert [result["status_code"] for result in data["results"]] == [200, 200]
+    assert data["results"][0]["result"]["deals"]["status"] == "closed"
+    assert data["results"][1]["result"]["tasks"]["status"] == "doing"
+
+@pytest.mark.batch_api
+@pytest.mark.non_admin
+@pytest.mark.post
+def test_batch_non_admin(client, user_auth_headers, fake_deal, fake_task):
+    batch = {
+        "operations": [
+            {"operation_id": "set-status", "params": {"title": fake_deal.title, "status": "closed"}},
+            {"operation_id": "take-task", "params": {"title": fake_task.title}}
+        ]
+    }
+    response = client.post("/batch", headers=user_auth_headers, json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["results"][0]["status_code"] == 403
+    assert "Access denied" in data["results"][0]["detail"]
+    assert data["results"][1]["status_code"] == 200
+
+@pytest.mark.batch_api
+@pytest.mark.admin
+@pytest.mark.post
+def test_batch_invalid_operations(client, admin_auth_headers, fake_deal):
+    batch = {
+        "operations": [
+            {"operation_id": "unknown", "params": {}},
+            {"operation_id": "set-status", "params": {"title": fake_deal.title, "status": "unknown"}}
+        ]
+    }
+    response = client.post("/batch", headers=admin_auth_headers, json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["results"][0]["status_code"] == 400
+    assert "Unknown operation" in data["results"][0]["detail"]
+    assert data["results"][1]["status_code"] == 400
+    assert "Input should be" in data["results"][1]["detail"]
+
+@pytest.mark.batch_api
+@pytest.mark.admin
+@pytest.mark.post
+def test_batch_database_error_fails_one_operation(client, admin_auth_headers, fake_deal, fake_task, monkeypatch):
+    get_by_title = DealsRepository.get_by_title
+
+    def failing_get_by_title(db, title):
+        if title == "broken":
+            raise OperationalError("SELECT", {}, Exception("canceling statement due to statement timeout"))
+        return get_by_title(db, title)
+
+    monkeypatch.setattr(DealsRepository, "get_by_title", failing_get_by_title)
+    batch = {
+        "operations": [
+            {"operation_id": "set-status", "params": {"title": fake_deal.title, "status": "closed"}},
+            {"operation_id": "set-status", "params": {"title": "broken", "status": "closed"}},
+            {"operation_id": "take-task", "params": {"title": fake_task.title}}
+        ]
+    }
+    response = client.post("/batch", headers=admin_auth_headers, json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert [result["status_code"] for result in data["results"]] == [200, 500, 200]
+    assert data["results"][1]["detail"] == "Database error: OperationalError"
+
+    response = client.get(f"/deals/batch?ids={fake_deal.id}", headers=admin_auth_headers)
+    assert response.json()["deals"][0]["status"] == "closed"
+
+@pytest.mark.batch_api
+@pytest.mark.admin
+@pytest.mark.post
+@pytest.mark.committed
+def test_batch_atomic_rollback(client, admin_auth_headers, fake_deal):
+    status = "new" if fake_deal.status == "closed" else "closed"
+    batch = {
+        "atomic": True,
+        "operations": [
+            {"operation_id": "set-status", "params": {"title": fake_deal.title, "status": status}},
+            {"operation_id": "set-status", "params": {"title": "anytitle", "status": status}}
+        ]
+    }
+    response = client.post("/batch", headers=admin_auth_headers, json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is False
+    assert data["results"][1]["status_code"] == 404
+
+    response = client.get(f"/deals/batch?ids={fake_deal.id}", headers=admin_auth_headers)
+    assert response.json()["deals"][0]["status"] == fake_deal.status
@@ -1,5 +1,7 @@
 import pytest
 from tests.fixtures.fake_clients import fake_client_for_delete
+from tests.fixtures.fake_clients import fake_client_with_no_user
+from tests.fixtures.fake_deals import fake_deals_for_delete
 
 @pytest.mark.clients_api
 @pytest.mark.admin
@@ -36,3 +38,15 @@ def test_delete_client_not_exists(client, admin_auth_headers):
 
     assert response.status_code == 404
     assert 'Client not found' in response.text
+
+@pytest.mark.clients_api
+@pytest.mark.admin
+@pytest.mark.delete
+def test_delete_client_deletes_deals(client, admin_auth_headers, fake_client_with_no_user, fake_deals_for_delete):
+    response = client.delete(f"/clients/delete/{fake_client_with_no_user.name}", 
+                        headers=admin_auth_headers)
+    assert response.status_code == 200
+
+    query = "&".join(f"ids={deal.id}" for deal in fake_deals_for_delete)
+    response = client.get(f"/deals/batch?{query}", headers=admin_auth_headers)
+    assert response.json()["total"] == 0
@@ -1,5 +1,14 @@
 import pytest
-from tests.fixtures.fake_clients import fake_clients
+import threading
+import fastapi.routing
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
+from src.core.query_counter import QueryCounter
+from src.core.config import settings
+from src.database import Replica, ReplicaSet
+from tests.conftest import engine_test
+from tests.fixtures.fake_clients import fake_clients, fake_client_with_no_user
+from tests.fixtures.fake_deals import fake_deals
 
 @pytest.mark.clients_api
 @pytest.mark.admin
@@ -21,3 +30,117 @@ def test_get_all_clients_non_admin(client, user_auth_headers):
     response = client.get("/clients/get?skip=0&limit=10", headers=user_auth_headers)
     assert response.status_code == 403
     assert "Access denied" in response.text
+
+@pytest.mark.clients_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_client_overview_admin(client, admin_auth_headers, fake_client_with_no_user, fake_deals, query_budget):
+    with query_budget(3):
+        response = client.get(f"/clients/{fake_client_with_no_user.id}/overview", headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["client"]["id"] == fake_client_with_no_user.id
+    assert data["owner"] is None
+    assert data["tasks"] == []
+    assert len(data["deals"]) == len(fake_deals)
+    assert data["deals_summary"]["total"] == len(fake_deals)
+    assert data["deals_summary"]["total_value"] == sum(deal.value for deal in fake_deals)
+
+@pytest.mark.clients_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_client_overview_not_found(client, admin_auth_headers):
+    response = client.get("/clients/999999/overview", headers=admin_auth_headers)
+    assert response.status_code == 404
+    assert "Client not found" in response.text
+
+@pytest.mark.clients_api
+@pytest.mark.non_admin
+@pytest.mark.get
+def test_get_client_overview_non_admin(client, user_auth_headers, fake_client_with_no_user):
+    response = client.get(f"/clients/{fake_client_with_no_user.id}/overview", headers=user_auth_headers)
+    assert response.status_code == 403
+    assert "Access denied" in response.text
+
+@pytest.mark.clients_api
+@pytest.mark.admin
+@pytest.mark.get
+@pytest.mark.committed
+def test_get_all_clients_from_replica(client, admin_auth_headers, fake_clients, replica_engine):
+    with QueryCounter(replica_engine) as replica_queries:
+        response = client.get("/clients/get?skip=0&limit=10", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["clients"]) == 10
+    assert replica_queries.count > 0
+
+@pytest.mark.clients_api
+@pytest.mark.admin
+@pytest.mark.patch
+@pytest.mark.committed
+def test_write_stays_on_primary(client, admin_auth_headers, fake_client_with_no_user, replica_engine):
+    with QueryCounter(replica_engine) as replica_queries:
+        response = client.patch(f"/clients/patch/take?name={fake_client_with_no_user.name}",
+                                headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert replica_queries.count == 0
+
+@pytest.mark.clients_api
+@pytest.mark.admin
+@pytest.mark.get
+@pytest.mark.committed
+def test_get_all_clients_replica_down(client, admin_auth_headers, fake_clients, replica_set, replica_engine):
+    with patch.object(Replica, "lag_seconds", side_effect=OperationalError("SELECT 1", {}, None)):
+        replica_set.check()
+    with QueryCounter(replica_engine) as replica_queries:
+        response = client.get("/clients/get?skip=0&limit=10", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert replica_queries.count == 0
+    assert len(response.json()["clients"]) == 10
+
+    replica_set.check()
+    with QueryCounter(replica_engine) as replica_queries:
+        response = client.get("/clients/get?skip=0&limit=10", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert replica_queries.count > 0
+
+@pytest.mark.clients_api
+@pytest.mark.admin
+@pytest.mark.get
+@pytest.mark.committed
+def test_connection_released_before_serialization(client, admin_auth_headers, fake_clients, monkeypatch):
+    serialize_response = fastapi.routing.serialize_response
+    checked_out = []
+
+    async def recording_serialize_response(**kwargs):
+        checked_out.append(engine_test.pool.checkedout())
+        return await serialize_response(**kwargs)
+
+    monkeypatch.setattr(fastapi.routing, "serialize_response", recording_serialize_response)
+    # The fixtures keep connections of their own
+    before = engine_test.pool.checkedout()
+    response = client.get("/clients/get?skip=0&limit=10", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert checked_out == [before]
+
+@pytest.mark.clients_api
+def test_replicas_checked_in_background(monkeypatch):
+    monkeypatch.setattr(settings, "REPLICA_CHECK_INTERVAL_SECONDS", 0.01)
+    replicas = ReplicaSet([engine_test])
+    checked = threading.Event()
+
+    def lag_seconds(replica):
+        checked.set()
+        raise OperationalError("SELECT 1", {}, None)
+
+    replicas.start()
+    try:
+        assert replicas.choose() is engine_test
+        with patch.object(Replica, "lag_seconds", lag_seconds):
+            checked.wait(5)
+            replicas.stop()
+        assert replicas.choose() is None
+    finally:
+        replicas.stop()
+
+    with patch.object(Replica, "lag_seconds", side_effect=AssertionError("checked on choose")):
+        assert replicas.choose() is None
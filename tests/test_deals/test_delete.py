@@ -1,4 +1,7 @@
 import pytest
+from src.core.query_counter import QueryCounter
+from src.repositories.deals_repository import DealsRepository
+from tests.conftest import engine_test, override_get_db
 from tests.fixtures.fake_deals import fake_deals_for_delete, fake_deal_for_delete
 from tests.fixtures.fake_clients import fake_client_with_no_user
 
@@ -64,3 +67,24 @@ def test_delete_by_client_not_exists(client, admin_auth_headers, fake_deals_for_
                             headers=admin_auth_headers)
     assert response.status_code == 404
     assert "No deals for this client" in response.text
+
+@pytest.mark.deals_api
+@pytest.mark.delete
+def test_delete_group_returns_deleted_deals(fake_deals_for_delete, fake_client_with_no_user):
+    db = next(override_get_db())
+    filters = [DealsRepository.get_by_client_name(fake_client_with_no_user.name)]
+    with QueryCounter(engine_test) as queries:
+        deleted = DealsRepository.delete_group(db, DealsRepository.apply_filters(db, filters))
+    assert sorted(deal.title for deal in deleted) == sorted(deal.title for deal in fake_deals_for_delete)
+    statements = [statement for statement in queries.statements
+                  if not statement.startswith(("SAVEPOINT", "RELEASE"))]
+    assert len(statements) == 1 and statements[0].startswith("DELETE FROM deals")
+    assert DealsRepository.count(DealsRepository.apply_filters(db, filters)) == 0
+
+@pytest.mark.deals_api
+@pytest.mark.delete
+def test_delete_group_refuses_unfiltered_query(fake_deals_for_delete):
+    db = next(override_get_db())
+    with pytest.raises(ValueError):
+        DealsRepository.delete_group(db, DealsRepository.apply_filters(db, []))
+    assert DealsRepository.count(DealsRepository.apply_filters(db, [])) >= 20
@@ -1,5 +1,10 @@
 import pytest
-from tests.fixtures.fake_deals import fake_deals
+from datetime import datetime, timedelta
+from sqlalchemy import inspect
+from src.models import Deal
+from src.repositories.deals_repository import DealsRepository
+from tests.conftest import override_get_db
+from tests.fixtures.fake_deals import fake_deals, fake_deal
 from tests.fixtures.fake_clients import fake_client_with_no_user
 
 @pytest.mark.deals_api
@@ -37,3 +42,63 @@ def test_get_deals_by_date(client, admin_auth_headers, fake_deals):
         assert "title" in data["deals"][0]
         assert len(data["deals"]) == 10
 
+@pytest.mark.deals_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_deals_by_date_filters(client, admin_auth_headers, fake_deals):
+    deal = fake_deals[0]
+    params = {"date_field": "created_at", "search": deal.title,
+              "more_than": deal.value, "less_than": deal.value}
+    response = client.get("/deals/get-by-date", params=params, headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert deal.title in [found["title"] for found in data["deals"]]
+    response = client.get("/deals/get-by-date", params={**params, "less_than": deal.value - 1},
+                          headers=admin_auth_headers)
+    assert deal.title not in [found["title"] for found in response.json()["deals"]]
+
+
+@pytest.mark.deals_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_deals_batch(client, admin_auth_headers, fake_deals, query_budget):
+    ids = [deal.id for deal in fake_deals[:5]]
+    query = "&".join(f"ids={id}" for id in ids + [999999])
+    with query_budget(2):
+        response = client.get(f"/deals/batch?{query}", headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 5
+    assert [deal["id"] for deal in data["deals"]] == ids
+
+@pytest.mark.deals_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_deals_batch_too_many_ids(client, admin_auth_headers):
+    query = "&".join(f"ids={id}" for id in range(1, 1000))
+    response = client.get(f"/deals/batch?{query}", headers=admin_auth_headers)
+    assert response.status_code == 400
+    assert "Too many ids" in response.text
+
+@pytest.mark.deals_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_deals_dates_are_utc(client, admin_auth_headers, fake_deals):
+    response = client.get(f"/deals/batch?ids={fake_deals[0].id}", headers=admin_auth_headers)
+    created_at = datetime.fromisoformat(response.json()["deals"][0]["created_at"])
+    assert created_at.utcoffset() == timedelta(0)
+
+@pytest.mark.deals_api
+def test_deal_lookups_are_cached_per_transaction(fake_deal):
+    db = next(override_get_db())
+    missing_id = fake_deal.id + 1000
+    assert DealsRepository.get_by_id(db, missing_id) is None
+    db.add(Deal(id=missing_id, title="Created after lookup", status="new", value=1,
+                client_id=fake_deal.client_id))
+    db.commit()
+    assert DealsRepository.get_by_id(db, missing_id).title == "Created after lookup"
+
+    deal = DealsRepository.get_by_id(db, fake_deal.id)
+    assert DealsRepository.get_by_id(db, fake_deal.id) is deal
+    db.close()
+    assert not inspect(DealsRepository.get_by_id(db, fake_deal.id)).detached
@@ -1,6 +1,8 @@
 import pytest
 from tests.fixtures.fake_deals import fake_deal
 from tests.fixtures.fake_clients import fake_client_with_no_user
+from src.models import Client
+from tests.conftest import override_get_db
 
 @pytest.mark.deals_api
 @pytest.mark.admin
@@ -51,3 +53,20 @@ def test_set_status_invalid_status(client, admin_auth_headers, fake_deal):
                             headers=admin_auth_headers)
     assert response.status_code == 400
     assert "Input should be" in response.text
+
+@pytest.mark.deals_api
+@pytest.mark.non_admin
+@pytest.mark.patch
+def test_set_status_manager(client, manager_auth_headers, test_manager, fake_deal,
+                            fake_client_with_no_user):
+    response = client.patch(f"/deals/patch/set-status?status=closed&title={fake_deal.title}", 
+                            headers=manager_auth_headers)
+    assert response.status_code == 403
+
+    db = next(override_get_db())
+    db.get(Client, fake_client_with_no_user.id).user_id = test_manager.id
+    db.commit()
+    response = client.patch(f"/deals/patch/set-status?status=closed&title={fake_deal.title}", 
+                            headers=manager_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["deals"]["status"] == "closed"
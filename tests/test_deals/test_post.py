@@ -1,4 +1,7 @@
 import pytest
+from src.core.query_counter import QueryCounter
+from src.repositories.deals_repository import DealsRepository
+from tests.conftest import engine_test, override_get_db
 from tests.fixtures.fake_deals import fake_deal
 from tests.fixtures.fake_clients import fake_client_with_no_user
 
@@ -106,3 +109,20 @@ def test_post_deal_admin(client, admin_auth_headers, fake_deal, fake_client_with
                             headers=admin_auth_headers, json=new_deal)
     assert response.status_code == 409
     assert "Deal already exists" in response.text
+
+@pytest.mark.deals_api
+@pytest.mark.post
+def test_get_client_and_title_taken(fake_deal, fake_client_with_no_user):
+    db = next(override_get_db())
+    name = fake_client_with_no_user.name
+    with QueryCounter(engine_test) as queries:
+        client, taken = DealsRepository.get_client_and_title_taken(db, name, fake_deal.title)
+    assert (client.id, taken) == (fake_client_with_no_user.id, True)
+    # Besides the SAVEPOINT of the test's transaction
+    statements = [statement for statement in queries.statements if not statement.startswith("SAVEPOINT")]
+    assert len(statements) == 1 and statements[0].startswith("SELECT")
+
+    client, taken = DealsRepository.get_client_and_title_taken(db, name, "untaken-title")
+    assert (client.id, taken) == (fake_client_with_no_user.id, False)
+    assert DealsRepository.get_client_and_title_taken(db, "no-such-client", fake_deal.title) == (None, True)
+    assert DealsRepository.get_client_and_title_taken(db, "no-such-client", "untaken-title") == (None, False)
@@ -0,0 +1,50 @@
+import pytest
+from tests.fixtures.fake_deals import fake_deal
+from tests.fixtures.fake_clients import fake_client_with_no_user
+from src.models import Client
+from tests.conftest import override_get_db
+
+@pytest.mark.deals_api
+@pytest.mark.admin
+@pytest.mark.put
+def test_update_deal_admin(client, admin_auth_headers, fake_deal):
+    updated_deal = {
+        "title": "Updated_deal",
+        "status": "closed",
+        "value": 500
+    }
+
+    response = client.put(f"/deals/update?deal_id={fake_deal.id}",
+                          headers=admin_auth_headers, json=updated_deal)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "changed"
+    assert data["deals"]["title"] == "Updated_deal"
+    assert data["deals"]["status"] == "closed"
+    assert data["deals"]["value"] == 500
+
+    response = client.get(f"/deals/batch?ids={fake_deal.id}", headers=admin_auth_headers)
+    assert response.json()["deals"][0]["title"] == "Updated_deal"
+
+@pytest.mark.deals_api
+@pytest.mark.non_admin
+@pytest.mark.put
+def test_update_deal_manager(client, manager_auth_headers, test_manager, fake_deal,
+                             fake_client_with_no_user):
+    updated_deal = {
+        "title": "Updated_by_manager",
+        "status": "in_progress",
+        "value": 300
+    }
+
+    response = client.put(f"/deals/update?deal_id={fake_deal.id}",
+                          headers=manager_auth_headers, json=updated_deal)
+    assert response.status_code == 403
+
+    db = next(override_get_db())
+    db.get(Client, fake_client_with_no_user.id).user_id = test_manager.id
+    db.commit()
+    response = client.put(f"/deals/update?deal_id={fake_deal.id}",
+                          headers=manager_auth_headers, json=updated_deal)
+    assert response.status_code == 200
+    assert response.json()["deals"]["title"] == "Updated_by_manager"
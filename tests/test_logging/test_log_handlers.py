@@ -0,0 +1,70 @@
+import json
+import logging
+import pytest
+from src.core.log_handlers import JsonFormatter, SamplingFilter, request_id_var
+
+
+def make_record(name="server", level=logging.INFO, msg="message", request_id=None, exc_info=None):
+    token = request_id_var.set(request_id) if request_id else None
+    try:
+        return logging.getLogger(name).makeRecord(name, level, __file__, 1, msg, (), exc_info)
+    finally:
+        if token:
+            request_id_var.reset(token)
+
+@pytest.mark.logging
+def test_record_factory_sets_request_id():
+    assert make_record().request_id == "-"
+    assert make_record(request_id="sync-job.42").request_id == "sync-job.42"
+    assert logging.makeLogRecord({"msg": "outside a request"}).request_id == "-"
+
+@pytest.mark.logging
+def test_json_formatter_fields():
+    entry = json.loads(JsonFormatter().format(make_record(msg="deal %s closed", request_id="sync-job.42")))
+    assert entry["message"] == "deal %s closed"
+    assert entry["request_id"] == "sync-job.42"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "server"
+    assert entry["ts"].endswith("+00:00")
+
+@pytest.mark.logging
+def test_json_formatter_truncates_long_fields():
+    formatter = JsonFormatter(max_field_length=10)
+    entry = json.loads(formatter.format(make_record(msg="x" * 25)))
+    assert entry["message"] == "x" * 10 + "...[15 more]"
+
+    try:
+        raise ValueError("y" * 100)
+    except ValueError as e:
+        record = make_record(msg="short", exc_info=(type(e), e, e.__traceback__))
+    entry = json.loads(formatter.format(record))
+    assert entry["message"] == "short"
+    assert entry["exception"].startswith("Traceback ")
+    assert entry["exception"].endswith(" more]")
+    assert len(entry["exception"]) < 30
+
+@pytest.mark.logging
+def test_sampling_filter_keeps_warnings_and_unsampled_loggers():
+    sampling = SamplingFilter(rates={"server": 0.0})
+    assert not sampling.filter(make_record(request_id="a"))
+    assert sampling.filter(make_record(level=logging.WARNING, request_id="a"))
+    assert sampling.filter(make_record(name="sqlalchemy.engine", request_id="a"))
+
+@pytest.mark.logging
+def test_sampling_filter_most_specific_logger_wins():
+    sampling = SamplingFilter(rates={"server": 0.0, "server.api": 1.0})
+    assert sampling.filter(make_record(name="server.api.deals", request_id="a"))
+    assert not sampling.filter(make_record(name="server.services", request_id="a"))
+
+@pytest.mark.logging
+def test_sampling_filter_samples_whole_requests():
+    sampling = SamplingFilter(rates={"server": 0.1}, max_level="INFO")
+    kept = set()
+    for i in range(2000):
+        request_id = f"request-{i}"
+        decisions = {sampling.filter(make_record(name=name, level=level, request_id=request_id))
+                     for name in ("server", "server.api") for level in (logging.DEBUG, logging.INFO)}
+        assert len(decisions) == 1
+        if decisions.pop():
+            kept.add(request_id)
+    assert 100 < len(kept) < 300
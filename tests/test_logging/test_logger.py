@@ -0,0 +1,78 @@
+import json
+import logging
+import logging.handlers
+import threading
+import pytest
+import yaml
+from src.core import logger as logger_module
+from src.core.logger import setup_logging, stop_logging
+
+
+class ThreadRecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def emit(self, record):
+        self.threads.append(threading.current_thread())
+
+
+@pytest.fixture
+def log_config(tmp_path, monkeypatch):
+    """Writes a config for a ``crm-test`` logger, whose handlers and the root
+    logger's are restored after the test."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("LOG_CFG", raising=False)
+    root, target = logging.getLogger(), logging.getLogger("crm-test")
+    saved = {root: root.handlers[:], target: target.handlers[:]}
+    config = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {"json": {"()": "src.core.log_handlers.JsonFormatter", "max_field_length": 16}},
+        "handlers": {"file": {"class": "logging.FileHandler", "formatter": "json",
+                              "filename": str(tmp_path / "crm-test.log")}},
+        "loggers": {"crm-test": {"level": "INFO", "handlers": ["file"], "propagate": False}},
+    }
+    path = tmp_path / "log_config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    yield path
+    stop_logging()
+    for target_logger, handlers in saved.items():
+        for handler in target_logger.handlers[:]:
+            target_logger.removeHandler(handler)
+            if handler not in handlers:
+                handler.close()
+        for handler in handlers:
+            target_logger.addHandler(handler)
+
+@pytest.mark.logging
+def test_setup_logging_moves_handlers_behind_a_queue(log_config, tmp_path):
+    setup_logging(default_path=str(log_config))
+    target = logging.getLogger("crm-test")
+    assert [type(handler) for handler in target.handlers] == [logging.handlers.QueueHandler]
+    assert len(logger_module._listeners) >= 1
+
+    target.info("queued %s", "x" * 40)
+    stop_logging()
+    assert not logger_module._listeners
+    entry = json.loads((tmp_path / "crm-test.log").read_text())
+    assert entry["message"] == "queued xxxxxxxxx...[31 more]"
+    assert (tmp_path / "logs").is_dir()
+
+@pytest.mark.logging
+def test_queued_handlers_run_on_the_listener_thread(log_config):
+    setup_logging(default_path=str(log_config))
+    target = logging.getLogger("crm-test")
+    recorder = ThreadRecordingHandler()
+    listener = logger_module._listeners[-1]
+    listener.handlers = (*listener.handlers, recorder)
+
+    target.warning("handled elsewhere")
+    stop_logging()
+    assert recorder.threads and threading.current_thread() not in recorder.threads
+
+@pytest.mark.logging
+def test_setup_logging_without_queue_keeps_handlers(log_config):
+    setup_logging(default_path=str(log_config), use_queue=False)
+    assert [type(handler) for handler in logging.getLogger("crm-test").handlers] == [logging.FileHandler]
+    assert not logger_module._listeners
@@ -0,0 +1,150 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.repositories.clients_repository import ClientsRepository
+from src.repositories.deals_repository import DealsRepository
+from src.repositories.tasks_repository import TasksRepository
+from src.repositories.users_repository import UsersRepository
+from src.repositories.memory.database import MemoryDatabase
+from src.repositories.memory.clients_repository import MemoryClientsRepository
+from src.repositories.memory.deals_repository import MemoryDealsRepository
+from src.repositories.memory.tasks_repository import MemoryTasksRepository
+from src.repositories.memory.users_repository import MemoryUsersRepository
+from src.schemas.deal import DealCreate
+from src.services.clients_service import ClientsService
+from src.services.deals_service import DealsService
+from src.services.users_service import UsersService
+from tests.conftest import override_get_db
+
+SQL = dict(users_repository=UsersRepository, clients_repository=ClientsRepository,
+           deals_repository=DealsRepository, tasks_repository=TasksRepository)
+MEMORY = dict(users_repository=MemoryUsersRepository, clients_repository=MemoryClientsRepository,
+              deals_repository=MemoryDealsRepository, tasks_repository=MemoryTasksRepository)
+
+
+def services(repositories: dict) -> dict:
+    return {service.__name__: service.using(**{name: repository for name, repository in repositories.items()
+                                               if hasattr(service, name)})
+            for service in (UsersService, ClientsService, DealsService)}
+
+
+def seed(db, repositories: dict):
+    users, clients = repositories["users_repository"], repositories["clients_repository"]
+    deals, tasks = repositories["deals_repository"], repositories["tasks_repository"]
+    admin = users.add(db, "memory-admin", "-", "admin")
+    owners = [users.add(db, f"memory-manager-{i}", "-", "manager") for i in range(2)]
+    client_rows = [clients.add(db, owners[i % 2].id if i < 4 else None, f"memory-client-{i}",
+                               f"client{i}@example.com", f"+7999000000{i}", None) for i in range(6)]
+    closed_at = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    for i in range(40):
+        deals.add(db, client_rows[i % 6].id, f"memory-deal-{i:02}", ["new", "in_progress", "closed"][i % 3],
+                  (i * 37) % 1000 + 1, closed_at + timedelta(days=i) if i % 4 else None)
+    for i in range(4):
+        tasks.add(db, owners[i % 2].id, f"memory-task-{i}", "description", "todo", None)
+    return admin
+
+
+@pytest.fixture
+def backends():
+    sql_db, memory_db = next(override_get_db()), MemoryDatabase()
+    return {"sql": (sql_db, seed(sql_db, SQL), services(SQL)),
+            "memory": (memory_db, seed(memory_db, MEMORY), services(MEMORY))}
+
+
+DEAL_QUERIES = [
+    dict(sort_by="value", order="desc", skip=3, limit=7),
+    dict(sort_by="tittle", order="asc", skip=0, limit=10, search="DEAL-1"),
+    dict(sort_by="value", order="asc", skip=2, limit=5, more_than=200, less_than=800),
+    dict(sort_by="id", order="desc", skip=0, limit=50, related_to_user="memory-manager-1"),
+    dict(sort_by="value", order="asc", skip=1, limit=4, related_to_client="memory-client-2"),
+]
+
+
+@pytest.mark.memory
+@pytest.mark.parametrize("params", DEAL_QUERIES)
+def test_get_all_deals_matches_sql(backends, params):
+    results = {}
+    for name, (db, admin, service) in backends.items():
+        query = {**dict(search=None, more_than=None, less_than=None, related_to_me=None,
+                        related_to_user=None, related_to_client=None), **params}
+        response = service["DealsService"].get_all(db=db, current_user=admin, **query)
+        results[name] = (response.total, [deal.title for deal in response.deals])
+    assert results["memory"] == results["sql"]
+    assert results["sql"][1]
+
+
+@pytest.mark.memory
+def test_get_by_date_matches_sql(backends):
+    results = {}
+    for name, (db, admin, service) in backends.items():
+        response = service["DealsService"].get_by_date(
+            db=db, current_user=admin, skip=0, limit=100, date_field="closed_at", search=None,
+            more_than=None, less_than=None, exact_date=None, earlier_than=datetime(2030, 1, 20),
+            later_than=datetime(2030, 1, 5, tzinfo=timezone.utc), new=False, related_to_me=None,
+            related_to_user=None, related_to_client=None, sort_by="closed_at", order="desc")
+        results[name] = (response.total, [deal.title for deal in response.deals])
+    assert results["memory"] == results["sql"]
+    assert results["sql"][1]
+
+
+@pytest.mark.memory
+def test_get_unassigned_clients_matches_sql(backends):
+    results = {}
+    for name, (db, admin, service) in backends.items():
+        response = service["ClientsService"].get_unassigned_clients(
+            db=db, skip=0, limit=10, search="example", sort_by="email", order="desc")
+        results[name] = (response.total, [client.name for client in response.clients])
+    assert results["memory"] == results["sql"] == (2, ["memory-client-5", "memory-client-4"])
+
+
+@pytest.mark.memory
+def test_get_overview_matches_sql(backends):
+    results = {}
+    for name, (db, admin, service) in backends.items():
+        client_id = service["ClientsService"].clients_repository.get_by_name(db, "memory-client-1").id
+        response = service["ClientsService"].get_overview(db=db, client_id=client_id)
+        results[name] = (response.owner.username, response.deals_summary,
+                         [deal.title for deal in response.deals], [task.title for task in response.tasks])
+    assert results["memory"] == results["sql"]
+
+
+@pytest.mark.memory
+def test_memory_writes_keep_indexes():
+    db = MemoryDatabase()
+    admin = seed(db, MEMORY)
+    service = services(MEMORY)
+
+    updated = service["DealsService"].update_deal(
+        deal=DealCreate(title="memory-renamed", status="closed", value=5000),
+        db=db, current_user=admin, deal_id=1, title=None)
+    assert updated.deals.title == "memory-renamed"
+    assert MemoryDealsRepository.get_by_title(db, "memory-renamed").id == 1
+    assert MemoryDealsRepository.get_by_title(db, "memory-deal-00") is None
+    top = service["DealsService"].get_all(
+        db=db, current_user=admin, skip=0, limit=1, search=None, more_than=None, less_than=None,
+        related_to_me=None, related_to_user=None, related_to_client=None, sort_by="value", order="desc")
+    assert top.deals[0].title == "memory-renamed"
+
+    service["ClientsService"].delete_client(name="memory-client-0", db=db)
+    assert len(db.deals) == 40 - 7
+    assert all(deal.client_id != 1 for deal in db.deals.rows.values())
+    assert len(db.deals.indexes["value"]) == len(db.deals)
+
+    service["UsersService"].delete_user(username="memory-manager-1", db=db)
+    assert [client.name for client in db.clients.rows.values() if client.user_id is None] == \
+        ["memory-client-1", "memory-client-3", "memory-client-4", "memory-client-5"]
+    assert all(task.user_id != 3 for task in db.tasks.rows.values())
+
+
+@pytest.mark.memory
+def test_using_rejects_unknown_repository():
+    with pytest.raises(TypeError):
+        DealsService.using(users_repository=MemoryUsersRepository)
+
+
+@pytest.mark.memory
+def test_memory_delete_group_refuses_unfiltered_query():
+    db = MemoryDatabase()
+    seed(db, MEMORY)
+    with pytest.raises(ValueError):
+        MemoryDealsRepository.delete_group(db, MemoryDealsRepository.apply_filters(db, []))
+    assert len(db.deals) == 40
@@ -0,0 +1,45 @@
+import pytest
+from src.core.admission import admission
+from src.core.config import settings
+
+@pytest.fixture
+def metrics_headers(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "test-metrics-token")
+    return {"Authorization": "Bearer test-metrics-token"}
+
+@pytest.mark.metrics_api
+@pytest.mark.get
+def test_get_metrics(client, admin_auth_headers, metrics_headers):
+    client.get("/users/me", headers=admin_auth_headers)
+    response = client.get("/metrics", headers=metrics_headers)
+    assert response.status_code == 200
+    assert 'operation_id="my-info"' in response.text
+    assert "http_requests_in_progress" in response.text
+    assert 'password_hash_duration_seconds_count{operation="verify"}' in response.text
+    assert "db_query_duration_seconds_bucket" in response.text
+    assert 'db_pool_connections{state="checked_out"}' in response.text
+
+@pytest.mark.metrics_api
+@pytest.mark.get
+def test_get_metrics_counts_shed_requests(client, admin_auth_headers, metrics_headers, monkeypatch):
+    monkeypatch.setitem(admission.user_in_flight, "testadmin", settings.MAX_IN_FLIGHT_PER_USER)
+    response = client.get("/users/me", headers=admin_auth_headers)
+    assert response.status_code == 429
+
+    response = client.get("/metrics", headers=metrics_headers)
+    assert 'http_responses_total{method="GET",route="/users/me",status="429"}' in response.text
+
+@pytest.mark.metrics_api
+@pytest.mark.get
+def test_get_metrics_requires_token(client, metrics_headers):
+    response = client.get("/metrics")
+    assert response.status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+
+@pytest.mark.metrics_api
+@pytest.mark.get
+def test_get_metrics_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    response = client.get("/metrics", headers={"Authorization": "Bearer "})
+    assert response.status_code == 404
@@ -0,0 +1,22 @@
+import pytest
+from src.core.admission import admission
+from src.core.config import settings
+
+@pytest.mark.middleware
+@pytest.mark.admin
+@pytest.mark.get
+def test_per_user_concurrency_limit(client, admin_auth_headers, monkeypatch):
+    monkeypatch.setitem(admission.user_in_flight, "testadmin", settings.MAX_IN_FLIGHT_PER_USER)
+    response = client.get("/users/me", headers=admin_auth_headers)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+@pytest.mark.middleware
+@pytest.mark.admin
+@pytest.mark.get
+def test_requests_shed_when_worker_is_full(client, admin_auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "QUEUE_TARGET_MS", 50)
+    monkeypatch.setattr(admission, "in_flight", settings.MAX_IN_FLIGHT)
+    response = client.get("/users/get-all-users", headers=admin_auth_headers)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
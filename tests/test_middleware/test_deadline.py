@@ -0,0 +1,44 @@
+import pytest
+from time import perf_counter
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.core.deadlines import RequestDeadline, current_deadline
+from src.repositories.users_repository import UsersRepository
+
+@pytest.mark.middleware
+@pytest.mark.admin
+@pytest.mark.get
+def test_route_deadline_cancels_query(client, admin_auth_headers, monkeypatch):
+    def slow_get_by_id(db, user_id):
+        db.execute(text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 30000000) "
+                        "SELECT count(*) FROM c")).scalar()
+
+    monkeypatch.setattr(settings, "ROUTE_TIMEOUTS_MS", {"get-user-by-id": 200})
+    monkeypatch.setattr(UsersRepository, "get_by_id", slow_get_by_id)
+    started = perf_counter()
+    response = client.get("/users/get-user-by-id/1", headers=admin_auth_headers)
+    assert perf_counter() - started < 5
+    assert response.status_code == 504
+    assert "deadline" in response.text
+
+@pytest.mark.middleware
+def test_deadline_untracks_connection_before_pool_return(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'deadline.db'}")
+    tracked_on_return = []
+    return_conn = engine.pool._return_conn
+    monkeypatch.setattr(engine.pool, "_return_conn", lambda record: (
+        tracked_on_return.append(dict(deadline.connections)), return_conn(record)))
+    deadline = RequestDeadline("get-user-by-id", 1000)
+    token = current_deadline.set(deadline)
+    try:
+        with Session(engine) as db:
+            db.execute(text("SELECT 1"))
+            assert len(deadline.connections) == 1
+            db.commit()
+    finally:
+        current_deadline.reset(token)
+        engine.dispose()
+
+    # Another request may check the connection out as soon as it is back
+    assert tracked_on_return == [{}]
@@ -0,0 +1,31 @@
+import logging
+import pytest
+
+@pytest.mark.middleware
+@pytest.mark.admin
+@pytest.mark.get
+def test_request_id_is_echoed(client, admin_auth_headers):
+    response = client.get("/users/me", headers={**admin_auth_headers, "X-Request-ID": "sync-job.42"})
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "sync-job.42"
+
+    response = client.get("/users/me", headers=admin_auth_headers)
+    assert len(response.headers["X-Request-ID"]) == 32
+
+@pytest.mark.middleware
+@pytest.mark.admin
+@pytest.mark.get
+def test_invalid_request_id_is_replaced(client, admin_auth_headers):
+    response = client.get("/users/me", headers={**admin_auth_headers, "X-Request-ID": "no spaces allowed"})
+    assert response.status_code == 200
+    assert len(response.headers["X-Request-ID"]) == 32
+
+@pytest.mark.middleware
+@pytest.mark.admin
+@pytest.mark.get
+def test_log_lines_carry_request_id(client, admin_auth_headers, caplog):
+    with caplog.at_level(logging.INFO, logger="server"):
+        response = client.get("/users/me", headers={**admin_auth_headers, "X-Request-ID": "sync-job.43"})
+    assert response.status_code == 200
+    request_ids = {record.request_id for record in caplog.records if record.name == "server"}
+    assert request_ids == {"sync-job.43"}
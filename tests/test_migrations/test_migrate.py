@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from src.core.config import settings
+from src.database import Base
+from src.enums import UserRole
+from src.models import role_priority_map
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def migrate(url: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "src.migrate"], cwd=ROOT, capture_output=True, text=True,
+                          env={**os.environ, "DATABASE_URL": url}, check=True)
+
+
+def state(url: str) -> tuple[str, list]:
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            version = conn.scalar(text("SELECT version_num FROM alembic_version"))
+            admins = conn.execute(text("SELECT username, role, role_level FROM users")).all()
+    finally:
+        engine.dispose()
+    return version, [tuple(admin) for admin in admins]
+
+
+@pytest.mark.migrations
+def test_migrate_new_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'new.db'}"
+    migrate(url)
+
+    version, users = state(url)
+    assert version == "7c1e4b9a2d56"
+    assert users == [(settings.ADMIN_NAME, settings.ADMIN_ROLE, role_priority_map[UserRole(settings.ADMIN_ROLE)])]
+
+
+@pytest.mark.migrations
+def test_migrate_stamps_database_built_by_create_all(tmp_path):
+    url = f"sqlite:///{tmp_path / 'create_all.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (username, password, role, role_level) "
+                          "VALUES (:name, '-', 'admin', 3)"), {"name": settings.ADMIN_NAME})
+    engine.dispose()
+
+    result = migrate(url)
+    assert "stamping revision f2dfcdaf3c45" in result.stdout
+
+    version, users = state(url)
+    assert version == "7c1e4b9a2d56"
+    assert users == [(settings.ADMIN_NAME, "admin", 3)]
+
+    migrate(url)
+    assert state(url) == (version, users)
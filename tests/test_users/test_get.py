@@ -1,4 +1,8 @@
 import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.core.config import settings
+from src.core.query_counter import QueryCounter
 from tests.fixtures.fake_users import fake_users
 
 @pytest.mark.users_api
@@ -9,6 +13,14 @@ def test_get_my_info(client, admin_auth_headers, fake_users):
     assert response.status_code == 200
     data = response.json()
     assert data["username"] == "testadmin"
+    assert 'db;dur=' in response.headers["Server-Timing"]
+
+@pytest.mark.users_api
+@pytest.mark.get
+def test_get_my_info_invalid_token(client):
+    response = client.get("/users/me", headers={"Authorization": "Bearer not-a-jwt"})
+    assert response.status_code == 401
+    assert "Invalid or expired token" in response.text
 
 @pytest.mark.users_api
 @pytest.mark.admin
@@ -87,3 +99,86 @@ def test_get_user_by_username(client, admin_auth_headers, test_admin):
     assert response.status_code == 200
     data = response.json()
     assert data["users"]["id"] == test_admin.id
+
+@pytest.mark.users_api
+@pytest.mark.admin
+@pytest.mark.get
+@pytest.mark.committed
+def test_get_user_by_username_from_replica(client, admin_auth_headers, test_admin, replica_engine):
+    with QueryCounter(replica_engine) as replica_queries:
+        response = client.get(f"/users/get-user-by-username/{test_admin.username}", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["users"]["id"] == test_admin.id
+    assert any("FROM users" in statement for statement in replica_queries.statements)
+
+@pytest.mark.users_api
+@pytest.mark.admin
+@pytest.mark.get
+def test_get_users_batch(client, admin_auth_headers, fake_users):
+    ids = [user.id for user in fake_users[:3]]
+    query = "&".join(f"ids={id}" for id in ids)
+    response = client.get(f"/users/batch?{query}", headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert [user["id"] for user in data["users"]] == ids
+
+@pytest.mark.users_api
+@pytest.mark.non_admin
+@pytest.mark.get
+def test_get_users_batch_non_admin(client, user_auth_headers):
+    response = client.get("/users/batch?ids=1", headers=user_auth_headers)
+    assert response.status_code == 403
+    assert "Access denied" in response.text
+
+@pytest.mark.users_api
+@pytest.mark.admin
+@pytest.mark.get
+@pytest.mark.committed
+def test_get_runs_without_transaction(client, admin_auth_headers, monkeypatch):
+    isolation_levels = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        isolation_levels.append(conn.get_execution_options().get("isolation_level"))
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/users/me", headers=admin_auth_headers)
+        assert response.status_code == 200
+        assert isolation_levels and set(isolation_levels) == {"AUTOCOMMIT"}
+
+        # A route with its own budget keeps the transaction for SET LOCAL
+        isolation_levels.clear()
+        monkeypatch.setattr(settings, "ROUTE_TIMEOUTS_MS", {"my-info": 2000})
+        response = client.get("/users/me", headers=admin_auth_headers)
+        assert response.status_code == 200
+        assert isolation_levels and "AUTOCOMMIT" not in isolation_levels
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+@pytest.mark.users_api
+@pytest.mark.admin
+@pytest.mark.get
+@pytest.mark.committed
+def test_get_all_runs_in_one_read_only_transaction(client, admin_auth_headers):
+    begins, statements = [], []
+
+    def record_begin(conn):
+        begins.append(conn.get_execution_options())
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(conn.get_execution_options())
+
+    event.listen(Engine, "begin", record_begin)
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/users/get-all-users?skip=0&limit=10", headers=admin_auth_headers)
+    finally:
+        event.remove(Engine, "begin", record_begin)
+        event.remove(Engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    # The user of the token, the count and the page
+    assert len(statements) >= 3
+    assert len(begins) == 1
+    assert all(options.get("postgresql_readonly") or options.get("read_only") for options in begins + statements)
+    assert not any(options.get("isolation_level") == "AUTOCOMMIT" for options in statements)